@@ -1,14 +1,16 @@
 # -- Authentication Logic --
-from app import models  # Models
-import bcrypt  # For hashing passwords
+from app import batching, models, passwords, tokens, user_cache  # Batches, models, bcrypt pool, token stores and the identity cache
 from datetime import datetime, timedelta, timezone  # For access token expiration
 from fastapi import Header, Depends, HTTPException, status  # FastAPI-related toolkit
 from fastapi.security import OAuth2PasswordBearer  # For auth dependency
+from starlette.concurrency import run_in_threadpool  # Blocking token stores off the event loop
 import secrets  # For strong randomization of tokens
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
 from sqlalchemy.orm import Session  # Database session type hint
 import string  # For API key generation
-from typing import Dict  # For api_keys
-from .database import get_db  # For database sessions
+from typing import Optional, Tuple  # For token lookups
+from .config import settings  # Application settings
+from .database import engine, read_engine, get_db, get_read_db, get_async_db, get_async_read_db  # For database sessions
 
 SECRET_KEY = "secret"  # Preferably in .env file
 ALGORITHM = "HS256"  # Symmetric encryption
@@ -16,22 +18,62 @@ ALGORITHM = "HS256"  # Symmetric encryption
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-# Memory storage (stores dict for expiry and user_id) with server-side cleanup
-api_keys: Dict[str, dict] = {}
+# Token lifetime
+TOKEN_TTL = timedelta(minutes=5)
+
+# Token storage (expiry and user_id), swept in the background; see app/tokens.py
+token_store = tokens.build_store(settings.token_store, engine, models.ApiToken.__table__, read_engine=read_engine)
+
+# Users already resolved for a token, so authenticated requests skip the token and user lookups
+identity_cache = user_cache.UserCache(settings.user_cache_size)
+user_cache.watch_user_writes(identity_cache)
+
+# Dedicated bcrypt workers with a bounded queue
+password_hasher = passwords.PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.bcrypt_workers,
+    queue_limit=settings.bcrypt_queue_limit,
+    executor=settings.bcrypt_executor
+)
+
+# Shed password work instead of letting it pile up behind a login burst
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"success": False, "message": "Too many password operations in progress, try again shortly."},
+        headers={"Retry-After": str(settings.bcrypt_retry_after)}
+    )
 
 # Hash a password using bcrypt (passlib was initially used but was prone to errors)
 def hash_password(password: str) -> str:
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password=pwd_bytes, salt=salt)
-    string_password = hashed_password.decode('utf-8')  # Store the hashed password correctly
-    return string_password
+    try:
+        return password_hasher.hash(password)
+    except passwords.HasherBusy:
+        raise hasher_busy()
 
 # Check if the provided password matches the stored password (hashed)
 def verify_password(plain_password, hashed_password):
-    password_byte_enc = plain_password.encode('utf-8')
-    hashed_password = hashed_password.encode('utf=8')  # Added as a fix
-    return bcrypt.checkpw(password=password_byte_enc, hashed_password=hashed_password)
+    try:
+        return password_hasher.verify(plain_password, hashed_password)
+    except passwords.HasherBusy:
+        raise hasher_busy()
+
+# Async variants for async routes
+async def hash_password_async(password: str) -> str:
+    try:
+        return await password_hasher.hash_async(password)
+    except passwords.HasherBusy:
+        raise hasher_busy()
+
+async def verify_password_async(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify_async(plain_password, hashed_password)
+    except passwords.HasherBusy:
+        raise hasher_busy()
+
+# True when a stored hash was made with a different cost than BLOG_BCRYPT_ROUNDS
+def needs_rehash(hashed_password: str) -> bool:
+    return password_hasher.needs_rehash(hashed_password)
 
 # Generate an API key
 def generate_api_key(length: int = 64) -> str:
@@ -41,43 +83,87 @@ def generate_api_key(length: int = 64) -> str:
 # Set expiration
 def create_api_key(user_id: int) -> str:
     api_key = generate_api_key()
-    expiration = datetime.now(timezone.utc) + timedelta(minutes=5)  # Set five minutes for expiration
-    api_keys[api_key] = {"expiry": expiration, "user_id": user_id}
+    expiration = datetime.now(timezone.utc) + TOKEN_TTL  # Set five minutes for expiration
+    token_store.put(api_key, user_id, expiration.timestamp())
     return api_key
 
-# Validate API key
-def validate_api_key(api_key: str) -> bool:
-    # If API key does not exist
-    if api_key not in api_keys:
-        return None
-    
-    # If API Key is expired
-    data = api_keys[api_key]
-    if datetime.now(timezone.utc) > data["expiry"]:
-        del api_keys[api_key]
-        return None
-    
-    return data["user_id"]
-
-# Authentication dependency
-async def get_current_user(
-        x_api_token: str = Header(..., alias="X-API-Token"),
-        db: Session = Depends(get_db)
-) -> models.User:
-    # Check if token exists and get user_id
-    user_id = validate_api_key(x_api_token)
-    if not user_id:
+# Validate API key (None if it does not exist or is expired)
+def validate_api_key(api_key: str) -> Optional[int]:
+    return token_store.get(api_key)
+
+# Check if token exists and get (user_id, expiry)
+def require_token(x_api_token: str) -> Tuple[int, float]:
+    entry = token_store.lookup(x_api_token)
+    if not entry:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"success": False, "message": "Invalid or expired API token."}
         )
-    
-    # Fetch user from database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    return entry
+
+# Async variants: the shared store queries SQLite through the sync engine, so it runs on the threadpool
+async def create_api_key_async(user_id: int) -> str:
+    if token_store.blocking:
+        return await run_in_threadpool(create_api_key, user_id)
+    return create_api_key(user_id)
+
+async def require_token_async(x_api_token: str) -> Tuple[int, float]:
+    if token_store.blocking:
+        return await run_in_threadpool(require_token, x_api_token)
+    return require_token(x_api_token)
+
+# Reject tokens whose user no longer exists
+def require_user(user: models.User) -> models.User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"success": False, "message": "User not found in database."}
         )
-    
-    return user
\ No newline at end of file
+    return user
+
+# Authentication dependency (plain def: the blocking query runs on the threadpool, not the event loop).
+# The user is looked up on a reader session and attached to the route's session without SQL,
+# so a mutating route never holds the write lock just to authenticate.
+def get_current_user(
+        x_api_token: str = Header(..., alias="X-API-Token"),
+        db: Session = Depends(get_db),
+        read_db: Session = Depends(get_read_db)
+) -> models.User:
+    # Inside POST /batch the caller was authenticated once for every operation
+    batch = batching.current_batch.get()
+    if batch is not None:
+        return db.merge(user_cache.detached_user(batch.identity), load=False)
+
+    # Cached identity: no lookups at all
+    snapshot = identity_cache.get(x_api_token)
+    if not snapshot:
+        user_id, expires_at = require_token(x_api_token)
+
+        # Fetch user from database
+        user = require_user(read_db.query(models.User).filter(models.User.id == user_id).first())
+        identity_cache.put(x_api_token, user, expires_at)
+        snapshot = identity_cache.snapshot(user)
+
+    return db.merge(user_cache.detached_user(snapshot), load=False)
+
+# Authentication dependency for async routes
+async def get_current_user_async(
+        x_api_token: str = Header(..., alias="X-API-Token"),
+        db: AsyncSession = Depends(get_async_db),
+        read_db: AsyncSession = Depends(get_async_read_db)
+) -> models.User:
+    batch = batching.current_batch.get()
+    if batch is not None:
+        return await db.merge(user_cache.detached_user(batch.identity), load=False)
+
+    # Cached identity: no lookups at all
+    snapshot = identity_cache.get(x_api_token)
+    if not snapshot:
+        user_id, expires_at = await require_token_async(x_api_token)
+
+        # Fetch user from database without blocking the event loop
+        user = require_user(await read_db.get(models.User, user_id))
+        identity_cache.put(x_api_token, user, expires_at)
+        snapshot = identity_cache.snapshot(user)
+
+    return await db.merge(user_cache.detached_user(snapshot), load=False)
\ No newline at end of file
@@ -0,0 +1,95 @@
+# -- Batched Sub-Requests (many route calls on one session and one transaction) --
+import logging  # Unexpected handler errors
+from contextvars import ContextVar  # The batch follows each sub-request into threadpool calls
+from dataclasses import dataclass  # Batch state
+from typing import Any, List, Optional, Tuple  # Type hints
+import orjson  # Sub-request bodies
+from sqlalchemy.orm import Session  # Base session class
+from starlette.exceptions import HTTPException  # Raised by the router itself (no route, wrong method)
+
+logger = logging.getLogger("app.batching")
+
+BATCHABLE_PREFIX = "/posts"  # Post and comment routes (user creation would hash passwords while holding the write lock)
+DROPPED_HEADERS = (b"content-length", b"content-type")
+
+# Handlers commit after every write; inside a batch that only flushes, and the batch commits once at the end
+class BatchSession(Session):
+    defer_commit = True
+
+    def commit(self) -> None:
+        if self.defer_commit:
+            self.flush()
+            return
+        super().commit()
+
+# The session (and authenticated user) every sub-request of the running batch shares
+@dataclass
+class Batch:
+    session: Any  # Session or AsyncSession
+    identity: Optional[dict] = None  # user_cache snapshot of the caller
+
+current_batch: ContextVar[Optional[Batch]] = ContextVar("current_batch", default=None)
+
+def is_batchable(path: str) -> bool:
+    path = path.split("?", 1)[0]
+    return path == BATCHABLE_PREFIX or path.startswith(BATCHABLE_PREFIX + "/")
+
+# ASGI scope for one operation, inheriting the batch request's connection details and exception handlers
+def sub_scope(scope: dict, method: str, path: str, headers: List[Tuple[bytes, bytes]]) -> dict:
+    path, _, query = path.partition("?")
+    inherited = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app",
+                 "starlette.exception_handlers")
+    return {
+        **{key: scope[key] for key in inherited if key in scope},
+        "method": method,
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("latin-1"),
+        "headers": headers,
+        "state": {},
+    }
+
+# Run one operation through the app's router (no middleware: no cache, no rate limit) and collect the response
+async def dispatch(router, scope: dict, body: Any) -> dict:
+    payload = b"" if body is None else orjson.dumps(body)
+    scope = {**scope, "headers": [*scope["headers"], (b"content-type", b"application/json"),
+                                  (b"content-length", str(len(payload)).encode("ascii"))]}
+    start = {}
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await router(scope, receive, send)
+    except HTTPException as exc:
+        return {"status": exc.status_code, "headers": dict(exc.headers or {}), "body": {"detail": exc.detail}}
+    except Exception:
+        logger.exception("Batch operation %s %s failed", scope["method"], scope["path"])
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    content = b"".join(chunks)
+    headers = {name.decode("latin-1"): value.decode("latin-1")
+               for name, value in start.get("headers", []) if name.lower() not in DROPPED_HEADERS}
+    return {"status": start.get("status", 500), "headers": headers, "body": orjson.loads(content) if content else None}
+
+def ok(result: dict) -> bool:
+    return result["status"] < 400
+
+# Atomic batch with a failed operation: nothing was committed, so every other item reports 424 Failed Dependency
+def failed_dependency(results: List[dict], failed: int, total: int) -> List[dict]:
+    final = []
+    for index in range(total):
+        if index == failed:
+            final.append(results[index])
+        elif index < failed:
+            final.append({"status": 424, "headers": {}, "body": {"detail": f"Rolled back: operation {failed} failed"}})
+        else:
+            final.append({"status": 424, "headers": {}, "body": {"detail": f"Not run: operation {failed} failed"}})
+    return final
\ No newline at end of file
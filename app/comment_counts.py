@@ -0,0 +1,51 @@
+# -- Denormalized Comment Counts (posts.comment_count) --
+from sqlalchemy import inspect, text  # Schema inspection and raw DDL
+from sqlalchemy.engine import Connection, Engine  # Type hints
+
+# Triggers keep the counter in the same transaction as every comment write (routes, bulk import, scripts and raw SQL alike).
+# Deleting a post detaches its comments (post_id set to NULL), which the update trigger counts like a move.
+CREATE_COUNT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_ai AFTER INSERT ON comments WHEN new.post_id IS NOT NULL BEGIN
+        UPDATE posts SET comment_count = comment_count + 1 WHERE id = new.post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_ad AFTER DELETE ON comments WHEN old.post_id IS NOT NULL BEGIN
+        UPDATE posts SET comment_count = comment_count - 1 WHERE id = old.post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_au AFTER UPDATE OF post_id ON comments
+    WHEN old.post_id IS NOT new.post_id BEGIN
+        UPDATE posts SET comment_count = comment_count - 1 WHERE id = old.post_id;
+        UPDATE posts SET comment_count = comment_count + 1 WHERE id = new.post_id;
+    END
+    """,
+]
+
+COUNT_TRIGGERS = ("comments_count_ai", "comments_count_ad", "comments_count_au")
+
+# Recount every post from the comments table (one pass over ix_comments_post_id)
+BACKFILL = """
+UPDATE posts SET comment_count = (SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)
+"""
+
+# Add the column and triggers to an existing database, then backfill (safe to run more than once)
+def setup_counts(conn: Connection) -> None:
+    columns = {column["name"] for column in inspect(conn).get_columns("posts")}
+    if "comment_count" not in columns:
+        conn.execute(text("ALTER TABLE posts ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0"))
+    for trigger in CREATE_COUNT_TRIGGERS:
+        conn.execute(text(trigger))
+    conn.execute(text(BACKFILL))
+
+# Repair counts after comments were changed with the triggers missing (e.g. a restored dump)
+def recount(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(BACKFILL))
+
+# Remove the triggers for a bulk load; setup_counts() recreates them and backfills
+def drop_triggers(conn: Connection) -> None:
+    for trigger in COUNT_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
\ No newline at end of file
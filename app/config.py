@@ -0,0 +1,98 @@
+# -- Application Settings (read from BLOG_* environment variables) --
+import os  # For environment variables
+from dataclasses import dataclass, field  # For the settings container
+from pathlib import Path  # For the default database path
+from typing import FrozenSet, Tuple  # Rate budgets, user lists
+
+# Default SQLite file location
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "blog.db"
+
+# Read a boolean flag such as BLOG_ASYNC_DB=1
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Read a token-bucket budget such as BLOG_RATE_LIMIT_WRITE=5,20 (requests per second, burst)
+def env_rate(name: str, default: str) -> Tuple[float, float]:
+    rate, burst = os.getenv(name, default).split(",")
+    return float(rate), float(burst)
+
+# Read a comma-separated list such as BLOG_STATS_USERS=alice,bob
+def env_list(name: str) -> FrozenSet[str]:
+    return frozenset(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
+@dataclass
+class Settings:
+    # Path of the SQLite database file
+    db_path: Path = field(default_factory=lambda: Path(os.getenv("BLOG_DB_PATH", str(DEFAULT_DB_PATH))))
+    # "tuned" (WAL, pragmas, separate reader/writer pools) or "legacy" (one bare engine)
+    db_profile: str = field(default_factory=lambda: os.getenv("BLOG_DB_PROFILE", "tuned"))
+    db_busy_timeout_ms: int = field(default_factory=lambda: int(os.getenv("BLOG_DB_BUSY_TIMEOUT_MS", "5000")))
+    db_synchronous: str = field(default_factory=lambda: os.getenv("BLOG_DB_SYNCHRONOUS", "NORMAL"))
+    db_mmap_size: int = field(default_factory=lambda: int(os.getenv("BLOG_DB_MMAP_SIZE", str(256 * 1024 * 1024))))
+    db_cache_size_kib: int = field(default_factory=lambda: int(os.getenv("BLOG_DB_CACHE_SIZE_KIB", "16384")))
+    db_read_pool_size: int = field(default_factory=lambda: int(os.getenv("BLOG_DB_READ_POOL_SIZE", "8")))
+    db_write_pool_size: int = field(default_factory=lambda: int(os.getenv("BLOG_DB_WRITE_POOL_SIZE", "1")))
+    # Serve every route through AsyncSession/aiosqlite instead of the threadpool
+    async_db: bool = field(default_factory=lambda: env_bool("BLOG_ASYNC_DB"))
+    # Where API tokens live: "memory" (per process) or "sqlite" (shared by every worker)
+    token_store: str = field(default_factory=lambda: os.getenv("BLOG_TOKEN_STORE", "memory"))
+    # Seconds between background sweeps of expired tokens
+    token_sweep_interval: float = field(default_factory=lambda: float(os.getenv("BLOG_TOKEN_SWEEP_INTERVAL", "30")))
+
+    # Resolved users cached by token (0 disables the cache)
+    user_cache_size: int = field(default_factory=lambda: int(os.getenv("BLOG_USER_CACHE_SIZE", "1024")))
+    # bcrypt cost factor; stored hashes with another cost are upgraded on login
+    bcrypt_rounds: int = field(default_factory=lambda: int(os.getenv("BLOG_BCRYPT_ROUNDS", "12")))
+    # "thread" or "process" (a process pool spreads hashing across cores)
+    bcrypt_executor: str = field(default_factory=lambda: os.getenv("BLOG_BCRYPT_EXECUTOR", "thread"))
+    bcrypt_workers: int = field(default_factory=lambda: int(os.getenv("BLOG_BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1)))))
+    # Hash jobs allowed to wait for a worker before logins are rejected with 503
+    bcrypt_queue_limit: int = field(default_factory=lambda: int(os.getenv("BLOG_BCRYPT_QUEUE_LIMIT", "32")))
+    # Retry-After (seconds) sent with those 503 responses
+    bcrypt_retry_after: int = field(default_factory=lambda: int(os.getenv("BLOG_BCRYPT_RETRY_AFTER", "1")))
+    # Serialized GET /posts, /posts/{id} and /posts/{id}/comments responses kept per process (0 disables)
+    response_cache_entries: int = field(default_factory=lambda: int(os.getenv("BLOG_RESPONSE_CACHE_ENTRIES", "1024")))
+    response_cache_bytes: int = field(default_factory=lambda: int(os.getenv("BLOG_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024))))
+    # Request latency, SQL counts per request and runtime gauges on GET /metrics
+    metrics_enabled: bool = field(default_factory=lambda: env_bool("BLOG_METRICS", True))
+    # Add a Server-Timing header (total and SQL time) to every response
+    server_timing: bool = field(default_factory=lambda: env_bool("BLOG_SERVER_TIMING"))
+    # Statements slower than slow_query_ms are logged with their query plan and aggregated at GET /stats/slow-queries
+    slow_query_log: bool = field(default_factory=lambda: env_bool("BLOG_SLOW_QUERY_LOG", True))
+    slow_query_ms: float = field(default_factory=lambda: float(os.getenv("BLOG_SLOW_QUERY_MS", "100")))
+    slow_query_entries: int = field(default_factory=lambda: int(os.getenv("BLOG_SLOW_QUERY_ENTRIES", "200")))
+    slow_query_explain: bool = field(default_factory=lambda: env_bool("BLOG_SLOW_QUERY_EXPLAIN", True))
+    # Usernames allowed to read GET /stats and /stats/slow-queries (empty: nobody)
+    stats_users: FrozenSet[str] = field(default_factory=lambda: env_list("BLOG_STATS_USERS"))
+    # Per-token and per-IP token buckets (429) and in-flight caps (503) in front of every route
+    rate_limit: bool = field(default_factory=lambda: env_bool("BLOG_RATE_LIMIT", True))
+    rate_limit_read: Tuple[float, float] = field(default_factory=lambda: env_rate("BLOG_RATE_LIMIT_READ", "50,100"))
+    rate_limit_write: Tuple[float, float] = field(default_factory=lambda: env_rate("BLOG_RATE_LIMIT_WRITE", "5,20"))
+    rate_limit_login: Tuple[float, float] = field(default_factory=lambda: env_rate("BLOG_RATE_LIMIT_LOGIN", "0.5,5"))
+    # Per-IP buckets are this many times larger than per-token ones (several clients can share an address)
+    rate_limit_ip_factor: float = field(default_factory=lambda: float(os.getenv("BLOG_RATE_LIMIT_IP_FACTOR", "4")))
+    rate_limit_keys: int = field(default_factory=lambda: int(os.getenv("BLOG_RATE_LIMIT_KEYS", "10000")))
+    # Requests (and writes, which queue on the single writer) served at once before new ones get 503 (0 disables)
+    max_in_flight: int = field(default_factory=lambda: int(os.getenv("BLOG_MAX_IN_FLIGHT", "64")))
+    max_writes_in_flight: int = field(default_factory=lambda: int(os.getenv("BLOG_MAX_WRITES_IN_FLIGHT", "16")))
+    # Retry-After (seconds) sent with those 503 responses
+    load_shed_retry_after: int = field(default_factory=lambda: int(os.getenv("BLOG_LOAD_SHED_RETRY_AFTER", "1")))
+    # Operations accepted by one POST /batch
+    batch_max_operations: int = field(default_factory=lambda: int(os.getenv("BLOG_BATCH_MAX_OPERATIONS", "100")))
+    # Queue post and comment inserts to one writer thread that commits many requests per transaction
+    group_commit: bool = field(default_factory=lambda: env_bool("BLOG_GROUP_COMMIT"))
+    group_commit_window_ms: float = field(default_factory=lambda: float(os.getenv("BLOG_GROUP_COMMIT_WINDOW_MS", "2")))
+    group_commit_max_batch: int = field(default_factory=lambda: int(os.getenv("BLOG_GROUP_COMMIT_MAX_BATCH", "128")))
+    # Newest posts kept serialized in memory for the first pages of GET /posts (0 disables)
+    feed_size: int = field(default_factory=lambda: int(os.getenv("BLOG_FEED_SIZE", "100")))
+    feed_comments: int = field(default_factory=lambda: int(os.getenv("BLOG_FEED_COMMENTS", "20")))  # Kept per feed entry
+    # GET /events: Server-Sent Events for post and comment writes (0 subscribers disables the stream)
+    events_max_subscribers: int = field(default_factory=lambda: int(os.getenv("BLOG_EVENTS_MAX_SUBSCRIBERS", "10000")))
+    events_replay: int = field(default_factory=lambda: int(os.getenv("BLOG_EVENTS_REPLAY", "1000")))  # Kept for Last-Event-ID
+    events_queue: int = field(default_factory=lambda: int(os.getenv("BLOG_EVENTS_QUEUE", "100")))  # Unsent frames before a subscriber is dropped
+    events_keepalive: float = field(default_factory=lambda: float(os.getenv("BLOG_EVENTS_KEEPALIVE", "15")))  # Seconds between pings
+
+settings = Settings()
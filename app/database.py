@@ -1,34 +1,176 @@
 # -- SQLAlchemy Database Connector --
-from pathlib import Path  # For custom paths
-from sqlalchemy import create_engine  # For initializing engine
+from contextlib import AsyncExitStack, ExitStack  # Holding warm-up connections
+from fastapi import Request  # For choosing reader or writer sessions
+from sqlalchemy import create_engine, event  # For initializing engines and applying pragmas
+from sqlalchemy.engine import Engine  # Engine type hint
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # For async mode
 from sqlalchemy.ext.declarative import declarative_base  # For models
 from sqlalchemy.orm import sessionmaker  # For sessions
+from .batching import BatchSession, current_batch  # Sessions shared by batched sub-requests
+from .config import settings  # Application settings
 
 # Custom path for database
-DB_PATH = Path(__file__).parent / "data" / "blog.db"
+DB_PATH = settings.db_path
 
 # Create folder for database if it does not exist
 DB_PATH.parent.mkdir(exist_ok=True)
 
 # SQLite database file
 DB_URL = f"sqlite:///{DB_PATH}"
+ASYNC_DB_URL = f"sqlite+aiosqlite:///{DB_PATH}"  # Same file through the aiosqlite driver
 
-# Create an engine to manage connections to database
+# Request methods that only read, served by the read-only pool
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Pragmas run on every new connection for the "tuned" profile
+def profile_pragmas(read_only: bool) -> list:
+    if settings.db_profile != "tuned":
+        return []
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.db_busy_timeout_ms}",  # Wait for locks instead of failing with "database is locked"
+        f"PRAGMA mmap_size = {settings.db_mmap_size}",  # Read pages through the OS page cache
+        f"PRAGMA cache_size = -{settings.db_cache_size_kib}",  # Negative value = KiB per connection
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")  # A write on a reader is a bug, fail loudly
+    else:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")  # Readers no longer block on the writer (persists in the file)
+        pragmas.append(f"PRAGMA synchronous = {settings.db_synchronous}")  # NORMAL is crash-safe in WAL mode
+    return pragmas
+
+# Apply the profile to an engine through connection events
+def apply_profile(sync_engine: Engine, read_only: bool) -> None:
+    pragmas = profile_pragmas(read_only)
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if not read_only:
+            dbapi_connection.isolation_level = None  # Let the begin event below issue BEGIN itself
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if not read_only:
+        # Take the write lock when the transaction starts: a deferred transaction that read first
+        # cannot upgrade once another connection has committed, and fails with "database is locked"
+        @event.listens_for(sync_engine, "begin")
+        def on_begin(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+# Pool sizes: one writer connection serializes writes in-process, readers scale across threads
+def pool_options(read_only: bool) -> dict:
+    if settings.db_profile != "tuned":
+        return {}
+    if read_only:
+        return {"pool_size": settings.db_read_pool_size, "max_overflow": settings.db_read_pool_size}
+    return {"pool_size": settings.db_write_pool_size, "max_overflow": 0}
+
+# Create an engine to manage connections to database (the writer; also used by scripts)
 engine = create_engine(
     DB_URL,
-    connect_args={"check_same_thread": False}  # Enable multiple threads for FastAPI
+    connect_args={"check_same_thread": False},  # Enable multiple threads for FastAPI
+    **pool_options(read_only=False)
 )
+apply_profile(engine, read_only=False)
+
+# Read-only engine for GET routes (the same engine when the profile is "legacy")
+read_engine = engine
+if settings.db_profile == "tuned":
+    read_engine = create_engine(DB_URL, connect_args={"check_same_thread": False}, **pool_options(read_only=True))
+    apply_profile(read_engine, read_only=True)
 
-# Session factory for creating individual sessions
+# Session factories for creating individual sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+BatchSessionLocal = sessionmaker(class_=BatchSession, autocommit=False, autoflush=False, bind=engine)  # POST /batch
+
+# Async engines and session factories (only built in async mode so aiosqlite stays optional)
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+AsyncBatchSessionLocal = None
+if settings.async_db:
+    async_engine = create_async_engine(ASYNC_DB_URL, **pool_options(read_only=False))
+    apply_profile(async_engine.sync_engine, read_only=False)
+    async_read_engine = async_engine
+    if settings.db_profile == "tuned":
+        async_read_engine = create_async_engine(ASYNC_DB_URL, **pool_options(read_only=True))
+        apply_profile(async_read_engine.sync_engine, read_only=True)
+
+    # Committed objects are serialized after the session is done with them
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    AsyncBatchSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, sync_session_class=BatchSession, autoflush=False, expire_on_commit=False)
+
+# Distinct engines by role, for instrumentation (async engines are hooked through their sync_engine)
+def engine_roles() -> list:
+    roles = [("writer", engine)]
+    if read_engine is not engine:
+        roles.append(("reader", read_engine))
+    if async_engine is not None:
+        roles.append(("async_writer", async_engine.sync_engine))
+        if async_read_engine is not async_engine:
+            roles.append(("async_reader", async_read_engine.sync_engine))
+    return roles
+
+# Connections a pool keeps open (1 for pools without a fixed size)
+def pool_capacity(sync_engine: Engine) -> int:
+    size = getattr(sync_engine.pool, "size", None)
+    return max(1, size()) if callable(size) else 1
+
+# Open every pooled connection once (connect pragmas, WAL setup) so the first requests do not pay for it
+def warm_up() -> None:
+    for sync_engine in {engine, read_engine}:
+        with ExitStack() as stack:
+            for _ in range(pool_capacity(sync_engine)):
+                stack.enter_context(sync_engine.connect())
+
+async def warm_up_async() -> None:
+    for async_pool in {async_engine, async_read_engine} - {None}:
+        async with AsyncExitStack() as stack:
+            for _ in range(pool_capacity(async_pool.sync_engine)):
+                await stack.enter_async_context(async_pool.connect())
 
 # Base class for models
 Base = declarative_base()
 
-# Setup database session
-def get_db():
-    db = SessionLocal()
+# Setup database session (reader for GET routes, writer for mutating routes)
+def get_db(request: Request):
+    batch = current_batch.get()
+    if batch is not None:
+        yield batch.session  # Inside POST /batch: the batch opens, commits and closes it
+        return
+    factory = ReadSessionLocal if request.method in READ_METHODS else SessionLocal
+    db = factory()
     try:
         yield db  # Deliver session to route
     finally:
-        db.close()  # Ensure session closes after request
\ No newline at end of file
+        db.close()  # Ensure session closes after request
+
+# Reader session regardless of the request method (for lookups that must not hold the write lock)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Setup async database session (reader for GET routes, writer for mutating routes)
+async def get_async_db(request: Request):
+    batch = current_batch.get()
+    if batch is not None:
+        yield batch.session
+        return
+    factory = AsyncReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with factory() as db:
+        yield db  # Deliver session to route (closed when the block exits)
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
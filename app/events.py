@@ -0,0 +1,268 @@
+# -- Change Events: an In-Process Bus for the Server-Sent Events Stream --
+import asyncio  # Subscribers wait on the event loop
+import threading  # Handlers publish from worker threads, the loop and the group-commit writer
+import time  # Epoch of this process's event ids
+from collections import deque  # Replay buffer and subscriber queues
+from dataclasses import dataclass  # Events
+from typing import Dict, List, Optional, Set, Tuple  # Type hints
+import orjson  # Event payloads
+from sqlalchemy import event as sa_event  # Session hooks
+from sqlalchemy.orm import Session  # Session class for global listeners
+from app import batching  # Writes inside POST /batch are announced after its commit
+from app.config import settings  # Application settings
+
+POSTS = "posts"  # Topic of every post event
+
+POST_CREATED = "post.created"
+POST_UPDATED = "post.updated"
+POST_DELETED = "post.deleted"
+COMMENT_CREATED = "comment.created"
+COMMENT_UPDATED = "comment.updated"
+COMMENT_DELETED = "comment.deleted"
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    topics: Tuple[str, ...]
+    encoded: bytes  # The SSE frame, built once for every subscriber
+
+# Frames without an event id
+PING = b": ping\n\n"  # Keeps idle connections (and proxies) from timing out
+CLOSED = b""  # Ends a stream (subscriber dropped or the bus is closing)
+
+def frame(event_type: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\n".encode("utf-8") + b"data: " + orjson.dumps(data) + b"\n\n"
+
+# One open stream. push() runs on its event loop; a consumer that falls `max_queued` frames behind is dropped
+class Subscriber:
+    def __init__(self, topic: str, max_queued: int):
+        self.topic = topic
+        self.max_queued = max_queued
+        self.dropped = False
+        self.replayed = 0  # Last seq covered by its backlog; live copies up to it are skipped
+        self._queue: deque = deque()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def push(self, data: bytes) -> bool:
+        if self.dropped:
+            return False
+        if data is not CLOSED and len(self._queue) >= self.max_queued:
+            # The client reconnects with Last-Event-ID and catches up from the replay buffer
+            self.dropped = True
+            self._queue.clear()
+            data = CLOSED
+        self._queue.append(data)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        return not self.dropped
+
+    async def get(self) -> bytes:
+        while not self._queue:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._queue.popleft()
+
+# Subscribers of one event loop by topic; idle streams cost one parked future each (one heartbeat task per loop)
+class Hub:
+    def __init__(self):
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.heartbeat: Optional[asyncio.Task] = None
+
+    def deliver(self, data: bytes, topics: Tuple[str, ...], bus: "EventBus", seq: int = 0) -> None:
+        for topic in topics:
+            for subscriber in list(self.subscribers.get(topic, ())):
+                if seq and seq <= subscriber.replayed:
+                    continue
+                if not subscriber.push(data):
+                    bus.dropped += data is not CLOSED
+                    self.remove(subscriber)
+
+    def add(self, subscriber: Subscriber) -> None:
+        self.subscribers.setdefault(subscriber.topic, set()).add(subscriber)
+
+    def remove(self, subscriber: Subscriber) -> bool:
+        subscribers = self.subscribers.get(subscriber.topic)
+        if subscribers is None or subscriber not in subscribers:
+            return False
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.subscribers[subscriber.topic]
+        return True
+
+    def all(self) -> List[Subscriber]:
+        return [subscriber for subscribers in self.subscribers.values() for subscriber in subscribers]
+
+# Numbered events fanned out to subscribers on every event loop, with the last `replay_size` kept for resuming
+class EventBus:
+    def __init__(self, replay_size: int = 1000, max_queued: int = 100, max_subscribers: int = 10000,
+                 keepalive: float = 15):
+        self.epoch = format(int(time.time() * 1000), "x")  # Ids from another process (or before a restart) are stale
+        self.max_queued = max_queued
+        self.max_subscribers = max_subscribers  # 0 disables the stream
+        self.keepalive = keepalive
+        self._seq = 0
+        self._replay: deque = deque(maxlen=replay_size)
+        self._hubs: Dict[asyncio.AbstractEventLoop, Hub] = {}
+        self._lock = threading.Lock()
+        self.subscribers = 0
+        self.published = 0
+        self.dropped = 0
+        self.resets = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_subscribers > 0
+
+    @property
+    def full(self) -> bool:
+        return self.subscribers >= self.max_subscribers
+
+    # Thread-safe; frames reach each loop in publication order
+    def publish(self, event_type: str, topics: Tuple[str, ...], data: dict) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, topics, frame(event_type, data, f"{self.epoch}-{self._seq}"))
+            self._replay.append(event)
+            self.published += 1
+            for loop, hub in list(self._hubs.items()):
+                try:
+                    loop.call_soon_threadsafe(hub.deliver, event.encoded, topics, self, event.seq)
+                except RuntimeError:
+                    del self._hubs[loop]  # Loop closed (its streams are gone)
+
+    # Register a stream (on its event loop) and return the frames it missed since last_event_id
+    def subscribe(self, topic: str, last_event_id: Optional[str] = None) -> Tuple[Subscriber, List[bytes]]:
+        loop = asyncio.get_running_loop()
+        subscriber = Subscriber(topic, self.max_queued)
+        with self._lock:
+            hub = self._hubs.get(loop)
+            if hub is None:
+                hub = self._hubs[loop] = Hub()
+                hub.heartbeat = loop.create_task(self._heartbeat(hub))
+            hub.add(subscriber)
+            self.subscribers += 1
+            backlog = self._backlog(topic, last_event_id)
+            if last_event_id:
+                # A delivery published before this point may still be queued on the loop: it was replayed, skip it
+                subscriber.replayed = self._seq
+        return subscriber, backlog
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            hub = self._hubs.get(asyncio.get_running_loop())
+            if hub is not None:
+                hub.remove(subscriber)
+            self.subscribers -= 1
+
+    def _backlog(self, topic: str, last_event_id: Optional[str]) -> List[bytes]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        oldest = self._replay[0].seq if self._replay else self._seq + 1
+        if epoch != self.epoch or not seq.isdigit() or not oldest - 1 <= int(seq) <= self._seq:
+            # Unknown id, another process's id, or older than the buffer: the client must refetch
+            self.resets += 1
+            return [frame("reset", {"reason": "Events since Last-Event-ID are no longer available, reload."})]
+        return [event.encoded for event in self._replay if event.seq > int(seq) and topic in event.topics]
+
+    async def _heartbeat(self, hub: Hub) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive)
+            hub.deliver(PING, tuple(hub.subscribers), self)
+
+    # End every stream on the running loop (shutdown)
+    def close(self) -> None:
+        with self._lock:
+            hub = self._hubs.pop(asyncio.get_running_loop(), None)
+        if hub is None:
+            return
+        if hub.heartbeat is not None:
+            hub.heartbeat.cancel()
+        for subscriber in hub.all():
+            subscriber.push(CLOSED)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "published": self.published,
+            "last_event_id": f"{self.epoch}-{self._seq}" if self._seq else None,
+            "replay_buffered": len(self._replay),
+            "dropped": self.dropped,
+            "resets": self.resets,
+        }
+
+# The SSE body of one subscription: retry hint, missed events, then live events until dropped or closed
+async def stream(bus: EventBus, topic: str, last_event_id: Optional[str], retry_ms: int = 3000):
+    subscriber, backlog = bus.subscribe(topic, last_event_id)
+    try:
+        yield f"retry: {retry_ms}\n\n".encode("ascii")
+        for data in backlog:
+            yield data
+        while True:
+            data = await subscriber.get()
+            if data is CLOSED:
+                return
+            yield data
+    finally:
+        bus.unsubscribe(subscriber)
+
+# Payloads (same shapes as PostResponse without comments and CommentResponse)
+def user_data(user) -> dict:
+    return {"username": user.username, "email": user.email, "id": user.id}
+
+def post_data(post, author) -> dict:
+    return {
+        "title": post.title,
+        "content": post.content,
+        "id": post.id,
+        "created_at": post.created_at,
+        "author": user_data(author),
+        "comment_count": post.comment_count or 0,
+    }
+
+def comment_data(comment, commenter) -> dict:
+    return {"body": comment.body, "id": comment.id, "post_id": comment.post_id, "commenter": user_data(commenter)}
+
+def topics_for(event_type: str, post_id: int) -> Tuple[str, ...]:
+    if event_type.startswith("post."):
+        return (POSTS, post_topic(post_id))  # The post's own stream sees its edits and deletion too
+    return (post_topic(post_id),)
+
+# Announce a committed write. Called by handlers after db.commit(); inside POST /batch that commit only
+# flushed, so the event waits in the session until the batch commits (and is dropped if it rolls back).
+def emit(db: Optional[Session], event_type: str, post_id: int, data: dict) -> None:
+    if not bus.enabled:
+        return
+    if db is not None and batching.current_batch.get() is not None:
+        db.info.setdefault("pending_events", []).append((event_type, post_id, data))
+        return
+    bus.publish(event_type, topics_for(event_type, post_id), data)
+
+def watch_session_commits(bus: EventBus) -> None:
+    def after_commit(session):
+        if session.in_nested_transaction():
+            return  # A released SAVEPOINT: wait for the outer COMMIT
+        for event_type, post_id, data in session.info.pop("pending_events", ()):
+            bus.publish(event_type, topics_for(event_type, post_id), data)
+
+    def after_soft_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop("pending_events", None)
+
+    sa_event.listen(Session, "after_commit", after_commit)
+    sa_event.listen(Session, "after_soft_rollback", after_soft_rollback)
+
+# The app's bus
+bus = EventBus(settings.events_replay, settings.events_queue, settings.events_max_subscribers, settings.events_keepalive)
+if bus.enabled:
+    watch_session_commits(bus)
\ No newline at end of file
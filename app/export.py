@@ -0,0 +1,195 @@
+# -- Streaming Export of Posts with Comments --
+import csv  # CSV output
+import io  # CSV line buffer
+import json  # NDJSON output
+from collections import deque  # Posts of the current batch
+from dataclasses import dataclass, field  # Export cursor
+from typing import AsyncIterator, Deque, Iterator, List, Tuple  # Type hints
+from sqlalchemy import select  # Core statements
+from sqlalchemy.engine import Connection, Engine  # Type hints
+from sqlalchemy.ext.asyncio import AsyncEngine  # Async engine type hint
+from app import models  # Models
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["type", "id", "post_id", "title", "body", "user_id", "username", "created_at"]
+COMMENT_BATCH_SIZE = 2000  # Comments read per keyset query
+
+posts = models.Post.__table__
+comments = models.Comment.__table__
+users = models.User.__table__
+
+# Where the export stands: the current batch of posts and the last comment read for it
+@dataclass
+class ExportCursor:
+    after_id: int = 0  # Last post id of the finished batches
+    posts: Deque[dict] = field(default_factory=deque)  # Current batch, posts not written yet
+    last_id: int = 0  # Last post id of the current batch (equal to after_id between batches)
+    after_comment: Tuple[int, int] = (0, 0)  # (post_id, id) of the last comment read for the current batch
+    done: bool = False
+
+def post_record(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "content": row.content,
+        "author_id": row.author_id,
+        "author": row.username,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+def comment_page(conn: Connection, condition, limit: int) -> list:
+    return conn.execute(
+        select(comments.c.id, comments.c.post_id, comments.c.body, comments.c.commenter_id, users.c.username)
+        .select_from(comments.outerjoin(users, users.c.id == comments.c.commenter_id))
+        .where(condition)
+        .order_by(comments.c.post_id, comments.c.id)
+        .limit(limit)
+    ).all()
+
+# The next rows in export order, as ("post", record) and ("comment", record) items (a post's comments follow it).
+# A keyset page of posts (id > after_id) starts each batch; its comments are then read in keyset pages on
+# (post_id, id), so memory stays bounded however many comments one post has.
+def export_page(conn: Connection, cursor: ExportCursor, batch_size: int, comment_batch_size: int) -> List[Tuple[str, dict]]:
+    if cursor.last_id == cursor.after_id:  # No batch open: read the next posts
+        post_rows = conn.execute(
+            select(posts.c.id, posts.c.title, posts.c.content, posts.c.author_id, users.c.username, posts.c.created_at)
+            .select_from(posts.outerjoin(users, users.c.id == posts.c.author_id))
+            .where(posts.c.id > cursor.after_id)
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not post_rows:
+            cursor.done = True
+            return []
+        cursor.posts.extend(post_record(row) for row in post_rows)
+        cursor.last_id = post_rows[-1].id
+        cursor.after_comment = (post_rows[0].id, 0)
+
+    # The rest of the open post, then the next posts of the batch: two index seeks (a (post_id, id) row-value
+    # comparison would only seek on post_id and rescan a long thread from its start on every page)
+    post_id, after_id = cursor.after_comment
+    comment_rows = comment_page(conn, (comments.c.post_id == post_id) & (comments.c.id > after_id), comment_batch_size)
+    if len(comment_rows) < comment_batch_size:
+        comment_rows += comment_page(conn, comments.c.post_id.between(post_id + 1, cursor.last_id),
+                                     comment_batch_size - len(comment_rows))
+    items = []
+    for comment_id, post_id, body, commenter_id, username in comment_rows:  # Unpacked: Row attributes are slow here
+        while cursor.posts and cursor.posts[0]["id"] <= post_id:
+            items.append(("post", cursor.posts.popleft()))
+        items.append(("comment", {
+            "id": comment_id,
+            "body": body,
+            "commenter_id": commenter_id,
+            "commenter": username,
+        }))
+    if len(comment_rows) < comment_batch_size:
+        # Every comment of the batch is read: the posts left have none after this page
+        items += [("post", record) for record in cursor.posts]
+        cursor.posts.clear()
+        cursor.after_id = cursor.last_id
+    else:
+        cursor.after_comment = (comment_rows[-1].post_id, comment_rows[-1].id)
+    return items
+
+# Pages of rows in export order; each page uses its own short read so writers are never held up
+def iter_pages(engine: Engine, batch_size: int = 500, comment_batch_size: int = COMMENT_BATCH_SIZE) -> Iterator[List[Tuple[str, dict]]]:
+    cursor = ExportCursor()
+    while True:
+        with engine.connect() as conn:
+            items = export_page(conn, cursor, batch_size, comment_batch_size)
+        if cursor.done:
+            return
+        yield items
+
+async def iter_pages_async(engine: AsyncEngine, batch_size: int = 500,
+                           comment_batch_size: int = COMMENT_BATCH_SIZE) -> AsyncIterator[List[Tuple[str, dict]]]:
+    cursor = ExportCursor()
+    while True:
+        async with engine.connect() as conn:
+            items = await conn.run_sync(export_page, cursor, batch_size, comment_batch_size)
+        if cursor.done:
+            return
+        yield items
+
+def dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+# One line per post with its comments nested; a line is written piece by piece as its comments are read
+class NDJSONWriter:
+    def __init__(self):
+        self.comments = None  # Comments written on the open line, None when no line is open
+
+    def write(self, items: List[Tuple[str, dict]]) -> str:
+        parts = []
+        run = []  # Consecutive comments, encoded as one list
+        for kind, record in items:
+            if kind == "post":
+                parts.append(self.flush(run))
+                parts.append(self.close())
+                parts.append(dumps({**record, "comments": []})[:-2])  # Open line, ends with "comments":[
+                self.comments = 0
+            else:
+                run.append(record)
+        parts.append(self.flush(run))
+        return "".join(parts)
+
+    def flush(self, run: List[dict]) -> str:
+        if not run:
+            return ""
+        text = ("," if self.comments else "") + dumps(run)[1:-1]
+        self.comments += len(run)
+        run.clear()
+        return text
+
+    def close(self) -> str:
+        if self.comments is None:
+            return ""
+        self.comments = None
+        return "]}\n"
+
+# One row per post followed by one row per comment
+class CSVWriter:
+    def __init__(self):
+        self.post_id = None  # Post the following comment rows belong to
+
+    def write(self, items: List[Tuple[str, dict]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for kind, record in items:
+            if kind == "post":
+                self.post_id = record["id"]
+                writer.writerow(["post", record["id"], record["id"], record["title"], record["content"],
+                                 record["author_id"], record["author"], record["created_at"]])
+            else:
+                writer.writerow(["comment", record["id"], self.post_id, "", record["body"],
+                                 record["commenter_id"], record["commenter"], ""])
+        return buffer.getvalue()
+
+    def close(self) -> str:
+        return ""
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue()
+
+def make_writer(fmt: str):
+    return CSVWriter() if fmt == "csv" else NDJSONWriter()
+
+# Encoded output, one chunk per page, produced as the pages are read
+def iter_export(engine: Engine, fmt: str = "ndjson", batch_size: int = 500) -> Iterator[str]:
+    if fmt == "csv":
+        yield csv_header()
+    writer = make_writer(fmt)
+    for items in iter_pages(engine, batch_size):
+        yield writer.write(items)
+    yield writer.close()
+
+async def iter_export_async(engine: AsyncEngine, fmt: str = "ndjson", batch_size: int = 500) -> AsyncIterator[str]:
+    if fmt == "csv":
+        yield csv_header()
+    writer = make_writer(fmt)
+    async for items in iter_pages_async(engine, batch_size):
+        yield writer.write(items)
+    yield writer.close()
\ No newline at end of file
@@ -0,0 +1,383 @@
+# -- Front-Page Feed: the Newest Posts Kept in Memory, Pre-Serialized --
+import logging  # Failed refreshes
+import threading  # Writes commit on many threads
+from dataclasses import dataclass, field  # Entries and pending changes
+from typing import Dict, List, Optional, Set, Tuple  # Type hints
+import orjson  # Pre-serialized entries
+from sqlalchemy import event, inspect  # Session write hooks, moved comments
+from sqlalchemy.orm import Session  # Session class for global listeners
+from sqlalchemy.orm.attributes import set_committed_value  # Edited posts keep their serialized comments
+from app import loaders, models, pagination, projections, schemas  # Loading, ordering and serializing posts
+from app.config import settings  # Application settings
+from app.database import ReadSessionLocal  # Refreshes read committed rows on a reader connection
+
+logger = logging.getLogger("app.feed")
+
+@dataclass(frozen=True)
+class FeedEntry:
+    key: Tuple[str, int]  # (raw created_at, id): the listing order, compared like the keyset cursor
+    data: dict  # PostResponse with its first (oldest) comments, at most the feed's `comments`, as JSON-ready values
+    body: bytes  # The same, encoded
+
+    # Whether the entry can answer a request embedding up to `comments_limit` comments (None: all of them)
+    def holds(self, comments_limit: Optional[int]) -> bool:
+        kept = len(self.data["comments"])
+        return kept >= self.data["comment_count"] or (comments_limit is not None and comments_limit <= kept)
+
+# The entries as of the `version`-th committed change (swapped as one object, so readers never need a lock)
+@dataclass(frozen=True)
+class FeedSnapshot:
+    entries: Tuple[FeedEntry, ...]
+    complete: bool  # The entries are every post in the database
+    version: int
+
+# What a committed transaction may have changed
+@dataclass
+class FeedChanges:
+    created: Set[int] = field(default_factory=set)  # New posts (read whole)
+    posts: Set[int] = field(default_factory=set)  # Edited or deleted posts (post row only, comments are kept)
+    comments: Dict[int, Set[int]] = field(default_factory=dict)  # post id -> new, edited or deleted comment ids
+    everything: bool = False  # A username or email changed: authors and commenters are embedded in every entry
+
+    def comment(self, post_id: Optional[int], comment_id: int) -> None:
+        if post_id is not None:
+            self.comments.setdefault(post_id, set()).add(comment_id)
+
+    # Post ids whose entries the changes touch
+    def touched(self) -> Set[int]:
+        return self.created | self.posts | self.comments.keys()
+
+    def merge(self, other: "FeedChanges") -> None:
+        self.created |= other.created
+        self.posts |= other.posts
+        for post_id, ids in other.comments.items():
+            self.comments.setdefault(post_id, set()).update(ids)
+        self.everything = self.everything or other.everything
+
+# The newest `capacity` posts, newest first, each with at most `comments` comments. Commits only record what they
+# touched; a worker thread then patches just that (a post row, a post's first comments, rows to refill the tail
+# after deletes). GET /posts pages that fit inside an up-to-date snapshot are served without any SQL.
+class FrontPageFeed:
+    def __init__(self, capacity: int, comments: int = 20, session_factory=ReadSessionLocal):
+        self.capacity = capacity  # 0 disables the feed
+        self.comments = comments  # Comments kept per entry; pages asking for more of a post's comments read SQL
+        self.session_factory = session_factory
+        self._state: Optional[FeedSnapshot] = None  # None until loaded
+        self._lock = threading.Lock()  # One refresh at a time, so the last snapshot stored is the last one read
+        # Guards the fields below; commits hold it only to record their changes
+        self._changed = threading.Condition()
+        self._pending: Optional[FeedChanges] = None  # Committed, not applied yet
+        self._version = 0  # Committed changes recorded so far; a snapshot behind it is not served
+        self._tracked: Optional[Set[int]] = None  # Post ids whose writes matter (None: all, while a refresh runs)
+        self._watching = False  # Writes are recorded once the first load starts
+        self._busy = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._reload = False  # Set when a refresh failed: the next write reloads the whole feed
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.loads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    # Read the newest posts (startup, after bulk imports and after a failed refresh)
+    def load(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        with self._changed:
+            version = self._version  # Everything committed so far is in the read below
+            self._watching = True
+            self._pending = None
+            self._tracked = None
+        with self.session_factory() as db:
+            entries, complete = self._read_after(db, None, self.capacity)
+        self._publish(entries, complete, version)
+        self._reload = False
+        self.loads += 1
+
+    # Rows [start, start + take) and the next-page cursor, or None when the page reaches past the feed, a commit is
+    # not applied yet, or a post on the page has more of the `comments_limit` comments than its entry keeps
+    def page(self, page: int, take: int, comments_limit: Optional[int] = None) -> Optional[Tuple[List[FeedEntry], Optional[str]]]:
+        state = self._state
+        start = (page - 1) * take
+        end = start + take
+        # Unless the feed holds every post, the row after the page must be in memory too (it decides the cursor)
+        if state is None or state.version != self._version or (not state.complete and end >= len(state.entries)):
+            self.misses += 1
+            return None
+        rows = list(state.entries[start:end])
+        if not all(entry.holds(comments_limit) for entry in rows):
+            self.misses += 1
+            return None
+        self.hits += 1
+        cursor = pagination.encode_cursor(*rows[-1].key) if len(state.entries) > end else None
+        return rows, cursor
+
+    # Called after each commit: queue the changes for the worker (pages miss until it has applied them)
+    def record(self, changes: FeedChanges) -> None:
+        with self._changed:
+            tracked = self._tracked
+            if not self._watching:
+                return  # Never loaded: the first load reads everything
+            if not (changes.everything or changes.created or tracked is None or changes.touched() & tracked):
+                return  # Only posts outside the feed changed
+            if self._pending is None:
+                self._pending = FeedChanges()
+            self._pending.merge(changes)
+            if tracked is not None:
+                tracked |= changes.created
+            self._version += 1
+            self._changed.notify_all()
+        self.start()
+
+    # Started on first write so scripts importing the app never spawn it
+    def start(self) -> None:
+        with self._changed:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="feed-refresh", daemon=True)
+                self._thread.start()
+
+    # Apply everything already recorded, then stop
+    def stop(self) -> None:
+        with self._changed:
+            thread = self._thread
+            self._thread = None
+            self._stopping = True
+            self._changed.notify_all()
+        if thread is not None:
+            thread.join()
+
+    # Block until every recorded change is applied (tests); False on timeout
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        with self._changed:
+            return self._changed.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._pending is not None or self._stopping)
+                if self._pending is None:
+                    return
+                changes, version = self._pending, self._version
+                self._pending = None
+                self._tracked = None  # Posts can enter the feed during the refresh: record every write meanwhile
+                self._busy = True
+            try:
+                self.apply(changes, version)
+            except Exception:
+                logger.exception("Front-page feed refresh failed, serving from the database until it reloads")
+                self.drop()
+            finally:
+                with self._changed:
+                    self._busy = False
+                    self._changed.notify_all()
+
+    # Apply committed changes (up to the `version`-th) to the posts in the feed, and take in the new posts
+    def apply(self, changes: FeedChanges, version: int) -> None:
+        with self._lock:
+            if self._state is None:
+                if self._reload:
+                    self._load()
+                return
+            if changes.everything or len(changes.created) >= self.capacity:
+                self._load()  # Renamed users appear everywhere; generate-test-posts replaces the whole feed
+                return
+            entries, complete = self._state.entries, self._state.complete
+            by_id = {entry.key[1]: entry for entry in entries}
+            edited = (changes.posts & by_id.keys()) - changes.created
+            commented = {post_id: ids for post_id, ids in changes.comments.items() if post_id in by_id}
+            if not changes.created and not edited and not commented:
+                self._publish(entries, complete, version)
+                return
+
+            with self.session_factory() as db:
+                # Edited posts: new post row, same comments; deleted posts: gone
+                if edited:
+                    rows = {row.Post.id: row for row in self._query(db).filter(models.Post.id.in_(edited))}
+                    for post_id in edited:
+                        row = rows.get(post_id)
+                        if row is None:
+                            del by_id[post_id]
+                        else:
+                            set_committed_value(row.Post, "comments", [])
+                            by_id[post_id] = entry_for(row.sort_key, row.Post.id, {
+                                **schemas.PostResponse.model_validate(row.Post).model_dump(mode="json"),
+                                "comments": by_id[post_id].data["comments"],
+                            })
+                # Commented posts: the new count, and the first comments again when one of them changed
+                commented = {post_id: ids for post_id, ids in commented.items() if post_id in by_id}
+                if commented:
+                    self._patch_comments(db, by_id, commented)
+
+                # New posts are newer than the tail; anything older only belongs when the feed holds every post
+                floor = entries[-1].key if entries else None
+                merged = list(by_id.values())
+                if changes.created:
+                    fresh = self._entries(db, self._query(db).filter(models.Post.id.in_(changes.created)).all())
+                    merged += [entry for entry in fresh if complete or floor is None or entry.key >= floor]
+                merged.sort(key=lambda entry: entry.key, reverse=True)
+                if len(merged) > self.capacity:
+                    merged = merged[:self.capacity]
+                    complete = False
+                elif not complete and len(merged) < self.capacity:
+                    # Deleted posts left room: refill from the rows right after the tail
+                    tail = merged[-1].key if merged else None
+                    older, complete = self._read_after(db, tail, self.capacity - len(merged))
+                    merged += older
+            self._publish(merged, complete, version)
+            self.refreshes += 1
+
+    # Store a snapshot and track the writes that can change it from now on
+    def _publish(self, entries: List[FeedEntry], complete: bool, version: int) -> None:
+        with self._changed:
+            # A bulk import may have reloaded the feed while the worker read older changes
+            version = max(version, self._state.version if self._state else 0)
+            self._state = FeedSnapshot(tuple(entries), complete, version)
+            self._tracked = {entry.key[1] for entry in entries}
+            if self._pending is not None:
+                self._tracked |= self._pending.touched()
+
+    # New counts for each post; its kept comments are re-read unless the changes all fall after a full entry
+    def _patch_comments(self, db: Session, by_id: Dict[int, FeedEntry], commented: Dict[int, Set[int]]) -> None:
+        counts = dict(db.query(models.Post.id, models.Post.comment_count).filter(models.Post.id.in_(commented)).all())
+        reread = []
+        for post_id, ids in commented.items():
+            if post_id not in counts:
+                del by_id[post_id]  # Deleted meanwhile
+                continue
+            kept = by_id[post_id].data["comments"]
+            if self.comments and (len(kept) < self.comments or min(ids) <= kept[-1]["id"]):
+                reread.append(post_id)
+            by_id[post_id] = entry_for(by_id[post_id].key[0], post_id, {**by_id[post_id].data, "comment_count": counts[post_id]})
+        if not reread:
+            return
+        comments = {post_id: [] for post_id in reread}
+        for row in loaders.comments_query(db, reread, self.comments):
+            comments[row.post_id].append(schemas.CommentResponse.model_validate(row).model_dump(mode="json"))
+        for post_id, kept in comments.items():
+            entry = by_id[post_id]
+            by_id[post_id] = entry_for(entry.key[0], post_id, {**entry.data, "comments": kept})
+
+    # Up to `limit` posts after `key` (newest first), and whether that reached the oldest post
+    def _read_after(self, db: Session, key: Optional[Tuple[str, int]], limit: int) -> Tuple[List[FeedEntry], bool]:
+        query = self._query(db).order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        if key is not None:
+            query = query.filter(pagination.after_cursor(models.Post.created_at, models.Post.id, pagination.encode_cursor(*key)))
+        rows = query.limit(limit + 1).all()
+        return self._entries(db, rows[:limit]), len(rows) <= limit
+
+    @staticmethod
+    def _query(db: Session):
+        return db.query(models.Post, pagination.sort_key(models.Post.created_at)).options(*loaders.post_options())
+
+    def _entries(self, db: Session, rows) -> List[FeedEntry]:
+        loaders.load_comments(db, [row.Post for row in rows], limit=self.comments)
+        return [entry_for(row.sort_key, row.Post.id, schemas.PostResponse.model_validate(row.Post).model_dump(mode="json"))
+                for row in rows]
+
+    # A failed refresh drops the feed (reads use the database) until the next write reloads it
+    def drop(self) -> None:
+        self._state = None
+        self._reload = True
+
+    def stats(self) -> dict:
+        state = self._state
+        return {
+            "capacity": self.capacity,
+            "comments": self.comments,
+            "entries": len(state.entries) if state else 0,
+            "complete": state.complete if state else False,
+            "pending": self._version - state.version if state else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "loads": self.loads,
+        }
+
+def entry_for(sort_key: str, post_id: int, data: dict) -> FeedEntry:
+    return FeedEntry(key=(sort_key, post_id), data=data, body=orjson.dumps(data))
+
+# A full PostResponse page, comments capped per post like loaders.load_comments (page() checked the entries hold them)
+def render(rows: List[FeedEntry], comments_limit: Optional[int] = None) -> bytes:
+    if comments_limit is None:
+        return b"[" + b",".join(entry.body for entry in rows) + b"]"
+    return orjson.dumps([{**entry.data, "comments": entry.data["comments"][:comments_limit]} for entry in rows])
+
+# The same items projections.build_items makes from SQL rows
+def project(rows: List[FeedEntry], projection: projections.Projection, comments_limit: Optional[int] = None) -> List[dict]:
+    items = []
+    for entry in rows:
+        item = {}
+        for name in projection.fields:
+            if name == "comments":
+                item["comments"] = entry.data["comments"][:comments_limit]
+            elif name == "snippet":
+                item["snippet"] = None  # Only search results have snippets
+            elif name.startswith("author."):
+                attribute = name.split(".", 1)[1]
+                item.setdefault("author", {})[attribute] = entry.data["author"][attribute]
+            else:
+                item[name] = entry.data[name]
+        items.append(item)
+    return items
+
+# Post ids a flush wrote to (collected after the flush, when new rows have their ids)
+def changes_for_flush(session: Session, changes: FeedChanges) -> None:
+    for obj in session.new:
+        if isinstance(obj, models.Post):
+            changes.created.add(obj.id)
+        elif isinstance(obj, models.Comment):
+            changes.comment(obj.post_id, obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, models.Post):
+            changes.posts.add(obj.id)
+        elif isinstance(obj, models.Comment):
+            for post_id in {obj.post_id, *inspect(obj).attrs.post_id.history.deleted}:
+                changes.comment(post_id, obj.id)  # Both posts when a comment moved
+        elif isinstance(obj, models.User):
+            # Only the embedded fields matter: a password rehash at login must not reload the feed
+            state = inspect(obj)
+            if state.attrs.username.history.has_changes() or state.attrs.email.history.has_changes():
+                changes.everything = True
+    for obj in session.deleted:
+        if isinstance(obj, models.Post):
+            changes.posts.add(obj.id)
+        elif isinstance(obj, models.Comment):
+            changes.comment(obj.post_id, obj.id)
+        elif isinstance(obj, models.User):
+            changes.everything = True
+
+# Queue a feed update after every successful commit made through an ORM session (sync, async, batch, group commit)
+def watch_session_writes(feed: FrontPageFeed) -> None:
+    def after_flush(session, flush_context):
+        changes_for_flush(session, session.info.setdefault("feed_changes", FeedChanges()))
+
+    def after_commit(session):
+        if session.in_nested_transaction():
+            return  # A released SAVEPOINT (POST /batch): nothing is visible until the outer COMMIT
+        changes = session.info.pop("feed_changes", None)
+        if changes is not None:
+            feed.record(changes)  # The worker thread applies it; the commit never waits for a refresh
+
+    # Only a rollback of the whole transaction discards them: after a SAVEPOINT rollback (POST /batch) the
+    # remaining changes still commit, and re-reading a post that was rolled back is harmless
+    def after_soft_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop("feed_changes", None)
+
+    event.listen(Session, "after_flush", after_flush)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_soft_rollback", after_soft_rollback)
+
+# The app's feed (loaded by the lifespan)
+front_page = FrontPageFeed(settings.feed_size, settings.feed_comments)
+if front_page.enabled:
+    watch_session_writes(front_page)
\ No newline at end of file
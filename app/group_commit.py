@@ -0,0 +1,155 @@
+# -- Group Commit: One Writer Thread Inserting Posts and Comments from Many Requests per Transaction --
+import asyncio  # For awaiting insert futures
+import logging  # Failed batches
+import queue  # Pending inserts
+import threading  # The writer thread
+import time  # Collection window
+from concurrent.futures import Future  # Resolved once the row is committed
+from dataclasses import dataclass, field  # Pending inserts
+from typing import List, Optional, Type  # Type hints
+from sqlalchemy import select  # Post existence checks
+from sqlalchemy.engine import Engine  # Engine type hint
+from sqlalchemy.orm import sessionmaker  # Writer sessions
+from app import batching, models  # Batches keep their own transaction, models
+from app.config import settings  # Application settings
+from app.database import engine  # The writer engine
+
+logger = logging.getLogger("app.group_commit")
+
+STOP = object()  # Queue sentinel
+
+# A comment for a post that does not exist (checked inside the writing transaction)
+class PostNotFound(Exception):
+    def __init__(self, post_id: int):
+        super().__init__(post_id)
+        self.post_id = post_id
+
+@dataclass
+class PendingInsert:
+    model: Type
+    values: dict
+    future: Future = field(default_factory=Future)
+
+# Collects inserts for up to `window` seconds or `max_batch` rows and commits them together, so concurrent
+# requests share one transaction (and one fsync). A request is answered only after its row is committed.
+class GroupCommitWriter:
+    def __init__(self, engine: Engine, window_ms: float = 2, max_batch: int = 128):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # Session events still fire (cache invalidation); ids and created_at come back through INSERT ... RETURNING
+        self.session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.transactions = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.failed_batches = 0
+
+    # Started on first use so scripts importing the app never spawn it
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self._thread.start()
+
+    # Finish everything already queued, then stop
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(STOP)
+            thread.join()
+
+    def submit(self, model: Type, **values) -> Future:
+        self.start()
+        pending = PendingInsert(model, values)
+        self._queue.put(pending)
+        return pending.future
+
+    # Blocking API for sync routes; returns the committed (detached) object
+    def insert(self, model: Type, **values):
+        return self.submit(model, **values).result()
+
+    # Awaitable API for async routes
+    async def insert_async(self, model: Type, **values):
+        return await asyncio.wrap_future(self.submit(model, **values))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is STOP:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: List[PendingInsert]) -> None:
+        session = self.session_factory()
+        accepted = []
+        try:
+            # Comments need their post; one lookup covers the whole batch
+            post_ids = {item.values["post_id"] for item in batch if item.model is models.Comment}
+            existing = set(session.scalars(select(models.Post.id).where(models.Post.id.in_(post_ids)))) if post_ids else set()
+            for item in batch:
+                if item.model is models.Comment and item.values["post_id"] not in existing:
+                    item.future.set_exception(PostNotFound(item.values["post_id"]))
+                    continue
+                row = item.model(**item.values)
+                session.add(row)
+                accepted.append((item, row))
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            self.failed_batches += 1
+            if len(batch) > 1:
+                # Retry one by one so a single bad row does not fail its neighbours
+                logger.warning("Group commit of %d rows failed (%s), retrying individually", len(batch), exc)
+                for item in batch:
+                    if not item.future.done():
+                        self._write([item])
+            elif not batch[0].future.done():
+                batch[0].future.set_exception(exc)
+            return
+        finally:
+            session.close()
+
+        self.transactions += 1
+        self.rows += len(accepted)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for item, row in accepted:
+            item.future.set_result(row)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "transactions": self.transactions,
+            "rows": self.rows,
+            "rows_per_transaction": round(self.rows / self.transactions, 2) if self.transactions else 0.0,
+            "largest_batch": self.largest_batch,
+            "failed_batches": self.failed_batches,
+        }
+
+# The app's writer
+group_writer = GroupCommitWriter(engine, settings.group_commit_window_ms, settings.group_commit_max_batch)
+
+# Group commit applies to plain requests; inside POST /batch the batch's transaction owns the insert
+def enabled() -> bool:
+    return settings.group_commit and batching.current_batch.get() is None
\ No newline at end of file
@@ -0,0 +1,170 @@
+# -- Streaming NDJSON Bulk Import --
+import json  # Parsing lines
+from dataclasses import dataclass, field  # Import state
+from typing import AsyncIterator, Dict, List, Optional, Tuple  # Type hints
+from pydantic import ValidationError  # Per-line validation errors
+from sqlalchemy import insert, select  # Core statements
+from sqlalchemy.engine import Connection  # Connection type hint
+from app import models, schemas  # Models and schemas
+
+MAX_LINE_BYTES = 1024 * 1024  # Longest accepted line; keeps a malformed upload from buffering forever
+MAX_REPORTED_ERRORS = 1000  # Errors listed in the report (the rest are only counted)
+
+posts_table = models.Post.__table__
+comments_table = models.Comment.__table__
+
+# Split a byte stream into numbered lines while holding at most one partial line in memory.
+# Each chunk is split once; only its trailing piece is kept (as a list, so long lines are not re-copied).
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    partial: List[bytes] = []  # Start of the line the last chunk ended in
+    partial_size = 0
+    line_no = 0
+    skipping = False  # Inside an over-long line that was already reported
+    async for chunk in chunks:
+        *complete, tail = chunk.split(b"\n")
+        for piece in complete:
+            if skipping:
+                skipping = False  # End of the over-long line, already counted
+                continue
+            line = b"".join(partial) + piece if partial else piece
+            partial, partial_size = [], 0
+            line_no += 1
+            yield line_no, line
+        if skipping or not tail:
+            continue  # The remainder of an over-long line is dropped
+        partial.append(tail)
+        partial_size += len(tail)
+        if partial_size > MAX_LINE_BYTES:
+            line_no += 1
+            yield line_no, None  # Too long: reported once
+            partial, partial_size = [], 0
+            skipping = True
+    line = b"".join(partial)
+    if line.strip() and not skipping:
+        yield line_no + 1, line
+
+@dataclass
+class ImportReport:
+    lines: int = 0
+    posts: int = 0
+    comments: int = 0
+    error_count: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def error(self, line_no: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "success": self.error_count == 0,
+            "lines": self.lines,
+            "posts": self.posts,
+            "comments": self.comments,
+            "error_count": self.error_count,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+# Validated rows waiting for the next executemany
+@dataclass
+class ImportBatch:
+    posts: List[Tuple[int, Optional[str], dict]] = field(default_factory=list)  # (line, ref, row)
+    comments: List[Tuple[int, dict]] = field(default_factory=list)  # (line, row with post_id or post_ref)
+
+    def __len__(self) -> int:
+        return len(self.posts) + len(self.comments)
+
+# Short message for a pydantic error
+def describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'line'}: {item['msg']}" for item in error.errors()
+    )
+
+# Validate one line and add it to the batch (errors go to the report)
+def parse_line(line_no: int, line: Optional[bytes], user_id: int, batch: ImportBatch, report: ImportReport) -> None:
+    if line is None:
+        report.lines += 1
+        report.error(line_no, f"Line longer than {MAX_LINE_BYTES} bytes")
+        return
+    if not line.strip():
+        return  # Blank lines are allowed between records
+    report.lines += 1
+
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        report.error(line_no, f"Invalid JSON: {exc}")
+        return
+    if not isinstance(record, dict):
+        report.error(line_no, "Each line must be a JSON object")
+        return
+
+    kind = record.get("type")
+    try:
+        if kind == "post":
+            post = schemas.PostCreate.model_validate(record)
+            ref = record.get("ref")
+            batch.posts.append((line_no, None if ref is None else str(ref), {
+                "title": post.title, "content": post.content, "author_id": user_id
+            }))
+        elif kind == "comment":
+            comment = schemas.CommentCreate.model_validate(record)
+            post_id, post_ref = record.get("post_id"), record.get("post_ref")
+            if post_ref is not None:
+                target = {"post_ref": str(post_ref)}
+            elif isinstance(post_id, int) and not isinstance(post_id, bool):
+                target = {"post_id": post_id}
+            else:
+                report.error(line_no, "Comments need an integer post_id or a post_ref")
+                return
+            batch.comments.append((line_no, {"body": comment.body, "commenter_id": user_id, **target}))
+        else:
+            report.error(line_no, "type must be 'post' or 'comment'")
+    except ValidationError as exc:
+        report.error(line_no, describe(exc))
+
+# Insert a batch in one transaction: posts first (so refs resolve), then comments, each as one executemany.
+# Returns the post ids whose comment lists changed.
+def write_batch(conn: Connection, batch: ImportBatch, refs: Dict[str, int], report: ImportReport) -> set:
+    if batch.posts:
+        rows = [row for _, _, row in batch.posts]
+        if any(ref is not None for _, ref, _ in batch.posts):
+            # RETURNING keeps parameter order, so each ref maps to its new id
+            statement = insert(posts_table).returning(posts_table.c.id, sort_by_parameter_order=True)
+            ids = conn.execute(statement, rows).scalars().all()
+            for (_, ref, _), post_id in zip(batch.posts, ids):
+                if ref is not None:
+                    refs[ref] = post_id
+        else:
+            conn.execute(insert(posts_table), rows)
+        report.posts += len(rows)
+
+    touched = set()
+    if batch.comments:
+        # Resolve refs, then check explicit post ids with one IN query
+        wanted = {row["post_id"] for _, row in batch.comments if "post_id" in row}
+        existing = set()
+        if wanted:
+            existing = set(conn.execute(select(posts_table.c.id).where(posts_table.c.id.in_(wanted))).scalars())
+
+        rows = []
+        for line_no, row in batch.comments:
+            if "post_ref" in row:
+                post_id = refs.get(row["post_ref"])
+                if post_id is None:
+                    report.error(line_no, f"Unknown post_ref {row['post_ref']!r}")
+                    continue
+            else:
+                post_id = row["post_id"]
+                if post_id not in existing:
+                    report.error(line_no, f"Post with id {post_id} not found!")
+                    continue
+            rows.append({"body": row["body"], "post_id": post_id, "commenter_id": row["commenter_id"]})
+            touched.add(post_id)
+
+        if rows:
+            conn.execute(insert(comments_table), rows)
+            report.comments += len(rows)
+    return touched
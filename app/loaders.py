@@ -0,0 +1,46 @@
+# -- Loader Strategies for Serializing Posts and Comments --
+from sqlalchemy import func, select  # For the per-post comment window
+from sqlalchemy.orm import Session, joinedload  # Session type hint and eager loading
+from sqlalchemy.orm.attributes import set_committed_value  # Populate relationships without lazy loads
+from typing import Optional, Sequence  # Type hints
+from app import models  # Models
+
+# Options for post queries whose results are serialized as PostResponse (author rides along in the same SELECT)
+def post_options():
+    return (joinedload(models.Post.author),)
+
+# Options for comment queries whose results are serialized as CommentResponse
+def comment_options():
+    return (joinedload(models.Comment.commenter),)
+
+# Comments of several posts in one SELECT, optionally capped per post
+def comments_query(db: Session, post_ids: Sequence[int], limit: Optional[int] = None):
+    query = db.query(models.Comment).options(*comment_options())
+
+    if limit is None:
+        query = query.filter(models.Comment.post_id.in_(post_ids))
+    else:
+        # Number each post's comments oldest first and keep the first `limit` of them
+        ranked = select(
+            models.Comment.id,
+            func.row_number().over(
+                partition_by=models.Comment.post_id,
+                order_by=models.Comment.id
+            ).label("position")
+        ).where(models.Comment.post_id.in_(post_ids)).subquery()
+        query = query.join(ranked, ranked.c.id == models.Comment.id).filter(ranked.c.position <= limit)
+    return query.order_by(models.Comment.post_id, models.Comment.id)
+
+# Attach comments (and their commenters) to every post in one SELECT, optionally capped per post
+def load_comments(db: Session, posts: Sequence[models.Post], limit: Optional[int] = None) -> None:
+    if not posts:
+        return
+
+    by_post = {post.id: [] for post in posts}
+    if limit != 0:
+        for comment in comments_query(db, list(by_post), limit):
+            by_post[comment.post_id].append(comment)
+
+    # Mark the collections as loaded so serialization never triggers a lazy load
+    for post in posts:
+        set_committed_value(post, "comments", by_post[post.id])
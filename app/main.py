@@ -1,27 +1,184 @@
 # -- FastAPI Instance and Routes --
-from app import models, database  # Models and database functionality
+from app import database, migrations, search  # Database, schema migrations and search functionality
+from app import events, feed, group_commit, metrics, response_cache  # Event bus, front-page feed, group-commit writer, instrumentation and the ETag cache for post and comment reads
+from app import rate_limit, request_context, slow_queries  # Admission control, calling route for engine events, slow-query log
+from app.auth import password_hasher, token_store  # For background token expiry and the bcrypt pool
+from app.config import Settings, settings as default_settings  # Application settings
+import time  # Startup timings
+from contextlib import asynccontextmanager  # For the lifespan handler
+from typing import Optional  # Settings override
 from fastapi import FastAPI  # Core app
+from fastapi.responses import ORJSONResponse  # Faster JSON encoding
 from fastapi.middleware.cors import CORSMiddleware  # For CORS
-from .routers import posts, users, comments, auth  # For including routers
-
-# Create all tables if not existing
-models.Base.metadata.create_all(bind=database.engine)
-print(f"✅ Database tables created at: {database.DB_URL}")
-
-# Create FastAPI instance
-app = FastAPI()
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,  # CORS configuration
-    allow_origins=["http://localhost:8000", "http://127.0.0.1:8000"],  # List of allowed URLs
-    allow_credentials=True,  # Allows cookies and authentication headers
-    allow_methods=["*"],  # Allows all HTTP methods
-    allow_headers=["*"]  # Accepts all request headers
-)
-
-# Setup routers
-app.include_router(posts.router)
-app.include_router(users.router)
-app.include_router(comments.router)
-app.include_router(auth.router)
\ No newline at end of file
+from starlette.concurrency import run_in_threadpool  # Blocking startup work off the event loop
+from .routers import posts, users, comments, auth, batch, bulk, stats  # For including routers
+from .routers import events as events_router  # GET /events
+from .routers import metrics as metrics_router  # GET /metrics
+from .routers import async_posts, async_users, async_comments, async_auth  # Async mode routers
+
+# Bring the schema up to date (versioned migrations; missing indexes are added in place)
+def prepare_database() -> None:
+    applied, plan_results = migrations.migrate(database.engine)
+    for migration in applied:
+        print(f"✅ Applied migration {migration.version}: {migration.name}")
+    print(f"✅ Database schema at version {migrations.LATEST_VERSION}: {database.DB_URL}")
+
+    # New indexes must show up in the plans of the queries they were added for
+    for result in plan_results:
+        if not result.ok:
+            print(f"⚠️ {result.check.name} does not use {result.check.index}: {' | '.join(result.plan)}")
+
+    if search.fts_enabled:
+        print("✅ Full-text search index ready")
+    else:
+        print("⚠️ FTS5 unavailable, search falls back to ILIKE scans")
+
+# Startup runs before uvicorn accepts connections, so a worker only reports ready once it is warm
+def build_lifespan(settings: Settings):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        started = time.perf_counter()
+        timings = {}
+
+        step = time.perf_counter()
+        await run_in_threadpool(prepare_database)
+        timings["migrations_ms"] = (time.perf_counter() - step) * 1000
+
+        step = time.perf_counter()
+        await run_in_threadpool(feed.front_page.load)  # Newest posts for the first pages of GET /posts
+        timings["feed_ms"] = (time.perf_counter() - step) * 1000
+
+        step = time.perf_counter()
+        await run_in_threadpool(database.warm_up)  # Pragmas and first page reads on every pooled connection
+        if settings.async_db:
+            await database.warm_up_async()
+        await run_in_threadpool(password_hasher.warm_up)  # bcrypt threads (or processes) already running
+        timings["warm_up_ms"] = (time.perf_counter() - step) * 1000
+
+        token_store.start_sweeper(settings.token_sweep_interval)  # Expired tokens are removed even if never presented again
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
+        app.state.startup = {name: round(value, 1) for name, value in timings.items()}
+        print(f"✅ Ready in {timings['total_ms']:.0f} ms")
+        yield
+        events.bus.close()  # Open event streams end instead of holding the shutdown
+        token_store.stop_sweeper()
+        group_commit.group_writer.stop()  # Queued inserts are committed and answered before shutdown
+        feed.front_page.stop()
+        password_hasher.shutdown()
+    return lifespan
+
+# Build the app: middleware and routers per settings. Engines, the token store, the bcrypt pool and the
+# group-commit writer are process-wide and configured from BLOG_* when app.database and app.auth are imported.
+# Nothing touches the database until the lifespan starts (also: uvicorn --factory app.main:create_app).
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or default_settings
+    # Create FastAPI instance
+    app = FastAPI(lifespan=build_lifespan(settings), default_response_class=ORJSONResponse)  # orjson encodes every JSON response
+
+    # Cache serialized reads (added before CORS so CORS headers are computed per request)
+    read_cache = response_cache.ResponseCache(settings.response_cache_entries, settings.response_cache_bytes)
+    response_cache.watch_session_writes(read_cache)
+    app.add_middleware(response_cache.ResponseCacheMiddleware, cache=read_cache)
+    app.state.read_cache = read_cache
+    app.state.startup = None
+
+    # Throttle clients over their budget and shed load past the in-flight caps (inside CORS so browsers can read the 429/503)
+    limiter = None
+    if settings.rate_limit:
+        limiter = rate_limit.RateLimiter(
+            budgets={
+                rate_limit.READ: rate_limit.Budget(*settings.rate_limit_read),
+                rate_limit.WRITE: rate_limit.Budget(*settings.rate_limit_write),
+                rate_limit.LOGIN: rate_limit.Budget(*settings.rate_limit_login),
+            },
+            ip_factor=settings.rate_limit_ip_factor,
+            max_keys=settings.rate_limit_keys
+        )
+    admission = rate_limit.AdmissionControl(
+        limiter, settings.max_in_flight, settings.max_writes_in_flight, settings.load_shed_retry_after,
+        long_lived=(events_router.router.prefix,))
+    app.add_middleware(rate_limit.AdmissionMiddleware, control=admission)
+    app.state.admission = admission
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,  # CORS configuration
+        allow_origins=["http://localhost:8000", "http://127.0.0.1:8000"],  # List of allowed URLs
+        allow_credentials=True,  # Allows cookies and authentication headers
+        allow_methods=["*"],  # Allows all HTTP methods
+        allow_headers=["*"],  # Accepts all request headers
+        expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"]  # Lets browsers read the pagination cursor, validators and timings
+    )
+
+    # Instrumentation (added last so it is outermost and also times cached responses)
+    if settings.metrics_enabled:
+        app_metrics = metrics.Metrics()
+        for role, engine in database.engine_roles():
+            app_metrics.watch_engine(engine, role)
+        app_metrics.gauge("threadpool_threads_busy", "Worker threads running sync routes and dependencies.",
+                          lambda: metrics.threadpool_stats()[0])
+        app_metrics.gauge("threadpool_threads_total", "Worker thread limit.", lambda: metrics.threadpool_stats()[1])
+        app_metrics.gauge("threadpool_tasks_waiting", "Calls queued for a free worker thread (saturation).",
+                          lambda: metrics.threadpool_stats()[2])
+        app_metrics.gauge("token_store_tokens", "Live API tokens.", token_store.size)
+        app_metrics.gauge("password_hasher_pending", "bcrypt jobs running or queued.", lambda: password_hasher.pending)
+        app_metrics.gauge("password_hasher_rejected_total", "bcrypt jobs rejected with 503.",
+                          lambda: password_hasher.rejected, kind="counter")
+        app_metrics.gauge("admission_in_flight", "Requests holding an in-flight slot.", lambda: admission.in_flight)
+        app_metrics.gauge("admission_throttled_total", "Requests rejected with 429 (per-token or per-IP budget exhausted).",
+                          lambda: [(key, count) for key, count in sorted(admission.throttled.items())],
+                          ("key", "budget"), kind="counter")
+        app_metrics.gauge("admission_shed_total", "Requests rejected with 503 (in-flight cap reached).",
+                          lambda: [((budget,), count) for budget, count in sorted(admission.shed.items())],
+                          ("budget",), kind="counter")
+        app_metrics.gauge("group_commit_pending", "Inserts queued for the group-commit writer.",
+                          lambda: group_commit.group_writer.pending)
+        app_metrics.gauge("group_commit_transactions_total", "Transactions committed by the group-commit writer.",
+                          lambda: group_commit.group_writer.transactions, kind="counter")
+        app_metrics.gauge("group_commit_rows_total", "Rows inserted by the group-commit writer.",
+                          lambda: group_commit.group_writer.rows, kind="counter")
+        app_metrics.gauge("feed_hits_total", "GET /posts pages served from the in-memory front-page feed.",
+                          lambda: feed.front_page.hits, kind="counter")
+        app_metrics.gauge("feed_misses_total", "Plain GET /posts pages past the front-page feed (read from SQL).",
+                          lambda: feed.front_page.misses, kind="counter")
+        app_metrics.gauge("events_subscribers", "Open GET /events streams.", lambda: events.bus.subscribers)
+        app_metrics.gauge("events_published_total", "Events published to the stream.",
+                          lambda: events.bus.published, kind="counter")
+        app_metrics.gauge("events_dropped_total", "Event subscribers dropped for falling behind.",
+                          lambda: events.bus.dropped, kind="counter")
+        app_metrics.gauge("response_cache_entries", "Cached GET responses.", lambda: read_cache.stats()["entries"])
+        app.add_middleware(metrics.MetricsMiddleware, metrics=app_metrics, server_timing=settings.server_timing)
+        app.state.metrics = app_metrics
+
+    # Slow statements with their plans (hooked after the metrics so EXPLAIN never counts as query time)
+    app.state.slow_queries = None
+    if settings.slow_query_log:
+        slow_log = slow_queries.SlowQueryLog(settings.slow_query_ms, settings.slow_query_entries, settings.slow_query_explain)
+        for role, engine in database.engine_roles():
+            slow_log.watch_engine(engine, role)
+        app.state.slow_queries = slow_log
+
+    # Publish the current request to engine events (outermost, so every layer below sees it)
+    app.add_middleware(request_context.RequestContextMiddleware)
+
+    # Setup routers (BLOG_ASYNC_DB=1 serves the same routes through AsyncSession)
+    if settings.async_db:
+        app.include_router(async_posts.router)
+        app.include_router(async_users.router)
+        app.include_router(async_comments.router)
+        app.include_router(async_auth.router)
+    else:
+        app.include_router(posts.router)
+        app.include_router(users.router)
+        app.include_router(comments.router)
+        app.include_router(auth.router)
+    app.include_router(batch.router)
+    app.include_router(bulk.router)
+    app.include_router(stats.router)
+    app.include_router(events_router.router)
+    if settings.metrics_enabled:
+        app.include_router(metrics_router.router)
+    return app
+
+# The app served by `uvicorn app.main:app`
+app = create_app()
\ No newline at end of file
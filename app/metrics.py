@@ -0,0 +1,203 @@
+# -- Request and Database Instrumentation (Prometheus text format) --
+import bisect  # Histogram buckets
+import threading  # Statements finish on threadpool threads
+import time  # Timers
+from contextvars import ContextVar  # Per-request counters (copied into threadpool calls)
+from dataclasses import dataclass  # Per-request counters
+from typing import Callable, Dict, List, Optional, Sequence, Tuple  # Type hints
+import anyio.to_thread  # Threadpool limiter used by sync routes
+from sqlalchemy import event  # Cursor execution hooks
+from sqlalchemy.engine import Engine  # Engine type hint
+from app.request_context import route_template  # Route labels
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Monotonic totals keyed by label values
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}")
+        return lines
+
+# Cumulative histogram keyed by label values (bucket counts are stored per bucket and summed on render)
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)  # First bucket whose upper bound is >= value
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                total = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    total += count
+                    le = bound if bound == "+Inf" else format_value(float(bound))
+                    lines.append(f"{self.name}_bucket{format_labels(names, labels + (le,))} {total}")
+                lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {format_value(series[-1])}")
+                lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {total}")
+        return lines
+
+# Value read on every scrape; the callback returns a number or [(label values, number), ...].
+# kind="counter" exposes totals kept elsewhere (e.g. PasswordHasher.rejected).
+class Gauge:
+    def __init__(self, name: str, help: str, callback: Callable, labels: Sequence[str] = (), kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labels = tuple(labels)
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        value = self.callback()
+        samples = value if isinstance(value, list) else [((), value)]
+        for labels, sample in samples:
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {format_value(sample)}")
+        return lines
+
+# SQL work done on behalf of the current request
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class Metrics:
+    def __init__(self):
+        self.in_progress = 0
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status"))
+        self.request_statements = Histogram(
+            "http_request_db_statements", "SQL statements executed per request.", ("method", "route"), STATEMENT_BUCKETS)
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Time spent in SQL statements per request.", ("method", "route"))
+        self.statements = Counter("db_statements_total", "SQL statements executed.", ("engine",))
+        self.db_time = Counter("db_statement_seconds_total", "Time spent in SQL statements.", ("engine",))
+        self.metrics: list = [self.request_duration, self.request_statements, self.request_db_time, self.statements, self.db_time]
+        self.pools: Dict[str, object] = {}
+        self.gauge("http_requests_in_progress", "Requests currently being served.", lambda: self.in_progress)
+        self.gauge("db_pool_connections_in_use", "Checked-out pool connections (waiting on the writer shows up here).",
+                   lambda: [((role,), pool.checkedout()) for role, pool in self.pools.items()], ("engine",))
+        self.gauge("db_pool_size", "Configured pool size (overflow not included).",
+                   lambda: [((role,), pool.size()) for role, pool in self.pools.items()], ("engine",))
+
+    def gauge(self, name: str, help: str, callback: Callable, labels: Sequence[str] = (), kind: str = "gauge") -> None:
+        self.metrics.append(Gauge(name, help, callback, labels, kind))
+
+    # Count and time every statement run through an engine (sync engines; pass async_engine.sync_engine)
+    def watch_engine(self, engine: Engine, role: str) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info["statement_started"] = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info.pop("statement_started", time.perf_counter())
+            self.statements.inc((role,))
+            self.db_time.inc((role,), elapsed)
+            stats = current_request.get()
+            if stats is not None:
+                stats.statements += 1
+                stats.db_seconds += elapsed
+
+        if hasattr(engine.pool, "checkedout"):  # QueuePool and AsyncAdaptedQueuePool
+            self.pools[role] = engine.pool
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        self.request_duration.observe((method, route, str(status)), seconds)
+        self.request_statements.observe((method, route), stats.statements)
+        self.request_db_time.observe((method, route), stats.db_seconds)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Pure ASGI middleware: times each request, attributes SQL work to it and optionally reports both in Server-Timing
+class MetricsMiddleware:
+    def __init__(self, app, metrics: Metrics, server_timing: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    header = self.timing_header(stats, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        self.metrics.in_progress += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.in_progress -= 1
+            current_request.reset(token)
+            self.metrics.observe_request(scope["method"], route_template(scope), status, time.perf_counter() - started, stats)
+
+    @staticmethod
+    def timing_header(stats: RequestStats, seconds: float) -> bytes:
+        return (
+            f'app;dur={seconds * 1000:.2f}, db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries"'
+        ).encode("ascii")
+
+# Worker threads used by sync routes and dependencies (anyio's default limiter; read from the event loop)
+def threadpool_stats() -> Tuple[int, int, int]:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return statistics.borrowed_tokens, int(limiter.total_tokens), statistics.tasks_waiting
\ No newline at end of file
@@ -0,0 +1,157 @@
+# -- Versioned Schema Migrations --
+from dataclasses import dataclass, field  # Migration and plan check records
+from typing import Callable, List, Optional, Tuple  # Type hints
+from sqlalchemy import insert, inspect, select  # Recording applied versions, existing tables
+from sqlalchemy.schema import CreateTable  # A table without its indexes
+from sqlalchemy.engine import Connection, Engine  # Type hints
+from sqlalchemy.orm import Session  # For building the routes' ORM queries
+from app import comment_counts, models, search  # Models, comment counters and the full-text index
+
+migrations_table = models.SchemaMigration.__table__
+
+# One schema step; `apply` must be safe on a database that already has the change, because
+# version 1 creates missing tables straight from the current models
+@dataclass
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+    indexes: Tuple[str, ...] = ()  # Indexes this step adds (verified with EXPLAIN QUERY PLAN afterwards)
+
+# Table.indexes is a set: sorted, so every run creates them in the same order and the file gets the same pages
+def sorted_indexes(table) -> list:
+    return sorted(table.indexes, key=lambda index: index.name)
+
+# Missing tables with their indexes (what metadata.create_all does, minus its set-ordered index creation)
+def create_tables(conn: Connection) -> None:
+    existing = set(inspect(conn).get_table_names())
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing:
+            conn.execute(CreateTable(table))
+            for index in sorted_indexes(table):
+                index.create(bind=conn)
+
+# Create indexes declared on the models if the database does not have them yet (no table rebuild)
+def create_indexes(*names: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        for table in models.Base.metadata.sorted_tables:
+            for index in sorted_indexes(table):
+                if index.name in names:
+                    index.create(bind=conn, checkfirst=True)
+    return apply
+
+def index_migration(version: int, name: str, *indexes: str) -> Migration:
+    return Migration(version, name, create_indexes(*indexes), indexes)
+
+# Append new steps at the end; applied versions are never edited
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tables", create_tables),
+    index_migration(2, "listing sort index", "ix_posts_created_at_id"),
+    index_migration(3, "foreign key indexes", "ix_comments_post_id", "ix_comments_commenter_id", "ix_posts_author_id"),
+    Migration(4, "post comment counts", comment_counts.setup_counts),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def applied_versions(conn: Connection) -> set:
+    return set(conn.execute(select(migrations_table.c.version)).scalars())
+
+def current_version(engine: Engine) -> int:
+    with engine.begin() as conn:
+        migrations_table.create(bind=conn, checkfirst=True)
+        return max(applied_versions(conn), default=0)
+
+# Apply pending migrations in order, each in its own transaction together with its version row.
+# The writer begins with BEGIN IMMEDIATE, so two processes starting at once apply each step only once.
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    with engine.begin() as conn:
+        migrations_table.create(bind=conn, checkfirst=True)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            if migration.version in applied_versions(conn):
+                continue
+            migration.apply(conn)
+            conn.execute(insert(migrations_table).values(version=migration.version, name=migration.name))
+        applied.append(migration)
+
+    # The FTS table depends on the SQLite build, so it is checked (and the flag set) on every run
+    search.setup_search(engine)
+    return applied
+
+# -- EXPLAIN QUERY PLAN checks --
+
+# A query the app really runs and the index it must use
+@dataclass
+class PlanCheck:
+    name: str
+    index: str
+    build: Callable[[Session], object]  # Returns an ORM Query or a select()
+
+@dataclass
+class PlanResult:
+    check: PlanCheck
+    plan: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return any(self.check.index in line for line in self.plan)
+
+# Built lazily: the route modules pull in auth, which scripts like reset_db.py do not need
+def plan_checks() -> List[PlanCheck]:
+    from app import loaders, pagination
+    from app.routers import comments, posts
+
+    cursor = pagination.encode_cursor("2000-01-01 00:00:00", 1)
+    return [
+        PlanCheck("GET /posts", "ix_posts_created_at_id",
+                  lambda db: posts.listing_query(db, None, "recent", False, None)[0].offset(0).limit(26)),
+        PlanCheck("GET /posts?cursor=", "ix_posts_created_at_id",
+                  lambda db: posts.listing_query(db, None, "recent", False, cursor)[0].limit(26)),
+        PlanCheck("GET /posts/{id}/comments", "ix_comments_post_id",
+                  lambda db: comments.comments_query(db, 1).limit(51)),
+        PlanCheck("GET /posts/{id}/comments?cursor=", "ix_comments_post_id",
+                  lambda db: comments.comments_query(db, 1, pagination.encode_id_cursor(1)).limit(51)),
+        PlanCheck("comments embedded in posts", "ix_comments_post_id",
+                  lambda db: loaders.comments_query(db, [1, 2, 3])),
+        PlanCheck("comments embedded in posts (comments_limit)", "ix_comments_post_id",
+                  lambda db: loaders.comments_query(db, [1, 2, 3], limit=5)),
+        PlanCheck("DELETE /posts/{id} (comments relationship)", "ix_comments_post_id",
+                  lambda db: db.query(models.Comment).filter(models.Comment.post_id == 1)),
+        PlanCheck("User.posts relationship", "ix_posts_author_id",
+                  lambda db: db.query(models.Post).filter(models.Post.author_id == 1)),
+        PlanCheck("User.comments relationship", "ix_comments_commenter_id",
+                  lambda db: db.query(models.Comment).filter(models.Comment.commenter_id == 1)),
+    ]
+
+# SQLite's plan rows ("SEARCH comments USING INDEX ix_comments_post_id (post_id=?)", ...)
+def explain(conn: Connection, statement) -> List[str]:
+    statement = getattr(statement, "statement", statement)  # ORM Query -> select()
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params)
+    return [row[3] for row in rows]
+
+# Run the plan checks (all of them, or only those for the given indexes)
+def verify_plans(engine: Engine, indexes: Optional[set] = None) -> List[PlanResult]:
+    results = []
+    with engine.connect() as conn:
+        db = Session(bind=conn)
+        try:
+            for check in plan_checks():
+                if indexes is not None and check.index not in indexes:
+                    continue
+                results.append(PlanResult(check, explain(conn, check.build(db))))
+        finally:
+            db.close()
+    return results
+
+# Startup entry point: migrate, then verify the indexes that were just added
+def migrate(engine: Engine) -> Tuple[List[Migration], List[PlanResult]]:
+    applied = upgrade(engine)
+    new_indexes = {name for migration in applied for name in migration.indexes}
+    results = verify_plans(engine, new_indexes) if new_indexes else []
+    return applied, results
\ No newline at end of file
@@ -1,5 +1,5 @@
 # -- SQLAlchemy Models --
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey  # Columns
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index  # Columns and indexes
 from sqlalchemy.sql import func  # For SQL functions
 from sqlalchemy.orm import relationship  # For table relationships
 from .database import Base  # Base component
@@ -24,8 +24,9 @@ class Post(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     content = Column(String)
-    author_id = Column(Integer, ForeignKey("users.id"))
+    author_id = Column(Integer, ForeignKey("users.id"), index=True)  # User.posts lookups
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")  # Kept in sync by triggers (app/comment_counts.py)
 
     # Relationship to user
     author = relationship("User", back_populates="posts")
@@ -33,16 +34,35 @@ class Post(Base):
     # Relationship to comments
     comments = relationship("Comment", back_populates="post")
 
+    # Composite index matching the listing sort, used for keyset pagination
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+    )
+
 # Define a Comment table
 class Comment(Base):
     __tablename__ = "comments"
     id = Column(Integer, primary_key=True, index=True)
     body = Column(String)
-    post_id = Column(Integer, ForeignKey("posts.id"))
-    commenter_id = Column(Integer, ForeignKey("users.id"))
+    post_id = Column(Integer, ForeignKey("posts.id"), index=True)  # Comment listings (ordered by id via the implicit rowid)
+    commenter_id = Column(Integer, ForeignKey("users.id"), index=True)  # User.comments lookups
 
     # Relationship to post
     post = relationship("Post", back_populates="comments")
 
     # Relationship to user
-    commenter = relationship("User", back_populates="comments")
\ No newline at end of file
+    commenter = relationship("User", back_populates="comments")
+
+# Define an API token table (used by the shared "sqlite" token store)
+class ApiToken(Base):
+    __tablename__ = "api_tokens"
+    token_hash = Column(String, primary_key=True)  # SHA-256 of the token, never the token itself
+    user_id = Column(Integer, ForeignKey("users.id"))
+    expires_at = Column(Float, index=True)  # Unix timestamp, indexed for expiry sweeps
+
+# Applied schema migrations (see app/migrations.py)
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    name = Column(String)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -0,0 +1,62 @@
+# -- Keyset (Cursor) Pagination --
+import base64  # Opaque cursor encoding
+import json  # Cursor payload
+from fastapi import HTTPException, status  # For rejecting malformed cursors
+from sqlalchemy import String, tuple_, type_coerce  # For keyset comparisons
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort key as stored by SQLite (raw text), so cursors compare exactly like the index does
+def sort_key(column):
+    return type_coerce(column, String).label("sort_key")
+
+def pack(payload) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def unpack(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor!"
+    )
+
+# Pack the last row's (sort key, id) into an opaque, URL-safe token
+def encode_cursor(key: str, row_id: int) -> str:
+    return pack([key, row_id])
+
+# Unpack a token created by encode_cursor
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        key, row_id = unpack(cursor)
+        if not isinstance(key, str) or not isinstance(row_id, int):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, UnicodeError):
+        raise invalid_cursor()
+    return key, row_id
+
+# Id-only cursors for lists in ascending id order (comments)
+def encode_id_cursor(row_id: int) -> str:
+    return pack([row_id])
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        (row_id,) = unpack(cursor)
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, UnicodeError):
+        raise invalid_cursor()
+    return row_id
+
+# Rows strictly after the cursor in (key DESC, id DESC) order; served by a (key, id) index
+def after_cursor(key_column, id_column, cursor: str):
+    key, row_id = decode_cursor(cursor)
+    return tuple_(type_coerce(key_column, String), id_column) < tuple_(key, row_id)
+
+
+# Rows strictly after an id cursor in ascending id order
+def after_id_cursor(id_column, cursor: str):
+    return id_column > decode_id_cursor(cursor)
\ No newline at end of file
@@ -0,0 +1,113 @@
+# -- Bounded bcrypt Worker Pool --
+import asyncio  # For awaiting pool futures
+import threading  # For the admission counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor  # Worker pools
+import bcrypt  # For hashing passwords
+
+# Raised instead of queueing when the pool already has too much work
+class HasherBusy(Exception):
+    pass
+
+# Pool entry points (module-level so a process pool can pickle them)
+def _hashpw(password: str, rounds: int) -> str:
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode("utf-8")
+
+def _checkpw(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+# Cost factor of an existing bcrypt hash ("$2b$12$...")
+def hash_rounds(hashed_password: str) -> int:
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+# Runs bcrypt on a dedicated, size-limited executor so logins never occupy request threads for long
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, workers: int = 2, queue_limit: int = 64, executor: str = "thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown bcrypt executor: {executor!r} (expected 'thread' or 'process')")
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = workers + queue_limit  # Running plus waiting jobs
+        self.kind = executor
+        self._executor: Executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    # Created on first use so importing the app never forks workers
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    # Admission control: reject right away when the queue is full
+    def submit(self, fn, *args) -> Future:
+        executor = self.executor()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy()
+            self.pending += 1
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    # Blocking API for sync routes
+    def hash(self, password: str) -> str:
+        return self.submit(_hashpw, password, self.rounds).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.submit(_checkpw, password, hashed_password).result()
+
+    # Awaitable API for async routes (no threadpool thread waits on the result)
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(_hashpw, password, self.rounds))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self.submit(_checkpw, password, hashed_password))
+
+    # Hashes made with another cost factor are upgraded on the next successful login
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return hash_rounds(hashed_password) != self.rounds
+
+    # Start every worker (threads, or processes importing bcrypt) before the app reports ready
+    def warm_up(self) -> None:
+        executor = self.executor()
+        futures = [executor.submit(_hashpw, "warm-up", 4) for _ in range(self.workers)]  # 4 = cheapest bcrypt cost
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
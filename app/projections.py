@@ -0,0 +1,99 @@
+# -- Sparse Fieldsets and Column Projections for Post Listings --
+from dataclasses import dataclass  # Parsed projection
+from typing import List, Optional, Sequence  # Type hints
+from fastapi import HTTPException, status  # For rejecting unknown fields
+from sqlalchemy.orm import Session  # Database session type hint
+from app import loaders, models, schemas  # Comment loading, columns and the comment shape
+
+# Selectable fields: "name" or "author.name" -> column (only these columns are read from SQL)
+FIELD_COLUMNS = {
+    "id": models.Post.id,
+    "title": models.Post.title,
+    "content": models.Post.content,
+    "created_at": models.Post.created_at,
+    "comment_count": models.Post.comment_count,
+    "author.id": models.User.id,
+    "author.username": models.User.username,
+    "author.email": models.User.email,
+}
+EXPANSIONS = {"author": ("author.id", "author.username", "author.email")}  # Whole objects
+EXTRA_FIELDS = ("snippet", "comments")  # Not columns: the search snippet and the embedded comment list
+SUMMARY_FIELDS = ("id", "title", "created_at", "comment_count", "author.id", "author.username")  # schemas.PostSummary
+
+@dataclass
+class Projection:
+    fields: List[str]  # Requested fields in request order (expanded)
+
+    @property
+    def columns(self) -> list:
+        # The id is always read: cursors and comment loading need it even when it is not returned
+        columns = [models.Post.id.label("id")]
+        columns += [FIELD_COLUMNS[field].label(label(field)) for field in self.fields if field in FIELD_COLUMNS and field != "id"]
+        return columns
+
+    @property
+    def joins_author(self) -> bool:
+        return any(field.startswith("author.") for field in self.fields)
+
+    @property
+    def comments(self) -> bool:
+        return "comments" in self.fields
+
+    @property
+    def snippet(self) -> bool:
+        return "snippet" in self.fields
+
+def label(field: str) -> str:
+    return field.replace(".", "__")
+
+# Parse ?fields=id,title,author.username (or ?view=summary); None means the full PostResponse
+def parse_fields(fields: Optional[str], view: str = "full") -> Optional[Projection]:
+    if fields is None:
+        return Projection(list(SUMMARY_FIELDS)) if view == "summary" else None
+
+    requested = []
+    unknown = []
+    for field in (part.strip() for part in fields.split(",")):
+        if not field:
+            continue
+        expanded = EXPANSIONS.get(field, (field,))
+        for name in expanded:
+            if name not in FIELD_COLUMNS and name not in EXTRA_FIELDS:
+                unknown.append(name)
+            elif name not in requested:
+                requested.append(name)
+    if unknown or not requested:
+        allowed = ", ".join([*FIELD_COLUMNS, *EXPANSIONS, *EXTRA_FIELDS])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. Allowed: {allowed}"
+        )
+    return Projection(requested)
+
+# Rows of a projected listing query -> plain dicts ready for orjson ("author.username" nests under "author")
+def build_items(db: Session, rows: Sequence, projection: Projection, comments_limit: Optional[int] = None) -> List[dict]:
+    comments_by_post = {}
+    if projection.comments:
+        post_ids = [row.id for row in rows]
+        comments_by_post = {post_id: [] for post_id in post_ids}
+        if post_ids and comments_limit != 0:
+            for comment in loaders.comments_query(db, post_ids, comments_limit):
+                comments_by_post[comment.post_id].append(
+                    schemas.CommentResponse.model_validate(comment).model_dump(mode="json")
+                )
+
+    items = []
+    for row in rows:
+        values = row._mapping
+        item = {}
+        for field in projection.fields:
+            if field == "comments":
+                item["comments"] = comments_by_post[row.id]
+            elif field == "snippet":
+                item["snippet"] = values.get("snippet")
+            elif field.startswith("author."):
+                item.setdefault("author", {})[field.split(".", 1)[1]] = values[label(field)]
+            else:
+                item[field] = values[label(field)]
+        items.append(item)
+    return items
\ No newline at end of file
@@ -0,0 +1,207 @@
+# -- Admission Control: Per-Client Token Buckets and Global Load Shedding --
+import math  # Retry-After rounding
+import threading  # Buckets are shared by every request (and event loop thread)
+import time  # Refill clock
+from collections import Counter, OrderedDict  # Rejection counters, LRU of buckets
+from dataclasses import dataclass  # Budgets and buckets
+from typing import Dict, Iterable, Optional, Tuple  # Type hints
+from urllib.parse import parse_qs  # Reading ?count= for weighted requests
+from fastapi.responses import ORJSONResponse  # Rejection bodies
+
+READ = "read"
+WRITE = "write"
+LOGIN = "login"
+
+LOGIN_ROUTES = {("POST", "/login"), ("POST", "/users")}  # Both spend bcrypt time
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+GENERATE_PATH = "/posts/generate-test-posts"
+BATCH_PATH = "/batch"  # Charged per operation by the route, once the body is parsed
+GENERATED_POSTS_PER_TOKEN = 100  # ?count=100000 costs as much as 1000 single writes
+
+@dataclass(frozen=True)
+class Budget:
+    rate: float  # Tokens refilled per second
+    burst: float  # Bucket capacity
+
+@dataclass
+class Bucket:
+    tokens: float
+    updated: float
+
+# Which budget a request spends: login (bcrypt), write (the single SQLite writer) or read
+def classify(method: str, path: str) -> str:
+    if (method, path) in LOGIN_ROUTES:
+        return LOGIN
+    return READ if method in SAFE_METHODS else WRITE
+
+# Tokens a request takes from its bucket (one, except for the test-post generator and batches)
+def request_cost(method: str, path: str, query_string: bytes) -> float:
+    if path == BATCH_PATH:
+        return 0.0
+    if method == "POST" and path == GENERATE_PATH:
+        values = parse_qs(query_string.decode("latin-1")).get("count", ["100"])
+        try:
+            return max(1.0, int(values[0]) / GENERATED_POSTS_PER_TOKEN)
+        except ValueError:
+            return 1.0  # Rejected by validation anyway
+    return 1.0
+
+# Token buckets keyed by (key kind, key, budget); the least recently used buckets are dropped past max_keys
+class RateLimiter:
+    def __init__(self, budgets: Dict[str, Budget], ip_factor: float = 4, max_keys: int = 10000):
+        self.budgets = budgets
+        self.ip_factor = ip_factor  # One IP may carry several clients (NAT), so its buckets are larger
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[tuple, Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def budget(self, kind: str, budget: str) -> Budget:
+        base = self.budgets[budget]
+        if kind == "ip":
+            return Budget(base.rate * self.ip_factor, base.burst * self.ip_factor)
+        return base
+
+    # Take `cost` tokens from every bucket in keys, or none of them; returns 0 or the seconds until every bucket
+    # has refilled enough, with the kind of the slowest. A request bigger than the bucket is admitted once the
+    # bucket is full, and still pays its whole cost: the bucket goes negative, and the client waits for the debt
+    # to refill before its next request.
+    def take(self, keys: Iterable[Tuple[str, str]], budget: str, cost: float = 1.0,
+             now: Optional[float] = None) -> Tuple[float, Optional[str]]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            buckets = []
+            wait, slowest = 0.0, None
+            for kind, key in keys:
+                limits = self.budget(kind, budget)
+                bucket = self._bucket((kind, key, budget), limits, now)
+                needed = min(cost, limits.burst)
+                if bucket.tokens < needed and (needed - bucket.tokens) / limits.rate > wait:
+                    wait, slowest = (needed - bucket.tokens) / limits.rate, kind
+                buckets.append(bucket)
+            if slowest is not None:
+                return wait, slowest
+            for bucket in buckets:
+                bucket.tokens -= cost
+        return 0.0, None
+
+    def _bucket(self, name: tuple, limits: Budget, now: float) -> Bucket:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = Bucket(tokens=limits.burst, updated=now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(limits.burst, bucket.tokens + (now - bucket.updated) * limits.rate)
+            bucket.updated = now
+        self._buckets.move_to_end(name)
+        return bucket
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+# In-flight caps and rejection counters shared by the middleware, /stats and /metrics
+class AdmissionControl:
+    def __init__(self, limiter: Optional[RateLimiter], max_in_flight: int = 0, max_writes_in_flight: int = 0,
+                 retry_after: int = 1, exempt: Tuple[str, ...] = ("/metrics",), long_lived: Tuple[str, ...] = ()):
+        self.limiter = limiter  # None disables the per-client buckets
+        self.max_in_flight = max_in_flight  # 0 disables the cap
+        self.max_writes_in_flight = max_writes_in_flight  # Writes queue on one SQLite writer, so they get a lower cap
+        self.retry_after = retry_after
+        self.exempt = exempt  # Metrics scrapes keep working while the app sheds load
+        self.long_lived = long_lived  # Streams are rate limited when opened but hold no in-flight slot
+        self.in_flight = 0
+        self.writes_in_flight = 0
+        self.admitted = 0
+        self.throttled: Counter = Counter()  # (key kind, budget) -> 429s
+        self.shed: Counter = Counter()  # budget -> 503s
+        self._lock = threading.Lock()
+
+    # Seconds the client has to wait (0 when its buckets had room)
+    def throttle(self, keys: list, budget: str, cost: float) -> float:
+        if self.limiter is None:
+            return 0.0
+        wait, kind = self.limiter.take(keys, budget, cost)
+        if wait:
+            with self._lock:
+                self.throttled[(kind, budget)] += 1
+        return wait
+
+    # Reserve an in-flight slot; False means the request should be shed
+    def enter(self, budget: str) -> bool:
+        is_write = budget != READ
+        with self._lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self.shed[budget] += 1
+                return False
+            if is_write and self.max_writes_in_flight and self.writes_in_flight >= self.max_writes_in_flight:
+                self.shed[budget] += 1
+                return False
+            self.in_flight += 1
+            self.writes_in_flight += is_write
+            self.admitted += 1
+            return True
+
+    def leave(self, budget: str) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.writes_in_flight -= budget != READ
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "writes_in_flight": self.writes_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "max_writes_in_flight": self.max_writes_in_flight,
+                "admitted": self.admitted,
+                "throttled": {f"{kind}:{budget}": count for (kind, budget), count in sorted(self.throttled.items())},
+                "shed": dict(sorted(self.shed.items())),
+                "buckets": self.limiter.size() if self.limiter else 0,
+            }
+
+# The API token (when sent) and the client IP; both buckets must have room
+def client_keys(scope) -> list:
+    client = scope.get("client")
+    keys = [("ip", client[0] if client else "unknown")]
+    for name, value in scope.get("headers", []):
+        if name == b"x-api-token" and value:
+            keys.append(("token", value.decode("latin-1")))
+            break
+    return keys
+
+# Pure ASGI middleware: 429 when a client is over its budget, 503 when too many requests are already in flight
+class AdmissionMiddleware:
+    def __init__(self, app, control: AdmissionControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.control.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        budget = classify(method, path)
+        wait = self.control.throttle(client_keys(scope), budget, request_cost(method, path, scope.get("query_string", b"")))
+        if wait:
+            await self.reject(scope, receive, send, 429, "Rate limit exceeded, slow down.", math.ceil(wait))
+            return
+        if path.startswith(self.control.long_lived):
+            await self.app(scope, receive, send)
+            return
+        if not self.control.enter(budget):
+            await self.reject(scope, receive, send, 503, "Server is busy, try again shortly.", self.control.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.leave(budget)
+
+    @staticmethod
+    async def reject(scope, receive, send, status_code: int, message: str, retry_after: int):
+        response = ORJSONResponse(
+            {"detail": {"success": False, "message": message}},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, retry_after))}
+        )
+        await response(scope, receive, send)
\ No newline at end of file
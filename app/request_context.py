@@ -0,0 +1,42 @@
+# -- Current Request Context (for code that runs below the route, e.g. engine events) --
+from contextvars import ContextVar  # Follows the request into threadpool calls and async sessions
+from typing import Optional  # Type hints
+from starlette.routing import Match  # Resolving route templates
+
+UNMATCHED = "unmatched"  # Route label for 404s, so random paths cannot blow up label counts
+
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+# Template of the route that served the request ("/posts/{post_id}"), also before or without routing
+def route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return candidate.path
+    return UNMATCHED
+
+# "GET /posts/{post_id}" for the request being served, None outside requests (scripts, background threads)
+def current_route() -> Optional[str]:
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope['method']} {route_template(scope)}"
+
+# Pure ASGI middleware publishing the scope (the router fills in scope["route"] once it matches)
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
\ No newline at end of file
@@ -0,0 +1,302 @@
+# -- ETag Response Cache for Post and Comment Reads --
+import hashlib  # Strong ETags
+import json  # Reading post ids out of listing bodies
+import re  # Matching cacheable paths
+import threading  # Routes run on the threadpool
+from collections import OrderedDict  # LRU ordering
+from dataclasses import dataclass  # Cached entries
+from typing import Dict, List, Optional, Set, Tuple  # Type hints
+from urllib.parse import parse_qs  # Telling search listings apart
+from sqlalchemy import event, inspect  # Session write hooks
+from sqlalchemy.orm import Session  # Session class for global listeners
+from app import models  # Models
+
+# Cacheable GET paths
+LISTING_PATH = re.compile(r"^/posts$")
+POST_PATH = re.compile(r"^/posts/(\d+)$")
+COMMENTS_PATH = re.compile(r"^/posts/(\d+)/comments$")
+
+# Invalidation tags
+LISTINGS = "posts:list"  # Which posts a listing contains (new or deleted posts)
+SEARCHES = "posts:search"  # Search listings (edited text can change membership)
+ANY_POST = "post:*"  # Entries whose post ids could not be determined
+ALL = "*"  # Everything (e.g. a username embedded in many responses changed)
+
+def post_tag(post_id: int) -> str:
+    return f"post:{post_id}"
+
+def comments_tag(post_id: int) -> str:
+    return f"comments:{post_id}"
+
+# Strong validator for a serialized body
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+# If-None-Match uses weak comparison, so W/ prefixes are ignored
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: List[Tuple[bytes, bytes]]  # Raw ASGI headers (without content-length)
+    tags: Set[str]
+
+# LRU of serialized responses, bounded by entry count and total bytes, invalidated by tag
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, history: int = 10000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Recent invalidations (tag -> generation), so responses computed before a write are not stored after it
+        self.generation = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._history = history
+        self._oldest_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    # Store a response computed by a request that started at `generation`
+    def put(self, key: str, entry: CachedResponse, generation: int) -> bool:
+        if len(entry.body) > self.max_bytes:
+            return False
+        with self._lock:
+            if self._stale_since(entry.tags, generation):
+                return False
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    # True if any of the tags (or everything) was invalidated after `generation`
+    def _stale_since(self, tags: Set[str], generation: int) -> bool:
+        if generation < self._oldest_generation:
+            return True  # Older than the retained history: play safe
+        return any(self._invalidated.get(tag, -1) > generation for tag in tags | {ALL})
+
+    def invalidate(self, tags: Set[str]) -> None:
+        if not tags:
+            return
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self.generation
+                self._invalidated.move_to_end(tag)
+                if tag == ALL:
+                    keys = list(self._entries)
+                else:
+                    keys = list(self._keys_by_tag.get(tag, ()))
+                for key in keys:
+                    self._remove(key)
+                    self.invalidations += 1
+            while len(self._invalidated) > self._history:
+                _, generation = self._invalidated.popitem(last=False)
+                self._oldest_generation = generation
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Tags a cached GET response depends on (None if the path is not cacheable)
+def tags_for(path: str, body: bytes, query: str = "") -> Optional[Set[str]]:
+    if LISTING_PATH.match(path):
+        tags = {LISTINGS}
+        if any(value.strip() for value in parse_qs(query).get("search", ())):
+            tags.add(SEARCHES)  # An edit can add a post to results that do not contain it yet
+        try:
+            items = json.loads(body)
+        except ValueError:
+            return None
+        for item in items:
+            if isinstance(item, dict) and "id" in item:
+                tags.add(post_tag(item["id"]))
+            else:
+                tags.add(ANY_POST)  # Sparse responses without ids depend on every post
+        return tags
+    match = POST_PATH.match(path)
+    if match:
+        return {post_tag(int(match.group(1)))}
+    match = COMMENTS_PATH.match(path)
+    if match:
+        return {comments_tag(int(match.group(1)))}
+    return None
+
+def is_cacheable_path(path: str) -> bool:
+    return bool(LISTING_PATH.match(path) or POST_PATH.match(path) or COMMENTS_PATH.match(path))
+
+# Tags touched by the objects a session flushed
+def tags_for_writes(session: Session) -> Set[str]:
+    tags: Set[str] = set()
+    for obj in session.new:
+        if isinstance(obj, models.Post):
+            tags.add(LISTINGS)
+        elif isinstance(obj, models.Comment):
+            tags |= {post_tag(obj.post_id), comments_tag(obj.post_id), ANY_POST}
+    for obj in session.dirty:
+        if isinstance(obj, models.Post) and session.is_modified(obj, include_collections=False):
+            tags |= {post_tag(obj.id), SEARCHES, ANY_POST}
+        elif isinstance(obj, models.Comment) and session.is_modified(obj, include_collections=False):
+            old_post_id = inspect(obj).attrs.post_id.history.deleted
+            for post_id in {obj.post_id, *old_post_id} - {None}:
+                tags |= {post_tag(post_id), comments_tag(post_id)}
+            tags.add(ANY_POST)
+        elif isinstance(obj, models.User):
+            state = inspect(obj)
+            if state.attrs.username.history.has_changes() or state.attrs.email.history.has_changes():
+                tags.add(ALL)  # Embedded as author/commenter all over the place
+    for obj in session.deleted:
+        if isinstance(obj, models.Post):
+            tags |= {LISTINGS, post_tag(obj.id), comments_tag(obj.id), ANY_POST}
+        elif isinstance(obj, models.Comment):
+            tags |= {post_tag(obj.post_id), comments_tag(obj.post_id), ANY_POST}
+        elif isinstance(obj, models.User):
+            tags.add(ALL)
+    return tags
+
+# Invalidate after every successful commit made through an ORM session (sync or async)
+def watch_session_writes(cache: ResponseCache) -> None:
+    def before_flush(session, flush_context, instances):
+        # Captured before the flush, while pending changes are still visible
+        session.info.setdefault("response_cache_tags", set()).update(tags_for_writes(session))
+
+    def after_commit(session):
+        if session.in_nested_transaction():
+            return  # A released SAVEPOINT (POST /batch): invalidate once the outer COMMIT is visible
+        cache.invalidate(session.info.pop("response_cache_tags", set()))
+
+    # A rolled-back SAVEPOINT leaves the other writes of the transaction pending, so only a full rollback clears
+    def after_soft_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop("response_cache_tags", None)
+
+    event.listen(Session, "before_flush", before_flush)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_soft_rollback", after_soft_rollback)
+
+# Pure ASGI middleware: serves cached bodies, answers If-None-Match with 304 and stores fresh 200s
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled \
+                or not is_cacheable_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache_key(scope)
+        if_none_match = self.header(scope, b"if-none-match")
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self.replay(send, entry, if_none_match)
+            return
+
+        # Miss: run the route and capture what it sends
+        generation = self.cache.generation
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        headers = [(name, value) for name, value in start.get("headers", []) if name.lower() != b"content-length"]
+
+        if start.get("status") != 200:
+            await self.respond(send, start.get("status", 500), headers, body)
+            return
+
+        entry = CachedResponse(body=body, etag=make_etag(body), headers=headers, tags=set())
+        tags = tags_for(scope["path"], body, scope.get("query_string", b"").decode("latin-1"))
+        if tags is not None:
+            entry.tags = tags
+            self.cache.put(key, entry, generation)
+        await self.replay(send, entry, if_none_match)
+
+    # Path plus sorted query parameters, so equivalent URLs share an entry
+    @staticmethod
+    def cache_key(scope) -> str:
+        query = scope.get("query_string", b"").decode("latin-1")
+        params = sorted(part for part in query.split("&") if part)
+        return scope["path"] + "?" + "&".join(params)
+
+    @staticmethod
+    def header(scope, name: bytes) -> Optional[str]:
+        for key, value in scope.get("headers", []):
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    async def replay(self, send, entry: CachedResponse, if_none_match: Optional[str]):
+        headers = entry.headers + [(b"etag", entry.etag.encode("ascii"))]
+        if etag_matches(if_none_match, entry.etag):
+            self.cache.not_modified += 1
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-type"]
+            await self.respond(send, 304, headers, b"")
+            return
+        await self.respond(send, 200, headers, entry.body)
+
+    @staticmethod
+    async def respond(send, status_code: int, headers, body: bytes):
+        if status_code != 304:
+            headers = headers + [(b"content-length", str(len(body)).encode("ascii"))]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,44 @@
+# -- Authentication Router (async mode) --
+from app import models  # Models
+from fastapi import APIRouter, Depends, HTTPException, status  # FastAPI-related toolkit
+from sqlalchemy import select  # For async queries
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
+from ..auth import verify_password_async, needs_rehash, hash_password_async, create_api_key_async  # For passwords and tokens
+from ..database import get_async_db, get_async_read_db  # For async database sessions
+
+router = APIRouter(tags=["authentication"])
+
+# Finds a user by username
+async def find_user(username: str, db: AsyncSession):
+    result = await db.scalars(select(models.User).where(models.User.username == username))
+    return result.first()
+
+# LOGIN a user
+@router.post("/login")
+async def login(
+    username: str,
+    password: str,
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)  # bcrypt runs while only a reader is in use, never the write lock
+    ):
+    
+    user = await find_user(username, read_db)
+    if not user or not await verify_password_async(password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"success": False, "message": "Invalid credentials!"}
+        )
+
+    # Upgrade hashes made with an older cost factor while the plain password is at hand
+    if needs_rehash(user.password_hash):
+        new_hash = await hash_password_async(password)
+        (await db.get(models.User, user.id)).password_hash = new_hash
+        await db.commit()
+    
+    # Generate 64-character API key that expires in 5 minutes
+    api_key = await create_api_key_async(user.id)
+    return {
+        "api_key": api_key,
+        "expires_in": "5 minutes",
+        "success": True
+    }
\ No newline at end of file
@@ -0,0 +1,69 @@
+# -- Comment Router (async mode) --
+from app import models, schemas  # Models and schemas
+from fastapi import APIRouter, Depends, Query, Response, status  # FastAPI-related toolkit
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
+from typing import Optional  # For the optional cursor
+from . import comments  # Sync handlers reused for the query logic
+from .. import events, group_commit  # Change events, optional group-commit writer
+from .async_helpers import run_route  # Runs sync handlers on the async session
+from ..auth import get_current_user_async  # For authentication
+from ..database import get_async_db  # For async database sessions
+
+router = APIRouter(prefix="/posts/{post_id}/comments", tags=["comments"])
+
+# GET comments (pages of `take`, oldest first)
+@router.get("", response_model=list[schemas.CommentResponse])
+async def get_comments(
+    post_id: int,
+    response: Response,  # For the next-page cursor header
+    db: AsyncSession = Depends(get_async_db),
+    take: int = Query(50, gt=0),  # Comments per page
+    cursor: Optional[str] = Query(None)  # Opaque X-Next-Cursor value from the previous page
+    ):
+    return await run_route(
+        db, comments.get_comments, list[schemas.CommentResponse],
+        post_id=post_id, response=response, take=take, cursor=cursor
+    )
+
+# CREATE a comment
+@router.post("", response_model=schemas.CommentResponse, status_code=status.HTTP_201_CREATED)
+async def create_comment(
+    post_id: int,
+    comment: schemas.CommentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)  # Requires valid 64-char API token
+    ):
+    if group_commit.enabled():
+        try:
+            new_comment = await group_commit.group_writer.insert_async(
+                models.Comment, body=comment.body, post_id=post_id, commenter_id=current_user.id)
+        except group_commit.PostNotFound:
+            raise comments.post_not_found(post_id)
+        events.emit(None, events.COMMENT_CREATED, post_id, events.comment_data(new_comment, current_user))
+        return comments.created_comment(new_comment, current_user)
+    return await run_route(
+        db, comments.create_comment, schemas.CommentResponse,
+        post_id=post_id, comment=comment, current_user=current_user
+    )
+
+# UPDATE a comment
+@router.patch("/{comment_id}", response_model=schemas.CommentResponse)
+async def update_comment(
+    comment_id: int,
+    comment_update: schemas.CommentUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+    ):
+    return await run_route(
+        db, comments.update_comment, schemas.CommentResponse,
+        comment_id=comment_id, comment_update=comment_update, current_user=current_user
+    )
+
+# DELETE a comment
+@router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_comment(
+    comment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+    ):
+    return await run_route(db, comments.delete_comment, comment_id=comment_id, current_user=current_user)
\ No newline at end of file
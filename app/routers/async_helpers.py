@@ -0,0 +1,20 @@
+# -- Helpers for Async Routes --
+from fastapi import Response  # Responses built by the handler itself
+from functools import lru_cache  # For reusing validators
+from pydantic import TypeAdapter  # For serializing route results
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
+
+# Build each response validator once
+@lru_cache(maxsize=None)
+def get_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+# Run a sync route handler on the async session's greenlet and serialize its result there,
+# so lazy loads still go through aiosqlite and nothing touches the threadpool
+async def run_route(db: AsyncSession, route, response_model=None, **kwargs):
+    def call(session):
+        result = route(db=session, **kwargs)
+        if response_model is None or isinstance(result, Response):
+            return result
+        return get_adapter(response_model).validate_python(result, from_attributes=True)
+    return await db.run_sync(call)
\ No newline at end of file
@@ -0,0 +1,92 @@
+# -- Post Router (async mode) --
+from fastapi import APIRouter, Depends, status, Query, Response  # FastAPI-related toolkit
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
+from starlette.concurrency import run_in_threadpool  # CPU-bound test data off the event loop
+from app import models, schemas  # Models and schemas
+from typing import Literal, Optional  # For optional search query
+from . import posts  # Sync handlers reused for the query logic
+from .. import events, group_commit  # Change events, optional group-commit writer
+from .async_helpers import run_route  # Runs sync handlers on the async session
+from ..auth import get_current_user_async  # For authentication
+from ..database import get_async_db  # For async database sessions
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+
+# GET all posts
+@router.get("", response_model=list[schemas.PostListItem])
+async def read_posts(
+    response: Response,  # For the next-page cursor header
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, gt=0),  # Default page is 1, must be > than 0
+    take: int = Query(25, gt=0),  # Default items shown is 25, must be > than 0
+    search: Optional[str] = Query(None),  # Optional for searching
+    sort: Literal["relevance", "recent"] = Query("relevance"),  # Ordering of search results
+    highlight: bool = Query(False),  # Attach a highlighted snippet to search results
+    cursor: Optional[str] = Query(None),  # Opaque X-Next-Cursor value from the previous page (replaces page)
+    comments_limit: Optional[int] = Query(None, ge=0),  # Max comments embedded per post (default: all)
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the post fields, e.g. id,title,author.username"),  # Sparse fieldset
+    view: Literal["full", "summary"] = Query("full", description="summary: PostSummary items")  # "summary" = schemas.PostSummary fields
+    ):
+    return await run_route(
+        db, posts.read_posts,
+        response=response, page=page, take=take, search=search, sort=sort,
+        highlight=highlight, cursor=cursor, comments_limit=comments_limit, fields=fields, view=view
+    )
+
+# GET a specific post
+@router.get("/{post_id}", response_model=schemas.PostResponse)
+async def read_post(
+    post_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    comments_limit: Optional[int] = Query(None, ge=0)  # Max comments embedded (default: all)
+    ):
+    return await run_route(db, posts.read_post, schemas.PostResponse, post_id=post_id, comments_limit=comments_limit)
+
+# CREATE a post
+@router.post("", response_model=schemas.PostResponse, status_code=status.HTTP_201_CREATED)
+async def create_post(
+    post: schemas.PostCreate,  # Pydantic model for request body
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)  # Requires valid 64-char API token
+    ):
+    if group_commit.enabled():
+        new_post = await group_commit.group_writer.insert_async(
+            models.Post, title=post.title, content=post.content, author_id=current_user.id)
+        events.emit(None, events.POST_CREATED, new_post.id, events.post_data(new_post, current_user))
+        return posts.created_post(new_post, current_user)
+    return await run_route(db, posts.create_post, schemas.PostResponse, post=post, current_user=current_user)
+
+# UPDATE a specific post
+@router.patch("/{post_id}", response_model=schemas.PostResponse)
+async def update_post(
+    post_id: int,
+    post_update: schemas.PostUpdate,  # Pydantic model for request body
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)  # Requires valid 64-char API token
+    ):
+    return await run_route(
+        db, posts.update_post, schemas.PostResponse,
+        post_id=post_id, post_update=post_update, current_user=current_user
+    )
+
+# DELETE a specific post
+@router.delete("/{post_id}", status_code=status.HTTP_200_OK)
+async def delete_post(
+    post_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)  # Requires valid 64-char API token
+    ):
+    return await run_route(db, posts.delete_post, post_id=post_id, current_user=current_user)
+
+# [Testing] To test pagination
+@router.post("/generate-test-posts")
+async def generate_test_posts(
+    count: int = 100,  # Number of posts to generate
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    # Faker text is built on the threadpool; only the insert runs on the event loop
+    new_posts = await run_in_threadpool(posts.fake_posts, count, current_user.id)
+    db.add_all(new_posts)
+    await db.commit()
+    return {"message": f"Generated {count} test posts"}
\ No newline at end of file
@@ -0,0 +1,26 @@
+# -- User Router (async mode) --
+from app import models, schemas  # Models and schemas
+from fastapi import APIRouter, Depends  # FastAPI-related toolkit
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session type hint
+from ..auth import hash_password_async  # Password hashing on the bcrypt pool
+from ..database import get_async_db  # For async database sessions
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+# CREATE a user
+@router.post("", response_model=schemas.UserResponse)
+async def create_user(
+    user: schemas.UserCreate,  # Pydantic model for request body
+    db: AsyncSession = Depends(get_async_db)
+    ):
+
+    hashed_password = await hash_password_async(user.password)  # Hash password before storing
+    db_user = models.User(
+        username = user.username,
+        email = user.email,
+        password_hash = hashed_password
+    )
+    db.add(db_user)  # Stage object for insertion
+    await db.commit()  # Save to database
+    await db.refresh(db_user)  # Update object with database defaults
+    return db_user
\ No newline at end of file
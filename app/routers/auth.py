@@ -2,8 +2,8 @@
 from app import models  # Models
 from fastapi import APIRouter, Depends, HTTPException, status  # FastAPI-related toolkit
 from sqlalchemy.orm import Session  # Database session type hint
-from ..auth import verify_password, create_api_key  # For passwords and tokens
-from ..database import get_db  # For database sessions
+from ..auth import verify_password, needs_rehash, hash_password, create_api_key  # For passwords and tokens
+from ..database import get_db, get_read_db  # For database sessions
 
 router = APIRouter(tags=["authentication"])
 
@@ -16,15 +16,22 @@ def find_user(username: str, db: Session = Depends(get_db)):
 def login(
     username: str,
     password: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)  # bcrypt runs while only a reader is in use, never the write lock
     ):
     
-    user = find_user(username, db)
+    user = find_user(username, read_db)
     if not user or not verify_password(password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"success": False, "message": "Invalid credentials!"}
         )
+
+    # Upgrade hashes made with an older cost factor while the plain password is at hand
+    if needs_rehash(user.password_hash):
+        new_hash = hash_password(password)
+        db.get(models.User, user.id).password_hash = new_hash
+        db.commit()
     
     # Generate 64-character API key that expires in 5 minutes
     api_key = create_api_key(user.id)
@@ -0,0 +1,112 @@
+# -- Batch Router --
+import math  # Retry-After rounding
+from collections import Counter  # Cost per budget
+from app import batching, models, rate_limit, schemas  # Sub-request dispatch, models, rate budgets and schemas
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status  # FastAPI-related toolkit
+from sqlalchemy import text  # Explicit BEGIN for the legacy profile
+from starlette.concurrency import run_in_threadpool  # Blocking session calls off the event loop
+from ..auth import get_current_user, get_current_user_async, identity_cache  # Authentication (once per batch)
+from ..config import settings  # Application settings
+from .. import database  # Session factories
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Same authentication as the rest of the app in the selected mode
+current_user_dependency = get_current_user_async if settings.async_db else get_current_user
+
+# AsyncSession methods are awaited; Session methods block, so they run on the threadpool
+async def call(function, *args):
+    if settings.async_db:
+        return await function(*args)
+    return await run_in_threadpool(function, *args)
+
+# Reads-only batches use a reader session; anything else holds the writer for the whole batch
+def open_session(read_only: bool):
+    if settings.async_db:
+        return database.AsyncReadSessionLocal() if read_only else database.AsyncBatchSessionLocal()
+    return database.ReadSessionLocal() if read_only else database.BatchSessionLocal()
+
+# Charge every operation what it costs as a plain request, summed per budget and uncapped: a batch bigger than the
+# burst leaves the bucket in debt (the middleware cannot see the body, so /batch itself is free)
+def charge(request: Request, operations: list) -> None:
+    admission = request.app.state.admission
+    costs = Counter()
+    for operation in operations:
+        path, _, query = operation.path.partition("?")
+        costs[rate_limit.classify(operation.method, path)] += rate_limit.request_cost(
+            operation.method, path, query.encode("latin-1"))  # generate-test-posts costs count/100 here too
+    keys = rate_limit.client_keys(request.scope)
+    for budget, cost in costs.items():
+        wait = admission.throttle(keys, budget, cost) if cost else 0
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={"success": False, "message": "Rate limit exceeded, slow down."},
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+
+# Run every operation on the batch session; each write gets a savepoint so a failure undoes only itself
+async def execute(request: Request, db, batch: schemas.BatchRequest, headers: list, read_only: bool) -> list:
+    results = []
+    if read_only:
+        for operation in batch.operations:
+            scope = batching.sub_scope(request.scope, operation.method, operation.path, headers)
+            results.append(await batching.dispatch(request.app.router, scope, operation.body))
+        return results
+
+    # The bare pysqlite driver only opens a transaction before INSERT/UPDATE/DELETE, so the first
+    # SAVEPOINT would start (and its RELEASE commit) the outer one; open it explicitly instead
+    if settings.db_profile != "tuned":
+        await call(db.execute, text("BEGIN"))
+
+    for index, operation in enumerate(batch.operations):
+        scope = batching.sub_scope(request.scope, operation.method, operation.path, headers)
+        savepoint = await call(db.begin_nested)
+        result = await batching.dispatch(request.app.router, scope, operation.body)
+        results.append(result)
+        if batching.ok(result):
+            await call(savepoint.commit)
+            continue
+        await call(savepoint.rollback)
+        if batch.atomic:
+            await call(db.rollback)
+            return batching.failed_dependency(results, index, len(batch.operations))
+
+    # One COMMIT (and one fsync) for every write in the batch
+    sync_session = db.sync_session if settings.async_db else db
+    sync_session.defer_commit = False
+    await call(db.commit)
+    return results
+
+# RUN many post and comment operations in one round trip and one transaction
+@router.post("", response_model=list[schemas.BatchResult])
+async def run_batch(
+    request: Request,
+    batch: schemas.BatchRequest,
+    x_api_token: str = Header(..., alias="X-API-Token"),
+    current_user: models.User = Depends(current_user_dependency)  # Requires valid 64-char API token
+    ):
+    # Example: {"atomic": true, "operations": [{"method": "POST", "path": "/posts/1/comments", "body": {"body": "Hi"}},
+    #                                          {"method": "GET", "path": "/posts/1?comments_limit=5"}]}
+    if len(batch.operations) > settings.batch_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch takes at most {settings.batch_max_operations} operations."
+        )
+    rejected = [index for index, operation in enumerate(batch.operations) if not batching.is_batchable(operation.path)]
+    if rejected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only /posts routes can be batched (operations {', '.join(map(str, rejected))})."
+        )
+    charge(request, batch.operations)
+
+    read_only = all(operation.method == "GET" for operation in batch.operations)
+    db = open_session(read_only)
+    headers = [(b"x-api-token", x_api_token.encode("latin-1"))]
+    token = batching.current_batch.set(batching.Batch(db, identity_cache.snapshot(current_user)))
+    try:
+        return await execute(request, db, batch, headers, read_only)
+    finally:
+        batching.current_batch.reset(token)
+        await call(db.close)
\ No newline at end of file
@@ -0,0 +1,83 @@
+# -- Bulk Data Router --
+from app import export, ingest, models, response_cache  # Export/import logic, models and cache tags
+from app.feed import front_page  # Front-page feed
+from fastapi import APIRouter, Depends, Query, Request  # FastAPI-related toolkit
+from fastapi.responses import StreamingResponse  # For streaming exports
+from typing import Literal  # For the export format
+from starlette.concurrency import run_in_threadpool  # Sync engine work off the event loop
+from ..auth import get_current_user, get_current_user_async  # For authentication
+from ..config import settings  # Application settings
+from ..database import engine, async_engine, read_engine, async_read_engine  # Core connections
+
+router = APIRouter(prefix="/bulk", tags=["bulk"])
+
+# Same authentication as the rest of the app in the selected mode
+current_user_dependency = get_current_user_async if settings.async_db else get_current_user
+
+# Run one batch in its own transaction on whichever engine the app is using
+async def write_batch(batch: ingest.ImportBatch, refs: dict, report: ingest.ImportReport) -> set:
+    if settings.async_db:
+        async with async_engine.begin() as conn:
+            return await conn.run_sync(ingest.write_batch, batch, refs, report)
+
+    def run():
+        with engine.begin() as conn:
+            return ingest.write_batch(conn, batch, refs, report)
+    return await run_in_threadpool(run)
+
+# IMPORT posts and comments from an NDJSON body
+@router.post("/import")
+async def import_ndjson(
+    request: Request,
+    batch_size: int = Query(1000, gt=0, le=10000),  # Rows per INSERT ... executemany and transaction
+    current_user: models.User = Depends(current_user_dependency)  # Requires valid 64-char API token
+    ):
+    # One object per line:
+    #   {"type": "post", "title": "...", "content": "...", "ref": "optional-key"}
+    #   {"type": "comment", "body": "...", "post_id": 1}  or  {"type": "comment", "body": "...", "post_ref": "optional-key"}
+    report = ingest.ImportReport()
+    refs = {}  # ref -> new post id, for comments on posts from the same upload
+    batch = ingest.ImportBatch()
+    user_id = current_user.id
+    tags = set()
+
+    async def flush():
+        nonlocal batch
+        if len(batch):
+            touched = await write_batch(batch, refs, report)
+            if batch.posts:
+                tags.add(response_cache.LISTINGS)
+            for post_id in touched:
+                tags.update({response_cache.post_tag(post_id), response_cache.comments_tag(post_id), response_cache.ANY_POST})
+            batch = ingest.ImportBatch()
+
+    try:
+        async for line_no, line in ingest.iter_lines(request.stream()):
+            ingest.parse_line(line_no, line, user_id, batch, report)
+            if len(batch) >= batch_size:
+                await flush()
+        await flush()
+    finally:
+        # Core inserts bypass the session hooks, so cached reads are invalidated here
+        request.app.state.read_cache.invalidate(tags)
+        if tags:
+            await run_in_threadpool(front_page.load)  # Same for the feed: reloaded once per import
+
+    return report.as_dict()
+
+# EXPORT every post with its comments as NDJSON (one post per line) or CSV (post rows followed by comment rows)
+@router.get("/export")
+def export_posts(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    batch_size: int = Query(500, gt=0, le=10000),  # Posts read per keyset query
+    current_user: models.User = Depends(current_user_dependency)  # Requires valid 64-char API token
+    ):
+    if settings.async_db:
+        chunks = export.iter_export_async(async_read_engine, format, batch_size)
+    else:
+        chunks = export.iter_export(read_engine, format, batch_size)  # Iterated on the threadpool by Starlette
+    return StreamingResponse(
+        chunks,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'}
+    )
\ No newline at end of file
@@ -1,7 +1,9 @@
 # -- Comment Router --
 from app import models, schemas  # Models and schemas
-from fastapi import APIRouter, Depends, HTTPException, status  # FastAPI-related toolkit
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status  # FastAPI-related toolkit
 from sqlalchemy.orm import Session  # Database session type hint
+from typing import Optional  # For the optional cursor
+from .. import events, group_commit, loaders, pagination  # Change events, group-commit writer, eager loading for responses, cursors
 from ..auth import get_current_user  # For authentication
 from ..database import get_db  # For database sessions
 
@@ -15,10 +17,44 @@ def find_post(post_id: int, db: Session = Depends(get_db)):
 def find_comment(comment_id: int, db: Session = Depends(get_db)):
     return db.query(models.Comment).filter(models.Comment.id == comment_id).first()  # Retrieve comment
 
-# GET all comments
+def post_not_found(post_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Post with id {post_id} not found!"
+    )
+
+# Response for a comment inserted by the group-commit writer (detached: the commenter is filled in here)
+def created_comment(new_comment: models.Comment, commenter: models.User) -> dict:
+    return {"id": new_comment.id, "body": new_comment.body, "post_id": new_comment.post_id, "commenter": commenter}
+
+# Comments of one post, oldest first, optionally after a cursor (shared by GET and the migration plan checks)
+def comments_query(db: Session, post_id: int, cursor: Optional[str] = None):
+    query = (
+        db.query(models.Comment)
+        .options(*loaders.comment_options())  # Commenters come back in the same SELECT
+        .filter(models.Comment.post_id == post_id)
+        .order_by(models.Comment.id)
+    )
+    # Keyset pagination: seeks on (post_id, id) in ix_comments_post_id, so deep pages cost the same as the first
+    if cursor is not None:
+        query = query.filter(pagination.after_id_cursor(models.Comment.id, cursor))
+    return query
+
+# GET comments (pages of `take`, oldest first; pass X-Next-Cursor back as ?cursor= for the next page)
 @router.get("", response_model=list[schemas.CommentResponse])
-def get_comments(post_id: int, db: Session = Depends(get_db)):
-    return db.query(models.Comment).filter(models.Comment.post_id == post_id).all()
+def get_comments(
+    post_id: int,
+    response: Response,  # For the next-page cursor header
+    db: Session = Depends(get_db),
+    take: int = Query(50, gt=0),  # Comments per page
+    cursor: Optional[str] = Query(None)  # Opaque X-Next-Cursor value from the previous page
+    ):
+    # Fetch one extra row to know whether another page exists
+    rows = comments_query(db, post_id, cursor).limit(take + 1).all()
+    if len(rows) > take:
+        rows = rows[:take]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_id_cursor(rows[-1].id)
+    return rows
 
 # CREATE a comment
 @router.post("", response_model=schemas.CommentResponse, status_code=status.HTTP_201_CREATED)
@@ -28,14 +64,21 @@ def create_comment(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)  # Requires valid 64-char API token
     ):
-    
+
+    # Group commit: the post is checked and the comment inserted by the writer thread, in a shared transaction
+    if group_commit.enabled():
+        try:
+            new_comment = group_commit.group_writer.insert(
+                models.Comment, body=comment.body, post_id=post_id, commenter_id=current_user.id)
+        except group_commit.PostNotFound:
+            raise post_not_found(post_id)
+        events.emit(None, events.COMMENT_CREATED, post_id, events.comment_data(new_comment, current_user))
+        return created_comment(new_comment, current_user)
+
     # Check if post exists
     db_post = find_post(post_id, db)
     if not db_post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Post with id {post_id} not found!"
-        )
+        raise post_not_found(post_id)
     
     new_comment = models.Comment(
         body=comment.body,
@@ -46,6 +89,7 @@ def create_comment(
     db.add(new_comment)  # Stage object for insertion
     db.commit()  # Save to database
     db.refresh(new_comment)  # Update object with database defaults
+    events.emit(db, events.COMMENT_CREATED, post_id, events.comment_data(new_comment, current_user))
     return new_comment
 
 # UPDATE a comment
@@ -78,6 +122,7 @@ def update_comment(
 
     db.commit()  # Save to database
     db.refresh(db_comment)
+    events.emit(db, events.COMMENT_UPDATED, db_comment.post_id, events.comment_data(db_comment, current_user))
     return db_comment
 
 # DELETE a comment
@@ -97,6 +142,8 @@ def delete_comment(
     if db_comment.commenter_id != current_user.id:
         return {"success": False, "message": "You are either unauthenticated or you are not using the account that created the comment."}
     
+    post_id = db_comment.post_id  # The comment's own post (the path's post_id is not checked)
     db.delete(db_comment)  # Stage object for deletion
     db.commit()  # Save to database
+    events.emit(db, events.COMMENT_DELETED, post_id, {"id": comment_id, "post_id": post_id})
     return {"success": True}
\ No newline at end of file
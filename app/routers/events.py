@@ -0,0 +1,28 @@
+# -- Server-Sent Events Router --
+from fastapi import APIRouter, Header, HTTPException, Query, status  # FastAPI-related toolkit
+from fastapi.responses import StreamingResponse  # The event stream
+from typing import Optional  # Optional filters
+from .. import events  # Event bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# GET a live stream of post events, or of one post's comment events (?post_id=)
+@router.get("")
+async def stream_events(
+    post_id: Optional[int] = Query(None, gt=0),  # Comments of this post (and its own edits/deletion) instead of every post
+    last_event_id: Optional[str] = Query(None),  # For clients that cannot send the header on their first connect
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")  # Sent by EventSource when reconnecting
+    ):
+    bus = events.bus
+    if not bus.enabled or bus.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event subscribers, poll GET /posts instead." if bus.enabled else "The event stream is disabled.",
+            headers={"Retry-After": "30"}
+        )
+    topic = events.post_topic(post_id) if post_id is not None else events.POSTS
+    return StreamingResponse(
+        events.stream(bus, topic, last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # No proxy buffering
+    )
\ No newline at end of file
@@ -0,0 +1,11 @@
+# -- Prometheus Metrics Router --
+from fastapi import APIRouter, Request  # FastAPI-related toolkit
+from fastapi.responses import PlainTextResponse  # Prometheus text exposition
+from .. import metrics  # Content type
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+# GET every metric in Prometheus text format (async so the threadpool gauges can be read on the event loop)
+@router.get("", response_class=PlainTextResponse)
+async def read_metrics(request: Request):
+    return PlainTextResponse(request.app.state.metrics.render(), media_type=metrics.CONTENT_TYPE)
\ No newline at end of file
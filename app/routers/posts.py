@@ -1,35 +1,48 @@
 # -- Post Router --
-from fastapi import APIRouter, Depends, HTTPException, status, Query  # FastAPI-related toolkit
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response  # FastAPI-related toolkit
+from fastapi.responses import ORJSONResponse, Response as RawResponse  # Projected and pre-serialized listings skip response_model validation
+from pydantic import TypeAdapter  # Listing serializers
 from sqlalchemy import or_  # For OR conditions in filtering
 from sqlalchemy.orm import Session  # Database session type hint
 from app import models, schemas  # Models and schemas
-from typing import Optional  # For optional search query
+from typing import List, Literal, Optional  # For optional search query, generated posts
+from .. import loaders  # Eager loading for responses
+from .. import pagination  # Cursor pagination helpers
+from .. import projections  # Sparse fieldsets
+from .. import search as fts  # Full-text search index
+from .. import batching, events, group_commit  # Batch detection, change events, optional group-commit writer
+from ..feed import front_page, project, render  # In-memory front page
 from ..auth import get_current_user  # For authentication
 from ..database import get_db  # For database sessions
 
-# [Testing] To create fake data
-from faker import Faker
-
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+# Listing serializers, built once
+post_list = TypeAdapter(list[schemas.PostResponse])
+search_results = TypeAdapter(list[schemas.PostSearchResult])
+
 # Finds a post by post_id
 def find_post(post_id: int, db: Session = Depends(get_db)):
     return db.query(models.Post).filter(models.Post.id == post_id).first()  # Retrieve post
 
-# GET all posts
-@router.get("", response_model=list[schemas.PostResponse])
-def read_posts(
-    db:Session = Depends(get_db),
-    page: int = Query(1, gt=0),  # Default page is 1, must be > than 0
-    take: int = Query(25, gt=0),  # Default items shown is 25, must be > than 0
-    search: Optional[str] = Query(None)  # Optional for searching
-    ):
-    
-    # Start with base query
-    query = db.query(models.Post)
+# Listing query shared by GET /posts and the migration plan checks; returns (query, ranked)
+def listing_query(db: Session, search: Optional[str], sort: str, highlight: bool, cursor: Optional[str],
+                  projection: Optional[projections.Projection] = None):
+    # Start with base query (the raw created_at text is selected for building cursors)
+    if projection is None:
+        query = db.query(models.Post, pagination.sort_key(models.Post.created_at)).options(*loaders.post_options())
+    else:
+        # Only the requested columns (no ORM objects, no author row unless an author field was asked for)
+        query = db.query(*projection.columns, pagination.sort_key(models.Post.created_at)).select_from(models.Post)
+        if projection.joins_author:
+            query = query.outerjoin(models.User, models.User.id == models.Post.author_id)
+    ranked = False
 
-    # Apply filtering
-    if search:
+    # Apply filtering (full-text index when available, otherwise a full scan)
+    if search and fts.fts_enabled:
+        query = fts.apply_search(query, search, highlight=highlight)
+        ranked = sort == "relevance" and cursor is None  # Cursor pages are always newest first
+    elif search:
         search_term = f"%{search}%"
         query = query.filter(
             # Two possible conditions
@@ -39,20 +52,97 @@ def read_posts(
             )
         )
 
+    # Best matches first when ranking, newest first otherwise (id breaks ties between equal timestamps)
+    if ranked:
+        query = query.order_by(fts.rank_order(), models.Post.created_at.desc(), models.Post.id.desc())
+    else:
+        query = query.order_by(models.Post.created_at.desc(), models.Post.id.desc())
+
+    # Keyset pagination seeks straight to the cursor on the (created_at, id) index, so every page costs the same
+    if cursor is not None:
+        query = query.filter(pagination.after_cursor(models.Post.created_at, models.Post.id, cursor))
+    return query, ranked
+
+# GET all posts
+@router.get("", response_model=list[schemas.PostListItem])
+def read_posts(
+    response: Response,  # For the next-page cursor header
+    db:Session = Depends(get_db),
+    page: int = Query(1, gt=0),  # Default page is 1, must be > than 0
+    take: int = Query(25, gt=0),  # Default items shown is 25, must be > than 0
+    search: Optional[str] = Query(None),  # Optional for searching
+    sort: Literal["relevance", "recent"] = Query("relevance"),  # Ordering of search results
+    highlight: bool = Query(False),  # Attach a highlighted snippet to search results
+    cursor: Optional[str] = Query(None),  # Opaque X-Next-Cursor value from the previous page (replaces page)
+    comments_limit: Optional[int] = Query(None, ge=0),  # Max comments embedded per post (default: all)
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the post fields, e.g. id,title,author.username"),  # Sparse fieldset
+    view: Literal["full", "summary"] = Query("full", description="summary: PostSummary items")  # "summary" = schemas.PostSummary fields
+    ):
+    
+    search = search.strip() if search else None  # Whitespace-only searches match everything
+    projection = projections.parse_fields(fields, view)
+
+    # The first pages of the plain listing come straight from the feed, without SQL
+    # (not inside POST /batch, whose uncommitted writes only its own session can see)
+    if search is None and cursor is None and front_page.enabled and batching.current_batch.get() is None:
+        embedded = comments_limit if projection is None or "comments" in projection.fields else 0
+        cached = front_page.page(page, take, embedded)
+        if cached is not None:
+            rows, next_cursor = cached
+            if next_cursor is not None:
+                response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+            if projection is not None:
+                return ORJSONResponse(project(rows, projection, comments_limit), headers=dict(response.headers))
+            return RawResponse(render(rows, comments_limit), media_type="application/json", headers=dict(response.headers))
+
+    query, ranked = listing_query(db, search, sort, highlight, cursor, projection)
     # Apply pagination (offset skips the first N records [page 1: skip 0, page 2: skip 25], limit takes only the specified number of records)
-    posts = query.order_by(models.Post.created_at.desc()).offset((page - 1) * take).limit(take).all()
-    return posts
+    if cursor is None:
+        query = query.offset((page - 1) * take)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(take + 1).all()
+    if len(rows) > take:
+        rows = rows[:take]
+        if not ranked:
+            last = rows[-1]
+            last_id = last.id if projection is not None else last.Post.id
+            response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.sort_key, last_id)
+
+    # Projected rows are already plain values: encode them directly
+    if projection is not None:
+        items = projections.build_items(db, rows, projection, comments_limit)
+        return ORJSONResponse(items, headers=dict(response.headers))
+
+    # One batched SELECT for every comment on the page instead of one per post
+    posts = [row.Post for row in rows]
+    loaders.load_comments(db, posts, limit=comments_limit)
+
+    # Serialized with the model of the items actually returned (the union in response_model is for the docs)
+    if search and fts.fts_enabled and highlight:
+        # Snippets come back as an extra column next to each post; only these hits carry the field
+        body = search_results.dump_json([
+            schemas.PostSearchResult.model_validate(row.Post).model_copy(update={"snippet": row.snippet}) for row in rows
+        ])
+    else:
+        body = post_list.dump_json(post_list.validate_python(posts, from_attributes=True))
+    return RawResponse(body, media_type="application/json", headers=dict(response.headers))
 
 # GET a specific post
 @router.get("/{post_id}", response_model=schemas.PostResponse)
-def read_post(post_id: int, db: Session = Depends(get_db)):
-    post = find_post(post_id, db)
+def read_post(
+    post_id: int,
+    db: Session = Depends(get_db),
+    comments_limit: Optional[int] = Query(None, ge=0)  # Max comments embedded (default: all)
+    ):
+    post = db.query(models.Post).options(*loaders.post_options()).filter(models.Post.id == post_id).first()
     # If post does not exist
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Post with id {post_id} not found!"
             )
+    loaders.load_comments(db, [post], limit=comments_limit)
     return post
 
 # CREATE a post
@@ -63,6 +153,13 @@ def create_post(
     current_user: models.User = Depends(get_current_user)  # Requires valid 64-char API token
     ):
 
+    # Group commit: the writer thread inserts it together with other requests' rows and answers once committed
+    if group_commit.enabled():
+        new_post = group_commit.group_writer.insert(
+            models.Post, title=post.title, content=post.content, author_id=current_user.id)
+        events.emit(None, events.POST_CREATED, new_post.id, events.post_data(new_post, current_user))
+        return created_post(new_post, current_user)
+
     # Create new post
     new_post = models.Post(
         title=post.title,
@@ -72,8 +169,21 @@ def create_post(
     db.add(new_post)  # Stage object for insertion
     db.commit()  # Save to database
     db.refresh(new_post)  # Update object with database defaults
+    events.emit(db, events.POST_CREATED, new_post.id, events.post_data(new_post, current_user))
     return new_post
 
+# Response for a post inserted by the group-commit writer (detached: author and comments are filled in here)
+def created_post(new_post: models.Post, author: models.User) -> dict:
+    return {
+        "id": new_post.id,
+        "title": new_post.title,
+        "content": new_post.content,
+        "created_at": new_post.created_at,
+        "author": author,
+        "comment_count": 0,
+        "comments": [],
+    }
+
 # UPDATE a specific post
 @router.patch("/{post_id}", response_model=schemas.PostResponse)
 def update_post(
@@ -106,6 +216,8 @@ def update_post(
 
     db.commit()  # Save to database
     db.refresh(updated_post)
+    events.emit(db, events.POST_UPDATED, post_id, events.post_data(updated_post, current_user))
+    loaders.load_comments(db, [updated_post])
     return updated_post
 
 # DELETE a specific post
@@ -127,8 +239,22 @@ def delete_post(
 
     db.delete(post)  # Stage object for deletion
     db.commit()  # Save to database
+    events.emit(db, events.POST_DELETED, post_id, {"id": post_id})
     return {"success": True}
 
+# [Testing] Unsaved posts with Faker text (CPU-bound: async mode builds them on the threadpool)
+def fake_posts(count: int, author_id: int) -> List[models.Post]:
+    from faker import Faker  # [Testing] Heavy import, loaded on first use so workers boot without it
+    fake = Faker()
+    return [
+        models.Post(
+            title=fake.sentence(nb_words=6),
+            content=fake.text(max_nb_chars=200),
+            author_id=author_id
+        )
+        for _ in range(count)
+    ]
+
 # [Testing] To test pagination
 @router.post("/generate-test-posts")
 def generate_test_posts(
@@ -136,17 +262,6 @@ def generate_test_posts(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    fake = Faker()
-    posts = []
-    
-    for _ in range(count):
-        post = models.Post(
-            title=fake.sentence(nb_words=6),
-            content=fake.text(max_nb_chars=200),
-            author_id=current_user.id
-        )
-        posts.append(post)
-    
-    db.add_all(posts)
+    db.add_all(fake_posts(count, current_user.id))
     db.commit()
     return {"message": f"Generated {count} test posts"}
\ No newline at end of file
@@ -0,0 +1,55 @@
+# -- Runtime Statistics Router --
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status  # FastAPI-related toolkit
+from typing import Literal  # Sort options
+from app import models  # Models
+from ..auth import get_current_user, get_current_user_async, identity_cache, password_hasher, token_store  # Authentication, auth caches, stores and workers
+from ..config import settings  # Application settings
+from ..events import bus  # Event bus
+from ..feed import front_page  # Front-page feed
+from ..group_commit import group_writer  # Group-commit writer
+
+# Same authentication as the rest of the app in the selected mode
+current_user_dependency = get_current_user_async if settings.async_db else get_current_user
+
+# Diagnostics show SQL text, query plans and cache internals, and sign-up is open: only the accounts listed in
+# BLOG_STATS_USERS may read them (nobody when it is unset)
+def require_stats_access(current_user: models.User = Depends(current_user_dependency)) -> models.User:
+    if current_user.username not in settings.stats_users:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"success": False, "message": "This account may not read runtime statistics."}
+        )
+    return current_user
+
+router = APIRouter(prefix="/stats", tags=["stats"], dependencies=[Depends(require_stats_access)])
+
+# GET cache and token store counters
+@router.get("")
+def read_stats(request: Request):
+    return {
+        "token_store": token_store.stats(),
+        "user_cache": identity_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "response_cache": request.app.state.read_cache.stats(),
+        "admission": request.app.state.admission.stats(),
+        "group_commit": group_writer.stats(),
+        "feed": front_page.stats(),
+        "events": bus.stats(),
+        "startup": request.app.state.startup,
+        "slow_queries": request.app.state.slow_queries.stats() if request.app.state.slow_queries else None
+    }
+
+# GET the slowest statements (aggregated by normalized SQL, with the plan captured when they were slow)
+@router.get("/slow-queries")
+def read_slow_queries(
+    request: Request,
+    limit: int = Query(20, gt=0, le=200),
+    sort: Literal["total", "count", "max", "mean", "last_seen"] = Query("total")
+    ):
+    slow_log = request.app.state.slow_queries
+    if slow_log is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="The slow-query log is disabled (BLOG_SLOW_QUERY_LOG=0)."
+        )
+    return {**slow_log.stats(), "queries": slow_log.top(limit, sort)}
\ No newline at end of file
@@ -1,7 +1,7 @@
 # -- Pydantic Models for Request/Response Validation --
 from datetime import datetime  # For created_at
 from pydantic import BaseModel, EmailStr, Field, model_validator  # For models
-from typing import Optional  # Optional fields like updating one attribute only
+from typing import Any, List, Literal, Optional, Union  # Optional fields like updating one attribute only, batch items, listing items
 
 # ---- User Schemas ----
 class UserBase(BaseModel):
@@ -52,10 +52,31 @@ class PostResponse(PostBase):
     id: int
     created_at: datetime
     author: UserResponse  # Nested user data for future usage
+    comment_count: int = 0  # All comments of the post, however many are embedded
     comments: list[CommentResponse] = []
     class Config:
         from_attributes = True  # Allows conversion from SQLAlchemy to Pydantic
 
+# Search hit with its highlighted match (GET /posts?search=...&highlight=true)
+class PostSearchResult(PostResponse):
+    snippet: Optional[str] = None
+
+# Lightweight listing item (GET /posts?view=summary); any subset of fields can be picked with ?fields=
+class AuthorSummary(BaseModel):
+    id: int
+    username: str
+
+class PostSummary(BaseModel):
+    id: int
+    title: str
+    created_at: datetime
+    comment_count: int = 0
+    author: Optional[AuthorSummary] = None
+
+# GET /posts items: plain posts, search hits when highlighting, or summaries (?view=summary; ?fields= returns
+# the requested subset of PostSearchResult's fields). Documents the route; each page is serialized with its own model.
+PostListItem = Union[PostResponse, PostSearchResult, PostSummary]
+
 class PostUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -79,6 +100,21 @@ class PostQueryParams(BaseModel):
     take: Optional[int] = 25
     search: Optional[str] = None
 
+# --- Batch Schemas ---
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PATCH", "DELETE"] = Field(..., example="POST")
+    path: str = Field(..., example="/posts/1/comments")  # A /posts route, query string included
+    body: Optional[Any] = Field(None, example={"body": "Nice post!"})
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1)
+    atomic: bool = True  # All or nothing; False commits every operation that succeeded
+
+class BatchResult(BaseModel):
+    status: int
+    headers: dict = {}
+    body: Any = None
+
 # --- General Schemas ---
 class DeleteResponse(BaseModel):
     success: bool
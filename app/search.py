@@ -0,0 +1,114 @@
+# -- Full-Text Search (SQLite FTS5) --
+from sqlalchemy import column, func, literal_column, table, text  # For building FTS queries
+from sqlalchemy.engine import Engine  # Engine type hint
+from sqlalchemy.exc import OperationalError  # Raised when FTS5 is not compiled in
+from app import models  # Models
+
+FTS_TABLE = "posts_fts"
+
+# Lightweight handle on the virtual table (it is not part of the ORM metadata)
+posts_fts = table(FTS_TABLE, column("rowid"), column("title"), column("content"))
+
+# External-content table: the index stores only tokens, the text itself stays in posts
+CREATE_FTS_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, content,
+    content='posts', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# Triggers keep the index in sync with every write to posts (routes, scripts and raw SQL alike)
+CREATE_FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+# Set by setup_search(); routes fall back to ILIKE scans while this is False
+fts_enabled = False
+
+# Check whether the SQLite library behind the engine was built with FTS5
+def fts5_available(engine: Engine) -> bool:
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)"))
+            conn.execute(text("DROP TABLE temp._fts5_probe"))
+        except OperationalError:
+            return False
+    return True
+
+# Create the index and its triggers if missing (safe to call on every startup)
+def setup_search(engine: Engine) -> bool:
+    global fts_enabled
+    fts_enabled = fts5_available(engine)
+    if not fts_enabled:
+        return False
+
+    with engine.begin() as conn:
+        existed = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+        conn.execute(text(CREATE_FTS_TABLE))
+        for trigger in CREATE_FTS_TRIGGERS:
+            conn.execute(text(trigger))
+
+        # Posts written before the index existed have to be indexed once
+        if not existed:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return True
+
+# Rebuild the whole index from the posts table
+def rebuild_index(engine: Engine) -> None:
+    setup_search(engine)
+    if not fts_enabled:
+        raise RuntimeError("SQLite was built without FTS5; search falls back to ILIKE.")
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+# Drop the index and its triggers (used before dropping the posts table)
+def drop_search(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+# Turn free text into a safe FTS5 query: every word is quoted and prefix-matched, all must match
+def build_match_query(search: str) -> str:
+    terms = [term.replace('"', '""') for term in search.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+# Restrict a Post query to FTS matches, ranked by relevance (best first)
+def apply_search(query, search: str, highlight: bool = False):
+    match = build_match_query(search)
+    if not match:
+        return query
+
+    query = query.join(posts_fts, posts_fts.c.rowid == models.Post.id).filter(
+        literal_column(FTS_TABLE).op("MATCH")(match)
+    )
+    if highlight:
+        query = query.add_columns(
+            func.snippet(literal_column(FTS_TABLE), -1, "<mark>", "</mark>", "…", 16).label("snippet")
+        )
+    return query
+
+# Ordering clause for ranked results (bm25 is lower for better matches)
+def rank_order():
+    return func.bm25(literal_column(FTS_TABLE)).asc()
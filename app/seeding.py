@@ -0,0 +1,289 @@
+# -- Synthetic Dataset Seeding for Capacity Tests (millions of rows, reproducible from a seed) --
+import base64  # bcrypt salt encoding
+import hashlib  # Dataset fingerprint
+import random  # Seeded generators, one per chunk
+import time  # Progress timers
+from bisect import bisect  # Skewed id sampling
+from collections import deque  # Chunks being generated
+from concurrent.futures import Executor, ProcessPoolExecutor  # Parallel text generation
+from dataclasses import asdict, dataclass  # Seed settings and chunks
+from datetime import datetime, timedelta  # Post timestamps
+from functools import lru_cache  # Cumulative weights, once per worker
+from itertools import accumulate  # Cumulative weights
+from typing import Callable, Iterator, List, Optional, Tuple  # Type hints
+import bcrypt  # Password hash with a seeded salt
+import orjson  # Chunk fingerprints
+from sqlalchemy import String, bindparam, create_engine, event, func, insert, select, update  # Core bulk inserts
+from sqlalchemy.engine import Connection, Engine  # Type hints
+from app import comment_counts, migrations, models, search  # Tables, index order, comment counters and the full-text index
+from app.config import settings  # bcrypt cost factor
+
+users = models.User.__table__
+posts = models.Post.__table__
+comments = models.Comment.__table__
+TABLES = (users, posts, comments)
+
+START = datetime(2024, 1, 1)  # Fixed, so timestamps do not depend on the day the dataset was made
+
+# Roughly by frequency; words are drawn with Zipf weights, so texts read like text to FTS5 (common words
+# everywhere, rare ones in few posts) and searches for any word have hits
+WORDS = (
+    "the of and to a in is it that for on was with as this be at by from have not are but or you "
+    "all we can more one so if about what when there their new time people just like will up out "
+    "some first into after good now only how also year way day because make work over most even "
+    "blog post python sqlite query index cache database server request latency page search comment "
+    "thread async pool session commit cursor schema migration benchmark release feature bug fix test "
+    "code data user api stream batch worker queue lock journal vacuum pragma deploy config log metric "
+    "garden coffee travel music winter summer river mountain city night morning story recipe bread "
+    "pasta tomato basil olive lemon pepper garlic onion butter honey apple orange forest ocean book "
+    "film game photo weekend family friend school market street train bike run walk rain snow sun "
+    "idea question answer problem reason result change update review note list guide tip trick"
+).split()
+
+# Standard base64 alphabet -> bcrypt's, for the seeded salt
+BCRYPT_ALPHABET = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+)
+
+# Relaxed for the load only: nothing here survives a crash, a failed seed is rerun with --reset
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",  # New pages of an empty table need no rollback journal anyway
+    "PRAGMA synchronous = OFF",
+]
+
+@dataclass
+class SeedConfig:
+    users: int = 10000
+    posts: int = 100000
+    comments: int = 1000000
+    viral_posts: int = 10  # Posts that share `viral_share` of all comments
+    viral_share: float = 0.6
+    author_skew: float = 1.1  # Zipf exponent of post authors and commenters (0 = uniform); user 1 is the busiest
+    days: int = 365  # Posts are spread over this many days from START, ids in time order
+    seed: int = 42
+    password: str = "seed-password"  # Shared by every user
+
+@dataclass(frozen=True)
+class Chunk:
+    kind: str  # "posts" or "comments"
+    index: int
+    first_id: int
+    count: int
+
+def username(index: int) -> str:
+    return f"seed_user_{index}"
+
+def chunk_rng(seed: int, kind: str, index: int) -> random.Random:
+    # A generator per chunk: rows do not depend on the number of workers or on scheduling
+    return random.Random(f"{seed}:{kind}:{index}")
+
+@lru_cache(maxsize=None)
+def cumulative(count: int, exponent: float) -> Tuple[float, ...]:
+    return tuple(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+# An id in 1..count, low ids favoured by `exponent`
+def skewed_id(rng: random.Random, count: int, exponent: float) -> int:
+    if exponent <= 0:
+        return rng.randint(1, count)
+    weights = cumulative(count, exponent)
+    return min(bisect(weights, rng.random() * weights[-1]), count - 1) + 1
+
+def words(rng: random.Random, count: int) -> List[str]:
+    return rng.choices(WORDS, cum_weights=cumulative(len(WORDS), 1.0), k=count)
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(words(rng, rng.randint(low, high))).capitalize() + "."
+
+def paragraph(rng: random.Random, sentences: Tuple[int, int], length: Tuple[int, int]) -> str:
+    return " ".join(sentence(rng, *length) for _ in range(rng.randint(*sentences)))
+
+# Same post ids for the same seed (sampled once, sent to every worker)
+def viral_post_ids(config: SeedConfig) -> Tuple[int, ...]:
+    count = min(config.viral_posts, config.posts)
+    return tuple(sorted(random.Random(f"{config.seed}:viral").sample(range(1, config.posts + 1), count)))
+
+# One hash for every user, with a salt from the seed (bcrypt would pick a random one) and the configured cost
+def password_hash(config: SeedConfig) -> str:
+    rng = random.Random(f"{config.seed}:password")
+    salt = base64.b64encode(bytes(rng.getrandbits(8) for _ in range(16))).translate(BCRYPT_ALPHABET)[:22]
+    prefix = f"$2b${settings.bcrypt_rounds:02d}$".encode("ascii")
+    return bcrypt.hashpw(config.password.encode("utf-8"), prefix + salt).decode("utf-8")
+
+# Pool entry point (module-level so a process pool can pickle it): the rows of one chunk and their digest
+def generate_chunk(config: SeedConfig, viral: Tuple[int, ...], chunk: Chunk) -> Tuple[List[dict], bytes]:
+    rng = chunk_rng(config.seed, chunk.kind, chunk.index)
+    ids = range(chunk.first_id, chunk.first_id + chunk.count)
+    if chunk.kind == "posts":
+        step = config.days * 86400 / config.posts
+        rows = [
+            {
+                "id": post_id,
+                "title": " ".join(words(rng, rng.randint(3, 9))).capitalize(),
+                "content": paragraph(rng, (2, 6), (6, 16)),
+                "author_id": skewed_id(rng, config.users, config.author_skew),
+                # SQLite's own "YYYY-MM-DD HH:MM:SS" text, the format server defaults produce
+                "created_at": (START + timedelta(seconds=int((post_id - 1) * step + rng.random() * step)))
+                .strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            for post_id in ids
+        ]
+    else:
+        rows = [
+            {
+                "id": comment_id,
+                "body": paragraph(rng, (1, 3), (4, 14)),
+                "post_id": rng.choice(viral) if viral and rng.random() < config.viral_share
+                else rng.randint(1, config.posts),
+                "commenter_id": skewed_id(rng, config.users, config.author_skew),
+            }
+            for comment_id in ids
+        ]
+    return rows, hashlib.sha256(orjson.dumps(rows)).digest()
+
+def chunks(kind: str, total: int, chunk_size: int) -> List[Chunk]:
+    return [Chunk(kind, index, first, min(chunk_size, total - first + 1))
+            for index, first in enumerate(range(1, total + 1, chunk_size))]
+
+# Results in chunk order, with at most `window` chunks generated ahead of the inserts (bounded memory)
+def generate(executor: Optional[Executor], config: SeedConfig, viral: Tuple[int, ...], specs: List[Chunk],
+             window: int) -> Iterator[Tuple[List[dict], bytes]]:
+    if executor is None:
+        for chunk in specs:
+            yield generate_chunk(config, viral, chunk)
+        return
+    pending: deque = deque()
+    specs = iter(specs)
+    for chunk in specs:
+        pending.append(executor.submit(generate_chunk, config, viral, chunk))
+        if len(pending) >= window:
+            break
+    while pending:
+        rows = pending.popleft().result()
+        chunk = next(specs, None)
+        if chunk is not None:
+            pending.append(executor.submit(generate_chunk, config, viral, chunk))
+        yield rows
+
+# A separate engine with the load pragmas, so the app's profile (WAL, BEGIN IMMEDIATE) stays out of the way
+def load_engine(url: str, cache_kib: int) -> Engine:
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in LOAD_PRAGMAS + [f"PRAGMA cache_size = -{cache_kib}"]:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+# The file's journal mode, after setting it when `mode` is given
+def set_journal_mode(url: str, mode: Optional[str] = None) -> str:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return conn.exec_driver_sql(f"PRAGMA journal_mode = {mode}" if mode else "PRAGMA journal_mode").scalar()
+    finally:
+        engine.dispose()
+
+def is_empty(conn: Connection) -> bool:
+    return all(conn.execute(select(func.count()).select_from(table)).scalar() == 0 for table in TABLES)
+
+# Secondary indexes of the seeded tables (dropped for the load, built once at the end), by table and index name
+# so every run drops and builds them in the same order and lays out the same pages
+def seeded_indexes() -> list:
+    return [index for table in sorted(TABLES, key=lambda table: table.name) for index in migrations.sorted_indexes(table)]
+
+# Fill a migrated, empty database. `report(step, rows, seconds)` is called as the load goes.
+# Returns the summary, with a fingerprint of every generated row: equal seeds and settings give equal fingerprints.
+def seed(url: str, config: SeedConfig, workers: int = 1, chunk_size: int = 10000,
+         transaction_rows: int = 500000, cache_kib: int = 262144,
+         report: Callable[[str, int, float], None] = lambda step, rows, seconds: None) -> dict:
+    started = time.perf_counter()
+    journal_mode = set_journal_mode(url)  # WAL persists in the file: read it before the load switches it off
+    engine = load_engine(url, cache_kib)
+    fingerprint = hashlib.sha256()
+    try:
+        with engine.begin() as conn:
+            if not is_empty(conn):
+                raise ValueError("The database already has users, posts or comments (seed an empty one, e.g. with --reset).")
+
+        # No per-row trigger work (FTS index, comment counters) and no index maintenance during the load
+        search.drop_search(engine)
+        with engine.begin() as conn:
+            comment_counts.drop_triggers(conn)
+            for index in seeded_indexes():
+                index.drop(bind=conn, checkfirst=True)
+
+        step_started = time.perf_counter()
+        user_hash = password_hash(config)
+        with engine.begin() as conn:
+            for first in range(1, config.users + 1, chunk_size):
+                rows = [
+                    {"id": i, "username": username(i), "email": f"{username(i)}@example.com", "password_hash": user_hash}
+                    for i in range(first, min(first + chunk_size, config.users + 1))
+                ]
+                conn.execute(insert(users), rows)
+                fingerprint.update(orjson.dumps(rows))
+        report("users", config.users, time.perf_counter() - step_started)
+
+        viral = viral_post_ids(config)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for table, total, statement in (
+                (posts, config.posts, insert(posts).values(created_at=bindparam("created_at", type_=String))),
+                (comments, config.comments, insert(comments)),
+            ):
+                step_started = time.perf_counter()
+                written = 0
+                conn = engine.connect()
+                try:
+                    conn.begin()
+                    for rows, digest in generate(executor, config, viral, chunks(table.name, total, chunk_size), workers * 2):
+                        conn.execute(statement, rows)
+                        fingerprint.update(digest)
+                        written += len(rows)
+                        if written % transaction_rows < len(rows):
+                            conn.commit()
+                            conn.begin()
+                            report(table.name, written, time.perf_counter() - step_started)
+                    conn.commit()
+                finally:
+                    conn.close()
+                report(table.name, written, time.perf_counter() - step_started)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Indexes, counters and the FTS index in one pass each over the loaded tables
+        step_started = time.perf_counter()
+        with engine.begin() as conn:
+            for index in seeded_indexes():
+                index.create(bind=conn, checkfirst=True)
+        report("indexes", len(seeded_indexes()), time.perf_counter() - step_started)
+
+        step_started = time.perf_counter()
+        with engine.begin() as conn:
+            comment_counts.setup_counts(conn)  # Triggers back, then one backfill
+        report("comment counts", config.posts, time.perf_counter() - step_started)
+
+        step_started = time.perf_counter()
+        search.setup_search(engine)  # Recreated table: rebuilt from posts once
+        report("search index", config.posts, time.perf_counter() - step_started)
+
+        with engine.connect() as conn:
+            # Migrations are stamped with START too, so equal seeds and settings give byte-identical files
+            conn.execute(update(models.SchemaMigration.__table__).values(applied_at=START))
+            conn.exec_driver_sql("ANALYZE")  # Fresh statistics for the planner
+            conn.commit()
+    finally:
+        engine.dispose()
+        set_journal_mode(url, journal_mode)
+
+    return {
+        **asdict(config),
+        "viral_post_ids": list(viral),
+        "seconds": round(time.perf_counter() - started, 2),
+        "fingerprint": fingerprint.hexdigest(),
+    }
\ No newline at end of file
@@ -0,0 +1,145 @@
+# -- Slow-Query Log with EXPLAIN QUERY PLAN Capture --
+import logging  # Slow statements are logged as they happen
+import re  # SQL normalization
+import threading  # Statements finish on threadpool threads
+import time  # Timers
+from collections import Counter, OrderedDict  # Routes per statement, LRU of statements
+from dataclasses import dataclass, field  # Aggregated entries
+from typing import List  # Type hints
+from sqlalchemy import event  # Cursor execution hooks
+from sqlalchemy.engine import Engine  # Engine type hint
+from app.request_context import current_route  # Calling route
+
+logger = logging.getLogger("app.slow_queries")
+
+SORT_KEYS = ("total", "count", "max", "mean", "last_seen")
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")  # Not the digits of names like users_1
+IN_LIST = re.compile(r"\bIN \(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+
+# One shape per statement: whitespace collapsed, literals replaced, expanded IN lists folded
+def normalize(statement: str) -> str:
+    statement = " ".join(statement.split())
+    statement = STRING_LITERAL.sub("?", statement)
+    statement = NUMBER_LITERAL.sub("?", statement)
+    return IN_LIST.sub("IN (?, ...)", statement)
+
+# Types of the bound parameters, never their values ("(int, str)", "500 x (str, int)")
+def param_shape(parameters, executemany: bool) -> str:
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {param_shape(rows[0], False)}" if rows else "0 rows"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+@dataclass
+class SlowQuery:
+    sql: str
+    engine: str
+    params: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    last_seen: float = 0.0
+    plan: List[str] = field(default_factory=list)  # Captured at the latest slow execution
+    routes: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "engine": self.engine,
+            "params": self.params,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+            "last_seen": self.last_seen,
+            "routes": dict(self.routes.most_common(5)),
+            "plan": self.plan,
+        }
+
+# Statements slower than the threshold, aggregated by normalized SQL (bounded, least recently seen dropped first)
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = 100, max_entries: int = 200, explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.max_entries = max_entries
+        self.explain = explain
+        self._entries: "OrderedDict[tuple, SlowQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.slow_statements = 0
+
+    def watch_engine(self, engine: Engine, role: str) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info["slow_query_started"] = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info.pop("slow_query_started", time.perf_counter())
+            if elapsed >= self.threshold:
+                plan = self.explain_plan(conn, statement, parameters, executemany) if self.explain else []
+                self.record(role, statement, parameters, executemany, elapsed, plan)
+
+    # The plan SQLite picks right now, run on the same raw connection (no events, nothing committed)
+    @staticmethod
+    def explain_plan(conn, statement: str, parameters, executemany: bool) -> List[str]:
+        if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+            return []  # DDL, PRAGMA, BEGIN...
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+                return [row[3] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as exc:  # Never fail the statement that was being measured
+            return [f"EXPLAIN failed: {exc}"]
+
+    def record(self, role: str, statement: str, parameters, executemany: bool, elapsed: float, plan: List[str]) -> None:
+        sql = normalize(statement)
+        params = param_shape(parameters, executemany)
+        route = current_route() or "(no request)"
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            key = (role, sql)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = SlowQuery(sql=sql, engine=role, params=params)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_ms = elapsed_ms
+            entry.last_seen = time.time()
+            entry.params = params
+            entry.routes[route] += 1
+            if plan:
+                entry.plan = plan
+            self.slow_statements += 1
+        logger.warning("Slow query (%.1f ms, %s, %s): %s | params %s | plan: %s",
+                       elapsed_ms, role, route, sql, params, " / ".join(plan) or "-")
+
+    # Worst offenders first
+    def top(self, limit: int = 20, sort: str = "total") -> List[dict]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        with self._lock:
+            entries = [entry.as_dict() for entry in self._entries.values()]
+        key = {"total": "total_ms", "count": "count", "max": "max_ms", "mean": "mean_ms", "last_seen": "last_seen"}[sort]
+        return sorted(entries, key=lambda entry: entry[key], reverse=True)[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "statements": len(self._entries),
+            "max_entries": self.max_entries,
+            "slow_statements": self.slow_statements,
+        }
\ No newline at end of file
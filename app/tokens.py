@@ -0,0 +1,167 @@
+# -- API Token Stores (in-memory or shared SQLite) --
+import hashlib  # Tokens are stored as digests in the shared store
+import heapq  # Expiry queue for the in-memory store
+import threading  # Locking and the background sweeper
+import time  # Expiry timestamps
+from abc import ABC, abstractmethod  # Store interface
+from typing import Dict, List, Optional, Tuple  # Type hints
+from sqlalchemy import delete, func, insert, select  # Core statements for the shared store
+from sqlalchemy.engine import Engine  # Engine type hint
+
+# Common interface used by app.auth
+class TokenStore(ABC):
+    backend: str
+    blocking = False  # True when calls do I/O: async routes run them on the threadpool
+
+    def __init__(self):
+        self.issued = 0  # Tokens created by this process
+        self.evicted = 0  # Expired tokens removed by this process
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def put(self, token: str, user_id: int, expires_at: float) -> None:
+        ...
+
+    # (user_id, expires_at) for a live token, None if unknown or expired
+    @abstractmethod
+    def lookup(self, token: str) -> Optional[Tuple[int, float]]:
+        ...
+
+    def get(self, token: str) -> Optional[int]:
+        entry = self.lookup(token)
+        return entry[0] if entry else None
+
+    @abstractmethod
+    def sweep(self) -> int:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "size": self.size(), "issued": self.issued, "evicted": self.evicted}
+
+    # Remove expired tokens every `interval` seconds on a daemon thread
+    def start_sweeper(self, interval: float = 30.0) -> None:
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=run, name=f"{self.backend}-token-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+# Per-process store: dict lookups plus a min-heap of expiries, so a sweep only touches expired entries
+class MemoryTokenStore(TokenStore):
+    backend = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._tokens: Dict[str, Tuple[int, float]] = {}
+        self._expiries: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def put(self, token: str, user_id: int, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[token] = (user_id, expires_at)
+            heapq.heappush(self._expiries, (expires_at, token))
+            self.issued += 1
+            self._sweep_locked(time.time())  # Amortized: logins pay for clearing what has expired
+
+    def lookup(self, token: str) -> Optional[Tuple[int, float]]:
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        if time.time() > entry[1]:
+            with self._lock:
+                if self._tokens.pop(token, None) is not None:
+                    self.evicted += 1
+            return None
+        return entry
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep_locked(time.time())
+
+    # Pop heap entries until the earliest expiry is in the future (O(k log n) for k expired tokens)
+    def _sweep_locked(self, now: float) -> int:
+        removed = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, token = heapq.heappop(self._expiries)
+            entry = self._tokens.get(token)
+            if entry is not None and entry[1] == expires_at:
+                del self._tokens[token]
+                removed += 1
+        self.evicted += removed
+        return removed
+
+    def size(self) -> int:
+        return len(self._tokens)
+
+# Shared store: a table in the SQLite database, so every uvicorn worker sees every token
+class SQLiteTokenStore(TokenStore):
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(self, engine: Engine, table, read_engine: Optional[Engine] = None):
+        super().__init__()
+        self.engine = engine
+        self.read_engine = read_engine or engine  # Lookups never take the write lock
+        self.table = table
+
+    # Only a digest of each token is written to disk
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def put(self, token: str, user_id: int, expires_at: float) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(insert(self.table).values(
+                token_hash=self.digest(token), user_id=user_id, expires_at=expires_at
+            ))
+        self.issued += 1
+
+    def lookup(self, token: str) -> Optional[Tuple[int, float]]:
+        token_hash = self.digest(token)
+        with self.read_engine.connect() as conn:
+            row = conn.execute(
+                select(self.table.c.user_id, self.table.c.expires_at).where(self.table.c.token_hash == token_hash)
+            ).first()
+        if row is None:
+            return None
+        if time.time() > row.expires_at:
+            with self.engine.begin() as conn:
+                removed = conn.execute(delete(self.table).where(self.table.c.token_hash == token_hash)).rowcount
+            self.evicted += removed
+            return None
+        return row.user_id, row.expires_at
+
+    # Range delete on the expires_at index
+    def sweep(self) -> int:
+        with self.engine.begin() as conn:
+            removed = conn.execute(delete(self.table).where(self.table.c.expires_at <= time.time())).rowcount
+        self.evicted += removed
+        return removed
+
+    def size(self) -> int:
+        with self.read_engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar_one()
+
+# Build the store selected by BLOG_TOKEN_STORE
+def build_store(backend: str, engine: Engine, table, read_engine: Optional[Engine] = None) -> TokenStore:
+    if backend == "memory":
+        return MemoryTokenStore()
+    if backend == "sqlite":
+        return SQLiteTokenStore(engine, table, read_engine)
+    raise ValueError(f"Unknown token store backend: {backend!r} (expected 'memory' or 'sqlite')")
@@ -0,0 +1,106 @@
+# -- Authenticated-Identity Cache (token -> user snapshot) --
+import threading  # Routes run on the threadpool
+import time  # Expiry checks
+from collections import OrderedDict  # LRU ordering
+from typing import Dict, Optional, Set  # Type hints
+from sqlalchemy import event, inspect  # Invalidation hooks and column introspection
+from sqlalchemy.orm import make_transient_to_detached  # Rebuild cached users without SQL
+from app import models  # Models
+
+# Bounded LRU of resolved users; every entry dies with its token, and user writes drop it early
+class UserCache:
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (user snapshot, expires_at)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Dropped for size or expiry
+        self.invalidations = 0  # Dropped because the user row changed
+
+    # Column values of a loaded user (safe to share across sessions and threads)
+    @staticmethod
+    def snapshot(user: models.User) -> dict:
+        return {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+
+    # Snapshot for a token, or None on a miss
+    def get(self, token: str) -> Optional[dict]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            snapshot, expires_at = entry
+            if time.time() > expires_at:
+                self._remove(token)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return snapshot
+
+    def put(self, token: str, user: models.User, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        snapshot = self.snapshot(user)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (snapshot, expires_at)
+            self._tokens_by_user.setdefault(snapshot["id"], set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    # Forget every token of a user whose row was updated or deleted
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0]["id"]
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Turn a snapshot back into a detached User that a session can adopt with merge(load=False)
+def detached_user(snapshot: dict) -> models.User:
+    user = models.User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+# Keep the cache coherent with writes to the users table made through the ORM
+def watch_user_writes(cache: UserCache) -> None:
+    def invalidate(mapper, connection, target):
+        cache.invalidate_user(target.id)
+
+    event.listen(models.User, "after_update", invalidate)
+    event.listen(models.User, "after_delete", invalidate)
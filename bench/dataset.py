@@ -0,0 +1,75 @@
+# -- Deterministic Benchmark Dataset --
+import random  # Seeded generator, so every run sees the same rows
+from dataclasses import asdict, dataclass  # Dataset size and summary
+from datetime import datetime, timedelta  # Post timestamps
+from sqlalchemy import String, bindparam, insert  # Core bulk inserts
+from sqlalchemy.engine import Engine  # Engine type hint
+from app import models  # Tables
+from app.config import settings  # bcrypt cost factor
+from app.passwords import _hashpw  # Same hash format the app writes
+
+PASSWORD = "bench-password"
+HOT_POST_ID = 1  # The post that gets `hot_comments` comments (read_post with many comments)
+BATCH = 1000  # Rows per executemany
+
+# Small fixed vocabulary: texts stay reproducible and searches always have hits
+WORDS = (
+    "python sqlite fastapi index cursor query latency cache token async thread pool session commit "
+    "search ranking snippet comment post author blog page offset keyset migration schema benchmark "
+    "request response header stream batch import export worker queue lock journal vacuum pragma "
+    "garden coffee travel music winter summer river mountain city night morning story recipe bread "
+    "pasta tomato basil olive lemon pepper garlic onion butter honey apple orange forest ocean"
+).split()
+SEARCH_TERMS = ("python", "sqlite", "coffee", "garden pasta", "index cursor", "mountain")
+
+@dataclass
+class DatasetSize:
+    users: int = 100
+    posts: int = 2000
+    comments: int = 10000
+    hot_comments: int = 500  # Part of `comments`, all on HOT_POST_ID
+
+def username(index: int) -> str:
+    return f"bench_user_{index}"
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+# Fill an empty, migrated database; returns the summary stored with the results
+def seed(engine: Engine, size: DatasetSize, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    password_hash = _hashpw(PASSWORD, settings.bcrypt_rounds)  # Configured cost, so logins never trigger a rehash
+    start = datetime(2024, 1, 1)
+
+    users = [
+        {"username": username(i), "email": f"{username(i)}@example.com", "password_hash": password_hash}
+        for i in range(1, size.users + 1)
+    ]
+    # created_at is written in SQLite's own "YYYY-MM-DD HH:MM:SS" text, the format server defaults produce
+    posts = insert(models.Post.__table__).values(created_at=bindparam("created_at", type_=String))
+    comments = insert(models.Comment.__table__)
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__), users)
+        for first in range(1, size.posts + 1, BATCH):
+            conn.execute(posts, [
+                {
+                    "title": sentence(rng, 6),
+                    "content": sentence(rng, 40),
+                    "author_id": rng.randint(1, size.users),
+                    "created_at": (start + timedelta(seconds=97 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                for i in range(first, min(first + BATCH, size.posts + 1))
+            ])
+
+        hot = min(size.hot_comments, size.comments)
+        for first in range(0, size.comments, BATCH):
+            conn.execute(comments, [
+                {
+                    "body": sentence(rng, 12),
+                    "post_id": HOT_POST_ID if i < hot else rng.randint(1, size.posts),
+                    "commenter_id": rng.randint(1, size.users),
+                }
+                for i in range(first, min(first + BATCH, size.comments))
+            ])
+    return {"seed": seed, **asdict(size)}
\ No newline at end of file
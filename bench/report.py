@@ -0,0 +1,71 @@
+# -- Benchmark Metadata and Run Comparison --
+import json  # Results files
+import platform  # Interpreter and machine
+import sqlite3  # SQLite library version
+import subprocess  # git revision
+import sys  # Output stream
+import time  # Timestamp
+from dataclasses import asdict  # Settings snapshot
+from typing import List, Optional  # Type hints
+from app.config import settings  # Settings that change performance
+
+# Short commit hash plus "-dirty" for uncommitted changes (None outside a git checkout)
+def git_revision() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+def metadata() -> dict:
+    snapshot = {name: str(value) for name, value in asdict(settings).items()}
+    snapshot.pop("db_path")  # A temporary file, different on every run
+    return {
+        "commit": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "settings": snapshot,
+    }
+
+def percent(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+# Side-by-side deltas for every driver/scenario present in both runs
+def compare(baseline: dict, current: dict) -> List[str]:
+    lines = [f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}"]
+    if baseline.get("dataset") != current.get("dataset"):
+        lines.append("  warning: the runs used different datasets, deltas are not comparable")
+    for driver, scenarios in current["results"].items():
+        for name, result in scenarios.items():
+            before = baseline["results"].get(driver, {}).get(name)
+            if before is None:
+                continue
+            lines.append(
+                f"  {driver:<8} {name:<22} req/s {percent(before['throughput_rps'], result['throughput_rps']):>8}  "
+                f"p50 {percent(before['p50_ms'], result['p50_ms']):>8}  "
+                f"p95 {percent(before['p95_ms'], result['p95_ms']):>8}  "
+                f"p99 {percent(before['p99_ms'], result['p99_ms']):>8}"
+            )
+    for phase, result in current.get("startup", {}).items():
+        before = baseline.get("startup", {}).get(phase)
+        if before is not None:
+            lines.append(f"  startup  {phase:<22} p50 {percent(before['p50_ms'], result['p50_ms']):>8}  "
+                         f"min {percent(before['min_ms'], result['min_ms']):>8}")
+    return lines
+
+def write(results: dict, path: Optional[str]) -> None:
+    if path:
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
\ No newline at end of file
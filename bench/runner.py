@@ -0,0 +1,155 @@
+# -- Benchmark Drivers and Measurements --
+import asyncio  # Concurrent clients
+import math  # Percentile ranks
+import os  # Environment for the uvicorn process
+import random  # Deterministic request streams
+import socket  # Free port for uvicorn
+import subprocess  # uvicorn runs in its own process
+import sys  # Current interpreter
+import time  # Timers
+from contextlib import asynccontextmanager  # Driver lifetimes
+from pathlib import Path  # Project root for the uvicorn process
+from dataclasses import asdict, dataclass, field  # Run options and results
+from typing import AsyncIterator, Dict, List  # Type hints
+import httpx  # Client for both drivers
+from bench.dataset import PASSWORD, DatasetSize, username
+from bench.scenarios import Scenario, build_scenarios
+
+DRIVERS = ("asgi", "uvicorn")
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+@dataclass
+class BenchConfig:
+    size: DatasetSize = field(default_factory=DatasetSize)
+    requests: int = 300  # Measured requests per scenario
+    login_requests: int = 30  # bcrypt makes logins far slower than everything else
+    concurrency: int = 8
+    warmup: int = 5
+    seed: int = 42
+    only: List[str] = field(default_factory=list)  # Scenario names to run (empty: all)
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    seconds: float
+    throughput_rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+# Nearest-rank percentile of an already sorted list
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(len(values) * pct / 100))
+    return values[rank - 1]
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> ScenarioResult:
+    values = sorted(latency * 1000 for latency in latencies)
+    return ScenarioResult(
+        requests=len(values),
+        errors=errors,
+        seconds=round(seconds, 4),
+        throughput_rps=round(len(values) / seconds, 2) if seconds else 0.0,
+        mean_ms=round(sum(values) / len(values), 3) if values else 0.0,
+        p50_ms=round(percentile(values, 50), 3),
+        p95_ms=round(percentile(values, 95), 3),
+        p99_ms=round(percentile(values, 99), 3),
+        max_ms=round(values[-1], 3) if values else 0.0,
+    )
+
+# The in-process app behind an ASGI transport (lifespan included, no sockets involved)
+@asynccontextmanager
+async def asgi_client(app, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# A real uvicorn process on the same database file (inherits the BLOG_* environment)
+@asynccontextmanager
+async def uvicorn_client(app, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+CLIENTS = {"asgi": asgi_client, "uvicorn": uvicorn_client}
+
+# Fire the scenario's requests from `concurrency` workers; warm-up requests are not measured
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, warmup: int, seed: int) -> ScenarioResult:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    for _ in range(warmup):
+        path, kwargs = scenario.make(rng)
+        await client.request(scenario.method, path, **kwargs)
+
+    calls = iter([scenario.make(rng) for _ in range(scenario.requests)])
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for path, kwargs in calls:
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+# API tokens for the write scenarios (one login per user that writes)
+async def login_tokens(client: httpx.AsyncClient, users: int) -> List[str]:
+    tokens = []
+    for index in range(1, min(users, 8) + 1):
+        response = await client.post("/login", params={"username": username(index), "password": PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["api_key"])
+    return tokens
+
+# Every scenario through one driver: reads first, then writes
+async def run_driver(app, driver: str, config: BenchConfig) -> Dict[str, dict]:
+    results = {}
+    async with CLIENTS[driver](app, config.concurrency) as client:
+        tokens = await login_tokens(client, config.size.users)
+        scenarios = build_scenarios(config.size, config.requests, config.login_requests, tokens)
+        for scenario in sorted(scenarios, key=lambda scenario: scenario.writes):
+            if config.only and scenario.name not in config.only:
+                continue
+            result = await run_scenario(client, scenario, config.concurrency, config.warmup, config.seed)
+            print(f"  {driver:<8} {scenario.name:<22} {result.throughput_rps:>9.1f} req/s  "
+                  f"p50 {result.p50_ms:>8.2f} ms  p95 {result.p95_ms:>8.2f} ms  p99 {result.p99_ms:>8.2f} ms  "
+                  f"errors {result.errors}", file=sys.stderr)
+            results[scenario.name] = asdict(result)
+    return results
\ No newline at end of file
@@ -0,0 +1,62 @@
+# -- Benchmark Scenarios (one per route and access pattern) --
+import random  # Per-scenario request parameters
+from dataclasses import dataclass  # Scenario records
+from typing import Callable, List, Tuple  # Type hints
+from bench.dataset import HOT_POST_ID, PASSWORD, SEARCH_TERMS, DatasetSize, username
+
+PAGE_SIZE = 25
+
+# A request template; `make` returns (path, httpx request kwargs) for one request
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    make: Callable[[random.Random], Tuple[str, dict]]
+    requests: int
+    writes: bool = False  # Run after every read scenario so reads see the seeded data only
+
+def build_scenarios(size: DatasetSize, requests: int, login_requests: int, tokens: List[str]) -> List[Scenario]:
+    last_page = max(1, size.posts // PAGE_SIZE)
+
+    def listing(rng):
+        return "/posts", {"params": {"page": rng.randint(1, 4), "take": PAGE_SIZE}}
+
+    def listing_summary(rng):
+        return "/posts", {"params": {"page": rng.randint(1, 4), "take": PAGE_SIZE, "view": "summary"}}
+
+    def listing_search(rng):
+        return "/posts", {"params": {"search": rng.choice(SEARCH_TERMS), "take": PAGE_SIZE}}
+
+    def listing_deep_page(rng):
+        return "/posts", {"params": {"page": rng.randint(max(1, last_page - 4), last_page), "take": PAGE_SIZE}}
+
+    def read_post(rng):
+        return f"/posts/{rng.randint(2, max(2, size.posts))}", {}
+
+    def read_post_hot(rng):
+        return f"/posts/{HOT_POST_ID}", {}
+
+    def get_comments_hot(rng):
+        return f"/posts/{HOT_POST_ID}/comments", {}
+
+    def login(rng):
+        return "/login", {"params": {"username": username(rng.randint(1, size.users)), "password": PASSWORD}}
+
+    def create_comment(rng):
+        post_id = rng.randint(2, max(2, size.posts))  # Never the hot post, so its read cost stays fixed
+        return f"/posts/{post_id}/comments", {
+            "json": {"body": f"bench comment {rng.random():.6f}"},
+            "headers": {"X-API-Token": rng.choice(tokens)},
+        }
+
+    return [
+        Scenario("list_posts", "GET", listing, requests),
+        Scenario("list_posts_summary", "GET", listing_summary, requests),
+        Scenario("list_posts_search", "GET", listing_search, requests),
+        Scenario("list_posts_deep_page", "GET", listing_deep_page, requests),
+        Scenario("read_post", "GET", read_post, requests),
+        Scenario("read_post_hot", "GET", read_post_hot, requests),
+        Scenario("get_comments_hot", "GET", get_comments_hot, requests),
+        Scenario("login", "POST", login, login_requests),
+        Scenario("create_comment", "POST", create_comment, requests, writes=True),
+    ]
\ No newline at end of file
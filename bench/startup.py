@@ -0,0 +1,55 @@
+# -- Cold-Start Benchmark (a fresh interpreter per run) --
+import os  # Child environment
+import subprocess  # Fresh interpreters and uvicorn processes
+import sys  # Interpreter path
+import time  # Timers
+from typing import List  # Type hints
+import httpx  # Readiness polling
+from bench.runner import PROJECT_ROOT, free_port, percentile  # Shared helpers
+
+# Seconds spent in `import app.main` (module-level work only; the lifespan does not run)
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=PROJECT_ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+# Seconds from spawning uvicorn to the first answered request (interpreter, imports, lifespan and warm-up)
+def measure_ready(timeout: float = 60) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=os.environ.copy(), stdout=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while True:
+                try:
+                    client.get("/docs")  # Static page: no schema generation, no SQL
+                    return time.perf_counter() - started
+                except httpx.TransportError:
+                    if process.poll() is not None or time.perf_counter() - started > timeout:
+                        raise RuntimeError("uvicorn did not start")
+                    time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def summarize(seconds: List[float]) -> dict:
+    values = sorted(value * 1000 for value in seconds)
+    return {
+        "runs": len(values),
+        "min_ms": round(values[0], 1),
+        "p50_ms": round(percentile(values, 50), 1),
+        "max_ms": round(values[-1], 1),
+    }
+
+def run_startup(runs: int) -> dict:
+    return {
+        "import": summarize([measure_import() for _ in range(runs)]),
+        "ready": summarize([measure_ready() for _ in range(runs)]),
+    }
\ No newline at end of file
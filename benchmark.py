@@ -0,0 +1,74 @@
+# -- python benchmark.py [--drivers asgi uvicorn] [--output results.json] [--baseline old.json] to benchmark every route --
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed a deterministic dataset and measure every hot route.")
+    parser.add_argument("--drivers", nargs="+", choices=("asgi", "uvicorn"), default=["asgi", "uvicorn"],
+                        help="asgi: in-process through httpx.ASGITransport; uvicorn: a local server process")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=10000)
+    parser.add_argument("--hot-comments", type=int, default=500, help="Comments on the post read by read_post_hot")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs="+", default=[], help="Scenario names to run")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the ETag response cache on (off by default so every request reaches the route)")
+    parser.add_argument("--admission", action="store_true",
+                        help="Keep rate limiting and load shedding on (off by default: one client sends every request)")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="Cold starts to time (import and uvicorn until the first answered request); 0 skips")
+    parser.add_argument("--output", help="JSON results file (default: standard output)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    workdir = tempfile.TemporaryDirectory(prefix="blog-bench-")
+
+    # The app reads BLOG_* at import time, so the throwaway database is configured before importing it
+    os.environ["BLOG_DB_PATH"] = str(Path(workdir.name) / "bench.db")
+    if not args.response_cache:
+        os.environ["BLOG_RESPONSE_CACHE_ENTRIES"] = "0"
+    if not args.admission:
+        os.environ["BLOG_RATE_LIMIT"] = "0"
+        os.environ["BLOG_MAX_IN_FLIGHT"] = "0"
+        os.environ["BLOG_MAX_WRITES_IN_FLIGHT"] = "0"
+    from app.database import engine
+    from app.main import app, prepare_database
+    from bench import dataset, report, runner, startup
+
+    size = dataset.DatasetSize(args.users, args.posts, args.comments, args.hot_comments)
+    config = runner.BenchConfig(size, args.requests, args.login_requests, args.concurrency, args.warmup, args.seed, args.only)
+    prepare_database()  # Normally run by the lifespan, which has not started yet
+    print(f"Seeding {args.users} users, {args.posts} posts, {args.comments} comments...", file=sys.stderr)
+    results = {
+        "meta": report.metadata(),
+        "dataset": dataset.seed(engine, size, args.seed),
+        "config": {key: value for key, value in asdict(config).items() if key != "size"},
+        "results": {},
+    }
+    engine.dispose()  # The uvicorn process opens its own connections
+
+    for driver in args.drivers:
+        results["results"][driver] = asyncio.run(runner.run_driver(app, driver, config))
+    if args.startup_runs > 0:
+        print(f"Timing {args.startup_runs} cold starts...", file=sys.stderr)
+        results["startup"] = startup.run_startup(args.startup_runs)
+
+    report.write(results, args.output)
+    if args.baseline:
+        print("\n".join(report.compare(report.load(args.baseline), results)), file=sys.stderr)
+    workdir.cleanup()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,22 @@
+# -- python export_db.py [--format csv] [--output dump.ndjson] to export posts with comments --
+import argparse
+import sys
+from app.database import read_engine
+from app import export
+
+def export_database(fmt: str, output, batch_size: int):
+    for chunk in export.iter_export(read_engine, fmt, batch_size):
+        output.write(chunk)  # Written as each batch is read, so memory use stays flat
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream every post and its comments to NDJSON or CSV.")
+    parser.add_argument("--format", choices=export.FORMATS, default="ndjson")
+    parser.add_argument("--output", help="File to write (default: standard output)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Posts read per query")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            export_database(args.format, output, args.batch_size)
+    else:
+        export_database(args.format, sys.stdout, args.batch_size)
\ No newline at end of file
@@ -0,0 +1,42 @@
+# -- python migrate_db.py [--status] [--check] to apply pending schema migrations --
+import argparse
+import sys
+from app.database import engine
+from app import comment_counts, migrations
+
+def print_status():
+    version = migrations.current_version(engine)
+    print(f"Schema version: {version} (latest: {migrations.LATEST_VERSION})")
+    for migration in migrations.MIGRATIONS:
+        state = "applied" if migration.version <= version else "pending"
+        print(f"  {migration.version:>3}  {state:<8} {migration.name}")
+
+def check_plans() -> bool:
+    ok = True
+    for result in migrations.verify_plans(engine):
+        print(f"{'OK  ' if result.ok else 'FAIL'} {result.check.name} -> {result.check.index}")
+        for line in result.plan:
+            print(f"       {line}")
+        ok = ok and result.ok
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations and verify index usage.")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations without changing anything")
+    parser.add_argument("--check", action="store_true", help="Run EXPLAIN QUERY PLAN on the hot queries (exit 1 if an index is unused)")
+    parser.add_argument("--target", type=int, help="Stop after this version")
+    parser.add_argument("--recount-comments", action="store_true", help="Recompute posts.comment_count from the comments table")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        sys.exit(0)
+
+    for migration in migrations.upgrade(engine, args.target):
+        print(f"Applied migration {migration.version}: {migration.name}")
+    print(f"Schema version: {migrations.current_version(engine)}")
+    if args.recount_comments:
+        comment_counts.recount(engine)
+        print("Comment counts recomputed")
+    if args.check and not check_plans():
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,11 @@
+# -- python rebuild_search.py to rebuild the full-text search index --
+from app.database import engine
+from app import search
+
+def rebuild_search():
+    print("Rebuilding full-text search index...")
+    search.rebuild_index(engine)
+    print("Search index rebuild complete!")
+
+if __name__ == "__main__":
+    rebuild_search()
\ No newline at end of file
@@ -1,12 +1,13 @@
 # -- python reset_db.py to reset database --
 from app.database import engine
-from app import models
+from app import migrations, models, search
 
 def reset_database():
     print("Dropping all tables...")
+    search.drop_search(engine)
     models.Base.metadata.drop_all(bind=engine)
     print("Creating all tables...")
-    models.Base.metadata.create_all(bind=engine)
+    migrations.upgrade(engine)
     print("Database reset complete!")
 
 if __name__ == "__main__":
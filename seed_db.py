@@ -0,0 +1,59 @@
+# -- python seed_db.py [--posts 1000000] [--comments 10000000] [--reset] to fill a database with synthetic data --
+import argparse
+import json
+import os
+import sys
+from app.database import DB_URL, engine, read_engine
+from app import migrations, seeding
+from reset_db import reset_database
+
+def print_progress(step: str, rows: int, seconds: float):
+    rate = f" ({rows / seconds:,.0f} rows/s)" if seconds > 0 and step in ("users", "posts", "comments") else ""
+    print(f"  {step:<15} {rows:>12,} in {seconds:8.2f}s{rate}", flush=True)
+
+if __name__ == "__main__":
+    defaults = seeding.SeedConfig()
+    parser = argparse.ArgumentParser(description="Fill an empty database with a large, reproducible synthetic dataset.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--posts", type=int, default=defaults.posts)
+    parser.add_argument("--comments", type=int, default=defaults.comments)
+    parser.add_argument("--viral-posts", type=int, default=defaults.viral_posts, help="Posts that get --viral-share of the comments")
+    parser.add_argument("--viral-share", type=float, default=defaults.viral_share, help="Share of comments on the viral posts (0-1)")
+    parser.add_argument("--author-skew", type=float, default=defaults.author_skew, help="Zipf exponent of authors and commenters (0 = uniform)")
+    parser.add_argument("--days", type=int, default=defaults.days, help="Days the post timestamps span")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Same seed and sizes, same rows")
+    parser.add_argument("--password", default=defaults.password, help="Password of every seeded user")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes generating text (1 = none)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per generated chunk and per executemany")
+    parser.add_argument("--transaction-rows", type=int, default=500000, help="Rows per transaction")
+    parser.add_argument("--cache-mib", type=int, default=256, help="SQLite page cache during the load")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    parser.add_argument("--output", help="Also write the summary (with the dataset fingerprint) to this JSON file")
+    args = parser.parse_args()
+
+    if not 0 <= args.viral_share <= 1 or min(args.users, args.posts, args.chunk_size, args.workers) < 1:
+        parser.error("--users, --posts, --chunk-size and --workers must be positive, --viral-share between 0 and 1")
+
+    if args.reset:
+        reset_database()
+    else:
+        migrations.upgrade(engine)
+    # The load switches the journal mode, which needs the app's pooled connections closed
+    engine.dispose()
+    read_engine.dispose()
+
+    config = seeding.SeedConfig(
+        users=args.users, posts=args.posts, comments=args.comments, viral_posts=args.viral_posts,
+        viral_share=args.viral_share, author_skew=args.author_skew, days=args.days, seed=args.seed,
+        password=args.password,
+    )
+    print(f"Seeding {DB_URL} with {args.workers} worker(s)...")
+    try:
+        summary = seeding.seed(DB_URL, config, args.workers, args.chunk_size, args.transaction_rows,
+                               args.cache_mib * 1024, print_progress)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    print(f"Done in {summary['seconds']}s, fingerprint {summary['fingerprint']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(summary, output, indent=2)
\ No newline at end of file
@@ -0,0 +1,27 @@
+# -- Test Fixtures: the app on a throwaway database --
+import os  # Settings come from the environment
+import tempfile  # Throwaway database directory
+import uuid  # Unique usernames per test
+import pytest  # Fixtures
+
+# Settings are read when app.config is imported, so they are set before any test imports the app
+os.environ["BLOG_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="blog-tests-"), "blog.db")  # Never the real database
+os.environ.setdefault("BLOG_RATE_LIMIT", "0")
+os.environ.setdefault("BLOG_BCRYPT_ROUNDS", "4")
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient  # Runs the lifespan (migrations, warm-up)
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+# A fresh user's token header
+@pytest.fixture
+def auth_headers(client):
+    username = f"user_{uuid.uuid4().hex[:12]}"
+    response = client.post("/users", json={"username": username, "email": f"{username}@example.com", "password": "secret123"})
+    assert response.status_code == 200, response.text
+    response = client.post("/login", params={"username": username, "password": "secret123"})
+    assert response.status_code == 200, response.text
+    return {"X-API-Token": response.json()["api_key"]}
\ No newline at end of file
@@ -0,0 +1,32 @@
+# -- Batch Rate Budgets --
+from app import rate_limit  # Budgets and admission control
+
+def limited_admission():
+    limiter = rate_limit.RateLimiter({
+        rate_limit.READ: rate_limit.Budget(50, 100),
+        rate_limit.WRITE: rate_limit.Budget(0.01, 20),  # Practically no refill during the test
+        rate_limit.LOGIN: rate_limit.Budget(0.5, 5),
+    })
+    return rate_limit.AdmissionControl(limiter)
+
+# Wrapping the generator in a batch costs what it costs outside one (count / 100 write tokens)
+def test_batched_generator_pays_its_full_cost(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(client.app.state, "admission", limited_admission())
+    operation = {"method": "POST", "path": "/posts/generate-test-posts?count=2000"}  # 20 tokens: the whole bucket
+    response = client.post("/batch", json={"operations": [operation]}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    operation = {"method": "POST", "path": "/posts", "body": {"title": "batched", "content": "one token"}}
+    response = client.post("/batch", json={"operations": [operation]}, headers=auth_headers)
+    assert response.status_code == 429, response.text
+
+# A 100-operation write batch costs 100 write tokens, not one burst: the client then waits for the debt
+def test_large_write_batch_is_charged_per_operation(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(client.app.state, "admission", limited_admission())
+    operations = [{"method": "POST", "path": "/posts", "body": {"title": f"batched {i}", "content": "x"}} for i in range(100)]
+    response = client.post("/batch", json={"atomic": False, "operations": operations}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post("/batch", json={"operations": operations[:1]}, headers=auth_headers)
+    assert response.status_code == 429, response.text
+    assert int(response.headers["Retry-After"]) > 80 / 0.01  # 1 token + 80 of debt at 0.01 per second
\ No newline at end of file
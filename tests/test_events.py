@@ -0,0 +1,22 @@
+# -- Change Events --
+import asyncio  # Drive the bus on an event loop
+from app.events import EventBus, POSTS  # Bus under test
+
+# A delivery queued before a resumed stream subscribed is not sent again after its replay
+def test_resumed_subscriber_does_not_get_replayed_events_twice():
+    async def scenario():
+        bus = EventBus(keepalive=3600)
+        watcher, _ = bus.subscribe(POSTS)  # Registers this loop with the bus
+        bus.publish("post.created", (POSTS,), {"id": 1})
+        last_id = f"{bus.epoch}-1"
+        bus.publish("post.created", (POSTS,), {"id": 2})  # Its delivery is still queued on the loop
+        resumed, backlog = bus.subscribe(POSTS, last_id)
+        assert len(backlog) == 1 and b'"id":2' in backlog[0]
+        await asyncio.sleep(0)  # Run the queued deliveries
+        bus.publish("post.created", (POSTS,), {"id": 3})
+        await asyncio.sleep(0)
+        assert b'"id":3' in await resumed.get()
+        assert not resumed._queue  # The live copy of event 2 was skipped
+        assert len(watcher._queue) == 3
+        bus.close()
+    asyncio.run(scenario())
\ No newline at end of file
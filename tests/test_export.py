@@ -0,0 +1,38 @@
+# -- Streaming Export --
+import csv  # Parsing the CSV output
+import io  # CSV text as a file
+import json  # Parsing the NDJSON output
+from app import export  # Export pages and writers
+from app.database import read_engine  # The test database
+
+# Posts after `after_id` with tiny pages, encoded like iter_export
+def export_text(fmt: str, after_id: int, batch_size: int, comment_batch_size: int) -> str:
+    writer = export.make_writer(fmt)
+    cursor = export.ExportCursor(after_id=after_id, last_id=after_id)
+    parts = []
+    with read_engine.connect() as conn:
+        while not cursor.done:
+            parts.append(writer.write(export.export_page(conn, cursor, batch_size, comment_batch_size)))
+    parts.append(writer.close())
+    return "".join(parts)
+
+# Every post and comment once, in order, however the pages split them
+def test_comments_are_read_in_pages(client, auth_headers):
+    busy = client.post("/posts", json={"title": "busy", "content": "x"}, headers=auth_headers).json()["id"]
+    quiet = client.post("/posts", json={"title": "quiet", "content": "y"}, headers=auth_headers).json()["id"]
+    comment_ids = [client.post(f"/posts/{busy}/comments", json={"body": f"c{i}"}, headers=auth_headers).json()["id"]
+                   for i in range(7)]
+
+    expected = export_text("ndjson", busy - 1, 500, 500)
+    for batch_size, comment_batch_size in ((1, 1), (2, 3), (500, 2)):
+        assert export_text("ndjson", busy - 1, batch_size, comment_batch_size) == expected
+    records = [json.loads(line) for line in expected.splitlines()]
+    assert [record["id"] for record in records] == [busy, quiet]
+    assert [comment["id"] for comment in records[0]["comments"]] == comment_ids
+    assert records[1]["comments"] == []
+
+    rows = list(csv.reader(io.StringIO(export_text("csv", busy - 1, 1, 3))))
+    assert [(row[0], row[1], row[2]) for row in rows] == (
+        [("post", str(busy), str(busy))] + [("comment", str(comment_id), str(busy)) for comment_id in comment_ids]
+        + [("post", str(quiet), str(quiet))]
+    )
\ No newline at end of file
@@ -0,0 +1,54 @@
+# -- Front-Page Feed --
+from app import models  # Users
+from app.database import SessionLocal  # Direct writes
+from app.feed import front_page  # The app's feed
+
+def test_feed_keeps_at_most_its_comments_and_matches_sql(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(client.app.state.read_cache, "max_entries", 0)  # Every GET reaches the route
+    monkeypatch.setattr(front_page, "comments", 2)
+    front_page.load()
+    post_id = client.post("/posts", json={"title": "busy", "content": "body"}, headers=auth_headers).json()["id"]
+    comment_ids = [client.post(f"/posts/{post_id}/comments", json={"body": f"c{i}"}, headers=auth_headers).json()["id"]
+                   for i in range(3)]
+    client.delete(f"/posts/{post_id}/comments/{comment_ids[0]}", headers=auth_headers)  # Inside the kept comments
+    assert front_page.wait(10)
+
+    entry = front_page._state.entries[0]
+    assert entry.key[1] == post_id
+    assert [comment["id"] for comment in entry.data["comments"]] == comment_ids[1:]
+
+    for params in ({"take": 1}, {"take": 1, "comments_limit": 1}, {"take": 1, "fields": "id,comments"}):
+        hits, misses = front_page.hits, front_page.misses
+        body = client.get("/posts", params=params).content
+        assert front_page.hits == hits + 1
+        state, front_page._state = front_page._state, None
+        assert client.get("/posts", params=params).content == body  # Same bytes from SQL
+        assert front_page.misses == misses + 1  # The SQL path did run
+        front_page._state = state
+
+    client.post(f"/posts/{post_id}/comments", json={"body": "third"}, headers=auth_headers)
+    assert front_page.wait(10)
+    hits, misses = front_page.hits, front_page.misses
+    assert len(client.get("/posts", params={"take": 1}).json()[0]["comments"]) == 3
+    assert (front_page.hits, front_page.misses) == (hits, misses + 1)  # More comments than the entry keeps: read from SQL
+    assert len(front_page._state.entries[0].data["comments"]) == 2
+    monkeypatch.undo()
+    front_page.load()
+
+# Only a changed username or email reloads the feed (they are embedded); a password rehash does not
+def test_only_embedded_user_fields_reload_the_feed(client, auth_headers):
+    client.post("/posts", json={"title": "by me", "content": "body"}, headers=auth_headers)
+    assert front_page.wait(10)
+    with SessionLocal() as db:
+        user = db.query(models.Post).order_by(models.Post.id.desc()).first().author
+        loads = front_page.loads
+        user.password_hash = user.password_hash + "rehashed"  # What a login at a new bcrypt cost writes
+        db.commit()
+        assert front_page.wait(10)
+        assert front_page.loads == loads
+
+        user.email = f"renamed_{user.email}"
+        db.commit()
+        assert front_page.wait(10)
+        assert front_page.loads == loads + 1
+        assert front_page._state.entries[0].data["author"]["email"] == user.email
\ No newline at end of file
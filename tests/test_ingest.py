@@ -0,0 +1,25 @@
+# -- NDJSON Line Splitting --
+import asyncio  # iter_lines is an async generator
+from app import ingest  # Line splitter
+
+def split(chunks, max_line_bytes=ingest.MAX_LINE_BYTES):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [item async for item in ingest.iter_lines(stream())]
+
+    original, ingest.MAX_LINE_BYTES = ingest.MAX_LINE_BYTES, max_line_bytes
+    try:
+        return asyncio.run(collect())
+    finally:
+        ingest.MAX_LINE_BYTES = original
+
+def test_lines_across_chunk_boundaries():
+    expected = [(1, b"first"), (2, b""), (3, b"second line"), (4, b"last")]
+    assert split([b"first\n\nsecond line\nlast"]) == expected
+    assert split([b"fi", b"rst\n", b"\nsec", b"ond", b" line\nla", b"st"]) == expected
+
+def test_over_long_line_is_reported_once():
+    assert split([b"ok\n", b"x" * 8, b"x" * 8, b"x" * 8, b"x\nnext\n"], max_line_bytes=16) == [(1, b"ok"), (2, None), (3, b"next")]
\ No newline at end of file
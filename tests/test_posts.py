@@ -0,0 +1,12 @@
+# -- Post Listing Shapes --
+from app import schemas  # Documented item models
+
+def test_summary_view_matches_post_summary(client, auth_headers):
+    client.post("/posts", json={"title": "summary", "content": "body"}, headers=auth_headers)
+    items = client.get("/posts", params={"view": "summary", "take": 1}).json()
+    assert set(items[0]) == set(schemas.PostSummary.model_fields)
+    schemas.PostSummary.model_validate(items[0])
+
+    documented = client.get("/openapi.json").json()["paths"]["/posts"]["get"]["responses"]["200"]
+    refs = {item["$ref"] for item in documented["content"]["application/json"]["schema"]["items"]["anyOf"]}
+    assert refs == {f"#/components/schemas/{name}" for name in ("PostResponse", "PostSearchResult", "PostSummary")}
\ No newline at end of file
@@ -0,0 +1,33 @@
+# -- Per-Client Rate Limits --
+from app import rate_limit  # Buckets and budgets
+
+WRITES = rate_limit.Budget(5, 20)  # The default write budget
+
+def limiter(writes: rate_limit.Budget = WRITES):
+    return rate_limit.RateLimiter({rate_limit.WRITE: writes}, ip_factor=1)
+
+# A request bigger than the burst is admitted on a full bucket but pays its whole cost
+def test_large_requests_leave_the_bucket_in_debt():
+    buckets, keys = limiter(), [("token", "a")]
+    cost = rate_limit.request_cost("POST", rate_limit.GENERATE_PATH, b"count=100000")
+    assert cost == 1000
+    assert buckets.take(keys, rate_limit.WRITE, cost, now=0) == (0.0, None)
+    wait, kind = buckets.take(keys, rate_limit.WRITE, cost, now=4)  # A capped charge would be refilled by now
+    assert kind == "token" and wait == (20 + 980 - 20) / 5
+    assert buckets.take(keys, rate_limit.WRITE, 1, now=4)[0] > 190  # Small writes wait for the debt too
+    assert buckets.take(keys, rate_limit.WRITE, 1, now=200) == (0.0, None)
+
+# Retry-After is the wait of the slowest bucket, not of the first one checked
+def test_wait_covers_every_bucket():
+    buckets = rate_limit.RateLimiter({rate_limit.WRITE: WRITES})  # IP buckets: 4x the rate and burst
+    keys = [("ip", "127.0.0.1"), ("token", "a")]
+    assert buckets.take(keys, rate_limit.WRITE, 100, now=0) == (0.0, None)  # IP: 80 - 100, token: 20 - 100
+    assert buckets.take(keys, rate_limit.WRITE, 1, now=0) == ((1 + 80) / 5, "token")
+
+def test_second_large_generation_is_throttled(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(client.app.state.admission, "limiter", limiter(rate_limit.Budget(0.1, 20)))  # Slow refill
+    generate = "/posts/generate-test-posts"
+    assert client.post(generate, params={"count": 4000}, headers=auth_headers).status_code == 200  # 40 tokens
+    response = client.post(generate, params={"count": 100}, headers=auth_headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 150  # (1 token + ~20 of debt) / 0.1 per second, not 1 / 0.1
\ No newline at end of file
@@ -0,0 +1,17 @@
+# -- ETag Response Cache Invalidation --
+from app import response_cache  # Tags
+
+def test_search_listings_are_tagged():
+    assert response_cache.SEARCHES in response_cache.tags_for("/posts", b"[]", "search=zebra&take=5")
+    assert response_cache.SEARCHES not in response_cache.tags_for("/posts", b"[]", "take=5")
+    assert response_cache.SEARCHES not in response_cache.tags_for("/posts", b"[]", "search=%20")  # Blank: plain listing
+
+# A cached empty search must not survive an edit that makes a post match
+def test_edit_invalidates_cached_search(client, auth_headers):
+    post = client.post("/posts", json={"title": "plain title", "content": "nothing here"}, headers=auth_headers).json()
+    assert client.get("/posts", params={"search": "zebra"}).json() == []
+    assert client.get("/posts", params={"search": "zebra"}).json() == []  # Served from the cache
+
+    response = client.patch(f"/posts/{post['id']}", json={"title": "zebra"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert [item["id"] for item in client.get("/posts", params={"search": "zebra"}).json()] == [post["id"]]
\ No newline at end of file
@@ -0,0 +1,20 @@
+# -- Reproducible Seeding --
+import hashlib  # File hashes
+import os  # Child environments
+import subprocess  # seed_db.py runs in its own interpreter (and its own hash seed)
+import sys  # The current interpreter
+from pathlib import Path  # Repository root
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Same seed and sizes in processes with different PYTHONHASHSEED: the files must be byte-identical
+def test_seeded_files_are_byte_identical(tmp_path):
+    digests = set()
+    for hash_seed in ("1", "2"):
+        path = tmp_path / hash_seed / "blog.db"
+        path.parent.mkdir()
+        env = {**os.environ, "BLOG_DB_PATH": str(path), "PYTHONHASHSEED": hash_seed}
+        subprocess.run([sys.executable, "seed_db.py", "--users", "20", "--posts", "200", "--comments", "1000", "--workers", "1"],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+        digests.add(hashlib.sha256(path.read_bytes()).hexdigest())
+    assert len(digests) == 1
\ No newline at end of file
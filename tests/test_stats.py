@@ -0,0 +1,27 @@
+# -- Runtime Statistics Access --
+import uuid  # Unique usernames
+from app.config import settings  # Stats allow-list
+
+# A fresh account's username and token header
+def sign_up(client):
+    username = f"stats_{uuid.uuid4().hex[:12]}"
+    client.post("/users", json={"username": username, "email": f"{username}@example.com", "password": "secret123"})
+    token = client.post("/login", params={"username": username, "password": "secret123"}).json()["api_key"]
+    return username, {"X-API-Token": token}
+
+def test_stats_require_a_token(client, auth_headers):
+    assert client.get("/stats").status_code == 422  # Missing X-API-Token header
+    assert client.get("/stats", headers={"X-API-Token": "unknown"}).status_code == 401
+
+def test_stats_are_denied_without_an_allow_list(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "stats_users", frozenset())
+    assert client.get("/stats", headers=auth_headers).status_code == 403
+    assert client.get("/stats/slow-queries", headers=auth_headers).status_code == 403
+
+def test_stats_users_allow_list(client, auth_headers, monkeypatch):
+    username, headers = sign_up(client)
+    monkeypatch.setattr(settings, "stats_users", frozenset({username}))
+    assert client.get("/stats", headers=headers).status_code == 200
+    assert client.get("/stats/slow-queries", headers=headers).status_code == 200
+    assert client.get("/stats", headers=auth_headers).status_code == 403
+    assert client.get("/stats/slow-queries", headers=auth_headers).status_code == 403
\ No newline at end of file